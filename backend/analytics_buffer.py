@@ -0,0 +1,356 @@
+"""
+Write-behind buffering of resume analytics
+
+Views and downloads are counted in memory per process and written every
+ANALYTICS_FLUSH_INTERVAL_SECONDS as one upsert into resume_analytics
+(INSERT ... ON CONFLICT (resume_id) DO UPDATE SET view_count =
+view_count + n) and one increment of public_resumes.view_count, so a
+popular public link costs a couple of statements per interval instead of
+two row updates per request. Counts for resumes deleted in the meantime
+are discarded by the upsert.
+
+Once ANALYTICS_BUFFER_MAX_ENTRIES resumes and links have pending counts,
+the request that adds another flushes the buffer on its own session. A
+failed flush puts its counts back for the next one (or drops them if the
+buffer is full). With an interval of 0 every event is written on the
+request's session before record() returns, which is what tests and
+serverless deployments want.
+
+Dashboards are cached per user for ANALYTICS_DASHBOARD_CACHE_SECONDS and
+dropped when a flush from this process touches one of the user's resumes
+(or the user adds, renames or deletes one). Flushes in other processes
+aren't seen until the entry expires.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Integer, bindparam, column, func, select, update
+from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP, UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import SERVERLESS, async_session
+from models import PublicResume, Resume, ResumeAnalytics
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Nothing runs between requests on serverless platforms, so write through there
+ANALYTICS_FLUSH_INTERVAL_SECONDS = float(os.environ.get(
+    'ANALYTICS_FLUSH_INTERVAL_SECONDS', 0 if SERVERLESS else 5
+))
+ANALYTICS_BUFFER_MAX_ENTRIES = int(os.environ.get('ANALYTICS_BUFFER_MAX_ENTRIES', 10000))
+# 0 disables the dashboard cache
+ANALYTICS_DASHBOARD_CACHE_SECONDS = float(os.environ.get('ANALYTICS_DASHBOARD_CACHE_SECONDS', 30))
+ANALYTICS_DASHBOARD_CACHE_ENTRIES = int(os.environ.get('ANALYTICS_DASHBOARD_CACHE_ENTRIES', 10000))
+
+
+@dataclass
+class ResumeCounts:
+    """Events for one resume since the last flush"""
+    views: int = 0
+    downloads: int = 0
+    last_viewed: Optional[datetime] = None
+    last_downloaded: Optional[datetime] = None
+    ats_scores: List[dict] = field(default_factory=list)
+
+    def merge(self, other: "ResumeCounts"):
+        """Add counts recorded after these"""
+        self.views += other.views
+        self.downloads += other.downloads
+        self.last_viewed = max(filter(None, (self.last_viewed, other.last_viewed)), default=None)
+        self.last_downloaded = max(filter(None, (self.last_downloaded, other.last_downloaded)), default=None)
+        self.ats_scores = self.ats_scores + other.ats_scores
+
+    def row(self, resume_id: uuid.UUID) -> dict:
+        return {
+            "resume_id": str(resume_id),
+            "views": self.views,
+            "downloads": self.downloads,
+            "last_viewed": self.last_viewed.isoformat() if self.last_viewed else None,
+            "last_downloaded": self.last_downloaded.isoformat() if self.last_downloaded else None,
+            "ats_scores": self.ats_scores,
+        }
+
+
+def _event_count(resumes: Dict[uuid.UUID, ResumeCounts], shares: Dict[uuid.UUID, int]) -> int:
+    return sum(c.views + c.downloads + len(c.ats_scores) for c in resumes.values()) + sum(shares.values())
+
+
+def _recordset(name: str, rows: List[dict], *columns):
+    """jsonb_to_recordset() over rows, so a whole batch is one bound value"""
+    return func.jsonb_to_recordset(bindparam(name, rows, type_=JSONB)).table_valued(*columns).render_derived(
+        name=name, with_types=True
+    )
+
+
+def resume_upsert(rows: List[dict]):
+    """Add ResumeCounts.row()s to resume_analytics, creating rows as needed"""
+    batch = _recordset(
+        "resume_counts",
+        rows,
+        column("resume_id", UUID(as_uuid=True)),
+        column("views", Integer),
+        column("downloads", Integer),
+        column("last_viewed", TIMESTAMP(timezone=True)),
+        column("last_downloaded", TIMESTAMP(timezone=True)),
+        column("ats_scores", JSONB),
+    )
+    now = func.now()
+    counted = (
+        select(
+            func.gen_random_uuid(),
+            batch.c.resume_id,
+            batch.c.views,
+            batch.c.downloads,
+            batch.c.ats_scores,
+            batch.c.last_viewed,
+            batch.c.last_downloaded,
+            now,
+        )
+        # Skips resumes deleted since the events were recorded
+        .join(Resume, Resume.id == batch.c.resume_id)
+        # Rows are locked in a fixed order, so concurrent flushes can't deadlock
+        .order_by(batch.c.resume_id)
+    )
+    statement = insert(ResumeAnalytics).from_select(
+        ["id", "resume_id", "view_count", "download_count", "ats_score_history",
+         "last_viewed", "last_downloaded", "updated_at"],
+        counted,
+    )
+    new = statement.excluded
+    return statement.on_conflict_do_update(
+        index_elements=[ResumeAnalytics.resume_id],
+        set_={
+            "view_count": func.coalesce(ResumeAnalytics.view_count, 0) + new.view_count,
+            "download_count": func.coalesce(ResumeAnalytics.download_count, 0) + new.download_count,
+            "ats_score_history": func.coalesce(ResumeAnalytics.ats_score_history, func.jsonb_build_array())
+                                     .concat(new.ats_score_history),
+            # greatest() ignores NULLs
+            "last_viewed": func.greatest(ResumeAnalytics.last_viewed, new.last_viewed),
+            "last_downloaded": func.greatest(ResumeAnalytics.last_downloaded, new.last_downloaded),
+            "updated_at": new.updated_at,
+        },
+    )
+
+
+def share_view_increment(rows: List[dict]):
+    """Add {"id", "views"} rows to public_resumes.view_count"""
+    batch = _recordset("share_views", rows, column("id", UUID(as_uuid=True)), column("views", Integer))
+    return (
+        update(PublicResume)
+        .where(PublicResume.id == batch.c.id)
+        .values(view_count=func.coalesce(PublicResume.view_count, 0) + batch.c.views)
+    )
+
+
+class DashboardCache(TTLCache):
+    """Per-user dashboards, also dropped when one of the resumes they show changes"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        super().__init__(ttl, max_entries)
+        # Resume id -> cached owner, for invalidation by flushed resume ids
+        self._owners: Dict[uuid.UUID, uuid.UUID] = {}
+
+    def get(self, user_id: uuid.UUID) -> Optional[dict]:
+        entry = super().get(user_id)
+        return None if entry is None else entry[1]
+
+    def put(self, user_id: uuid.UUID, resume_ids: Iterable[uuid.UUID], dashboard: dict, generation: int):
+        resume_ids = tuple(resume_ids)
+        if super().put(user_id, (resume_ids, dashboard), generation):
+            self._owners.update((resume_id, user_id) for resume_id in resume_ids)
+
+    def invalidate_resumes(self, resume_ids: Iterable[uuid.UUID]):
+        """Drop the dashboards showing any of these resumes"""
+        self.invalidate(*{self._owners[r] for r in resume_ids if r in self._owners})
+
+    def _remove(self, user_id: uuid.UUID) -> bool:
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return False
+        for resume_id in entry[1][0]:
+            self._owners.pop(resume_id, None)
+        return True
+
+
+dashboard_cache = DashboardCache(ttl=ANALYTICS_DASHBOARD_CACHE_SECONDS, max_entries=ANALYTICS_DASHBOARD_CACHE_ENTRIES)
+
+
+class AnalyticsBuffer:
+    """Per-process aggregation of analytics events with periodic flushing"""
+
+    def __init__(self, interval: float, max_entries: int):
+        self.interval = interval
+        self.max_entries = max_entries
+        self._resumes: Dict[uuid.UUID, ResumeCounts] = {}
+        self._shares: Dict[uuid.UUID, int] = {}
+        self._lock = asyncio.Lock()
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.events = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_flush_seconds: Optional[float] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._resumes) + len(self._shares)
+
+    async def record(self, db: AsyncSession, resume_id: uuid.UUID, event_type: str,
+                     ats_score: Optional[int] = None, share_id: Optional[uuid.UUID] = None):
+        """
+        Count a "view", "download" or "ats_score" event; share_id also counts
+        a view of that public link. db is the request's primary session, used
+        (and committed) only when the event has to be written right away.
+        """
+        now = datetime.now(timezone.utc)
+        counts = ResumeCounts()
+        if event_type == "view":
+            counts.views, counts.last_viewed = 1, now
+        elif event_type == "download":
+            counts.downloads, counts.last_downloaded = 1, now
+        elif event_type == "ats_score" and ats_score is not None:
+            counts.ats_scores.append({"score": ats_score, "date": now.isoformat()})
+        self.events += 1
+
+        if self.interval <= 0:
+            shares = {share_id: 1} if share_id is not None else {}
+            await self._flush(db, {resume_id: counts}, shares, restore=False)
+            return
+        self._resumes.setdefault(resume_id, ResumeCounts()).merge(counts)
+        if share_id is not None:
+            self._shares[share_id] = self._shares.get(share_id, 0) + 1
+        # Flushing on the caller's session: requests queued behind the lock
+        # hold pool connections, so the flush mustn't need another one
+        if self.pending >= self.max_entries:
+            await self.flush(db)
+
+    async def flush(self, db: Optional[AsyncSession] = None) -> int:
+        """Write everything counted so far; returns the number of rows updated"""
+        async with self._lock:
+            if not self.pending:
+                return 0
+            resumes, self._resumes = self._resumes, {}
+            shares, self._shares = self._shares, {}
+            if db is not None:
+                return await self._flush(db, resumes, shares)
+            async with async_session() as session:
+                return await self._flush(session, resumes, shares)
+
+    async def _flush(self, db: AsyncSession, resumes: Dict[uuid.UUID, ResumeCounts],
+                     shares: Dict[uuid.UUID, int], restore: bool = True) -> int:
+        started = time.perf_counter()
+        try:
+            written = await self._write(db, resumes, shares)
+        except Exception as e:
+            await db.rollback()
+            self.failed += 1
+            logger.warning(f"Analytics flush failed: {type(e).__name__}: {e}")
+            if restore:
+                self._restore(resumes, shares)
+            else:
+                self.dropped += _event_count(resumes, shares)
+            return 0
+        except asyncio.CancelledError:
+            # e.g. the request flushing on its session was dropped mid-write
+            if restore:
+                self._restore(resumes, shares)
+            raise
+        dashboard_cache.invalidate_resumes(resumes)
+        self.flushes += 1
+        self.rows_written += written
+        self.last_flush_seconds = round(time.perf_counter() - started, 3)
+        return written
+
+    async def _write(self, db: AsyncSession, resumes: Dict[uuid.UUID, ResumeCounts],
+                     shares: Dict[uuid.UUID, int]) -> int:
+        written = 0
+        if resumes:
+            result = await db.execute(resume_upsert(
+                [counts.row(resume_id) for resume_id, counts in resumes.items()]
+            ))
+            written += result.rowcount
+        if shares:
+            # Lock the links in a fixed order first, so concurrent flushes can't deadlock
+            await db.execute(
+                select(PublicResume.id)
+                .where(PublicResume.id.in_(list(shares)))
+                .order_by(PublicResume.id)
+                .with_for_update()
+            )
+            result = await db.execute(share_view_increment(
+                [{"id": str(share_id), "views": views} for share_id, views in sorted(shares.items())]
+            ))
+            written += result.rowcount
+        await db.commit()
+        return written
+
+    def _restore(self, resumes: Dict[uuid.UUID, ResumeCounts], shares: Dict[uuid.UUID, int]):
+        """Put back the counts of a failed flush, unless that would overfill the buffer"""
+        if self.pending + len(resumes) + len(shares) > self.max_entries:
+            self.dropped += _event_count(resumes, shares)
+            return
+        for resume_id, counts in resumes.items():
+            newer = self._resumes.get(resume_id)
+            if newer is not None:
+                counts.merge(newer)
+            self._resumes[resume_id] = counts
+        for share_id, views in shares.items():
+            self._shares[share_id] = self._shares.get(share_id, 0) + views
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._loop())
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Analytics flush failed: {type(e).__name__}: {e}")
+
+    async def shutdown(self):
+        """Stop the flush loop, letting a flush in progress finish, and write what is left"""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self.pending:
+            logger.warning(f"Analytics for {self.pending} resumes and links were lost at shutdown")
+
+    def stats(self) -> dict:
+        return {
+            "flush_interval_seconds": self.interval,
+            "pending": self.pending,
+            "max_entries": self.max_entries,
+            "events": self.events,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
+
+
+analytics_buffer = AnalyticsBuffer(
+    interval=ANALYTICS_FLUSH_INTERVAL_SECONDS,
+    max_entries=ANALYTICS_BUFFER_MAX_ENTRIES,
+)
@@ -0,0 +1,94 @@
+"""
+Benchmark: GET /api/resumes latency with and without connection pooling
+
+Runs the API in-process once per DB_POOL_MODE ("null" and "queue") against
+DATABASE_URL and reports p50/p99 for sequential and concurrent requests.
+The gap grows with connection setup cost, so run it against the real
+(TLS, remote) database rather than a local socket to see the production
+picture. It creates a throwaway user with a few resumes.
+
+Usage (from backend/):
+    DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_db_pool.py
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+REQUESTS = 200
+CONCURRENCY = 10
+RESUMES = 10
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label: str, samples):
+    print(f"  {label:<12} p50 {percentile(samples, 50) * 1000:>7.2f} ms   "
+          f"p99 {percentile(samples, 99) * 1000:>7.2f} ms   "
+          f"mean {statistics.mean(samples) * 1000:>7.2f} ms")
+
+
+async def run_mode():
+    sys.path.insert(0, str(BACKEND_DIR))
+    import httpx
+    import server
+    from database import describe_engine, init_db
+
+    # Keep per-request access logs out of the report
+    logging.disable(logging.WARNING)
+
+    await init_db()
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        r = await client.post('/api/auth/register', json={
+            'email': f'bench-{uuid.uuid4().hex[:8]}@example.com', 'password': 'bench-password', 'full_name': 'Bench'
+        })
+        headers = {'Authorization': f"Bearer {r.json()['access_token']}"}
+        for i in range(RESUMES):
+            await client.post('/api/resumes', json={'title': f'Resume {i}'}, headers=headers)
+
+        async def timed_get():
+            started = time.perf_counter()
+            response = await client.get('/api/resumes', headers=headers)
+            response.raise_for_status()
+            return time.perf_counter() - started
+
+        # Warm up (first connections, statement caches)
+        for _ in range(10):
+            await timed_get()
+
+        sequential = [await timed_get() for _ in range(REQUESTS)]
+
+        concurrent = []
+        for _ in range(REQUESTS // CONCURRENCY):
+            concurrent += await asyncio.gather(*[timed_get() for _ in range(CONCURRENCY)])
+
+    print(f"DB_POOL_MODE={os.environ['DB_POOL_MODE']}: {describe_engine()}")
+    report("sequential", sequential)
+    report(f"{CONCURRENCY} parallel", concurrent)
+    await server.engine.dispose()
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--mode':
+        asyncio.run(run_mode())
+        return
+    for mode in ('null', 'queue'):
+        # Pool mode is fixed at import time, so each mode gets a fresh interpreter
+        env = {**os.environ, 'DB_POOL_MODE': mode}
+        subprocess.run([sys.executable, __file__, '--mode'], env=env, cwd=BACKEND_DIR, check=True)
+
+
+if __name__ == '__main__':
+    main()
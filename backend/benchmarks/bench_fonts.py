@@ -0,0 +1,67 @@
+"""
+Benchmark: render time and PDF size for Latin vs. multi-script resumes
+
+Latin text stays on the base-14 Helvetica faces; other scripts pull in the
+registered TrueType fallbacks, embedded as glyph subsets. Families whose
+files can't be found are skipped, so point PDF_FONT_DIRS at a directory of
+Noto fonts to cover Devanagari/CJK on hosts without them.
+
+Usage (from backend/):
+    PDF_FONT_DIRS=/path/to/fonts python benchmarks/bench_fonts.py
+"""
+
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdf_fonts import fallback_fonts
+from pdf_generator import render_pdf
+from resume_document import build_document
+
+ITERATIONS = 50
+
+SAMPLES = {
+    "latin": ("Jordan Example", "Senior Engineer", "Cut p99 latency by 40% across the API tier"),
+    "cyrillic": ("Иван Петров", "Ведущий инженер", "Сократил задержку API на 40%"),
+    "devanagari": ("अर्जुन शर्मा", "वरिष्ठ अभियंता", "एपीआई विलंब 40% कम किया"),
+    "cjk": ("山田太郎", "シニアエンジニア", "API のレイテンシを 40% 削減"),
+    "mixed": ("Jordan Иван 山田", "Senior Engineer / Ведущий инженер", "Cut latency — 削減 — сократил"),
+}
+
+
+def sample_document(name: str, position: str, achievement: str):
+    return build_document("Sample", "professional", {
+        "personal_info": {"full_name": name, "email": "jordan@example.com", "summary": achievement},
+        "experiences": [
+            {
+                "company": f"Company {i}",
+                "position": position,
+                "start_date": "2019",
+                "end_date": "2023",
+                "achievements": [achievement] * 3,
+            }
+            for i in range(4)
+        ],
+        "skills": ["Python", "FastAPI", "PostgreSQL"],
+    })
+
+
+def main():
+    started = time.perf_counter()
+    fonts = fallback_fonts()
+    print(f"Fallback fonts loaded in {(time.perf_counter() - started) * 1000:.1f} ms (once per process): "
+          f"{', '.join(f.regular for f in fonts) or 'none found'}")
+
+    print(f"{'script':<12} {'render':>12} {'size':>10}")
+    for label, fields in SAMPLES.items():
+        document = sample_document(*fields)
+        pdf_bytes = render_pdf('professional', document)
+        seconds = timeit.timeit(lambda: render_pdf('professional', document), number=ITERATIONS)
+        print(f"{label:<12} {seconds / ITERATIONS * 1000:>9.2f} ms {len(pdf_bytes) / 1024:>7.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: per-render template setup cost
+
+Compares building a stylesheet on every render (getSampleStyleSheet() plus
+seven ParagraphStyle additions, as the generators used to do) against
+looking up the template compiled once in the registry.
+
+Usage (from backend/):
+    python benchmarks/bench_template_setup.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+from pdf_generator import get_template, render_pdf
+from resume_document import build_document
+
+ITERATIONS = 2000
+
+SAMPLE_RESUME = build_document("Sample", "professional", {
+    "personal_info": {
+        "full_name": "Jordan Example",
+        "email": "jordan@example.com",
+        "phone": "+1 555 0100",
+        "location": "Austin, TX",
+        "summary": "Backend engineer with eight years of experience building APIs.",
+    },
+    "experiences": [
+        {
+            "company": f"Company {i}",
+            "position": "Senior Engineer",
+            "start_date": "2019",
+            "end_date": "2023",
+            "achievements": ["Cut p99 latency by 40%", "Led migration to Postgres"],
+        }
+        for i in range(4)
+    ],
+    "education": [{"institution": "State University", "degree": "BS", "field": "Computer Science"}],
+    "skills": ["Python", "FastAPI", "PostgreSQL", "AWS"],
+})
+
+
+def per_call_setup():
+    """The setup every generator ran before the registry existed"""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='Name', fontSize=24, spaceAfter=6, textColor=colors.HexColor('#002FA7'), fontName='Helvetica-Bold'))
+    styles.add(ParagraphStyle(name='ContactInfo', fontSize=10, spaceAfter=12, textColor=colors.HexColor('#64748B')))
+    styles.add(ParagraphStyle(name='SectionTitle', fontSize=14, spaceBefore=16, spaceAfter=8, textColor=colors.HexColor('#002FA7'), fontName='Helvetica-Bold'))
+    styles.add(ParagraphStyle(name='JobTitle', fontSize=12, spaceAfter=2, fontName='Helvetica-Bold'))
+    styles.add(ParagraphStyle(name='Company', fontSize=11, spaceAfter=4, textColor=colors.HexColor('#64748B')))
+    styles.add(ParagraphStyle(name='BulletPoint', fontSize=10, leftIndent=15, spaceAfter=4, bulletIndent=0))
+    styles.add(ParagraphStyle(name='Summary', fontSize=10, spaceAfter=12, leading=14))
+    return styles
+
+
+def registry_setup():
+    return get_template('professional').styles
+
+
+def report(label: str, seconds: float, iterations: int):
+    print(f"{label:<32} {seconds / iterations * 1e6:>10.1f} us/render")
+
+
+def main():
+    before = timeit.timeit(per_call_setup, number=ITERATIONS)
+    after = timeit.timeit(registry_setup, number=ITERATIONS)
+    full = timeit.timeit(lambda: render_pdf('professional', SAMPLE_RESUME), number=ITERATIONS // 10)
+
+    print(f"Template setup ({ITERATIONS} iterations)")
+    report("before: per-call stylesheet", before, ITERATIONS)
+    report("after: compiled registry", after, ITERATIONS)
+    print(f"{'speedup':<32} {before / after:>10.0f}x")
+    report("full render (for scale)", full, ITERATIONS // 10)
+
+
+if __name__ == '__main__':
+    main()
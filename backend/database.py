@@ -2,12 +2,18 @@
 PostgreSQL Database Configuration and Session Management
 """
 
+import ast
+import asyncio
 import os
+import re
 import ssl
+from pathlib import Path
+from typing import Optional
+from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import event, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 # Database URL
 DATABASE_URL = os.environ.get(
@@ -19,21 +25,99 @@ DATABASE_URL = os.environ.get(
 if '?sslmode=require' in DATABASE_URL:
     DATABASE_URL = DATABASE_URL.replace('?sslmode=require', '')
 
-# Create async engine with SSL support for asyncpg
-engine_kwargs = {
-    'echo': False,  # Set to True for SQL logging
-    'poolclass': NullPool,  # Better for serverless (Render)
-}
+# Engine pool mode: "null" opens a connection per session (serverless, where
+# a process may be frozen between requests); "queue" keeps a pool of warm
+# connections for long-running servers such as the uvicorn Procfile process.
+SERVERLESS = bool(os.environ.get('VERCEL') or os.environ.get('AWS_LAMBDA_FUNCTION_NAME'))
+DB_POOL_MODE = os.environ.get('DB_POOL_MODE', 'null' if SERVERLESS else 'queue').lower()
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+# Recycle before Neon/proxies drop idle connections
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 300))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+# Server-side per-statement timeout in milliseconds (0 disables)
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 15000))
 
-# Add SSL context for async connections to Neon
-if 'neon.tech' in DATABASE_URL:
-    # Create SSL context for secure connection to Neon
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = True
-    ssl_context.verify_mode = ssl.CERT_REQUIRED
-    engine_kwargs['connect_args'] = {'ssl': ssl_context}
+# Apply pending migrations at boot. Turn off where deploys run
+# `python manage.py migrate` as a separate release step.
+DB_AUTO_MIGRATE = os.environ.get('DB_AUTO_MIGRATE', 'true').lower() == 'true'
 
-engine = create_async_engine(DATABASE_URL, **engine_kwargs)
+BACKEND_DIR = Path(__file__).resolve().parent
+
+if DB_POOL_MODE not in ('null', 'queue'):
+    raise ValueError(f"DB_POOL_MODE must be 'null' or 'queue', got {DB_POOL_MODE!r}")
+
+
+def build_engine_kwargs(url: str) -> dict:
+    """create_async_engine() arguments for the configured pool mode"""
+    kwargs = {
+        'echo': False,  # Set to True for SQL logging
+    }
+    connect_args = {}
+    
+    if DB_POOL_MODE == 'queue':
+        kwargs.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+    else:
+        kwargs['poolclass'] = NullPool  # Better for serverless (Vercel)
+    
+    # Add SSL context for async connections to Neon
+    if 'neon.tech' in url:
+        # Create SSL context for secure connection to Neon
+        ssl_context = ssl.create_default_context()
+        ssl_context.check_hostname = True
+        ssl_context.verify_mode = ssl.CERT_REQUIRED
+        connect_args['ssl'] = ssl_context
+    
+    if connect_args:
+        kwargs['connect_args'] = connect_args
+    return kwargs
+
+
+def describe_engine() -> str:
+    """One-line summary of the pool configuration for startup logs"""
+    if DB_POOL_MODE == 'queue':
+        return (
+            f"pooled (size={DB_POOL_SIZE}, overflow={DB_MAX_OVERFLOW}, recycle={DB_POOL_RECYCLE}s, "
+            f"pre_ping={DB_POOL_PRE_PING}, statement_timeout={DB_STATEMENT_TIMEOUT_MS}ms)"
+        )
+    return f"unpooled (NullPool, statement_timeout={DB_STATEMENT_TIMEOUT_MS}ms)"
+
+
+def set_statement_timeout(async_engine, timeout_ms: int):
+    """
+    SET statement_timeout on every new connection. Not passed as a startup
+    parameter: PgBouncer-style poolers (e.g. Neon's -pooler hosts) reject
+    unknown startup parameters.
+    """
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _set_statement_timeout(dbapi_connection, connection_record):
+        # On the raw asyncpg connection, outside the adapter's implicit
+        # transaction (whose rollback would undo the SET)
+        dbapi_connection.run_async(
+            lambda connection: connection.execute(f"SET statement_timeout = {int(timeout_ms)}")
+        )
+
+
+engine = create_async_engine(DATABASE_URL, **build_engine_kwargs(DATABASE_URL))
+if DB_STATEMENT_TIMEOUT_MS > 0:
+    set_statement_timeout(engine, DB_STATEMENT_TIMEOUT_MS)
+
+# Optional read replica for read-only routes (see read_routing.py)
+DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL', '').replace('?sslmode=require', '')
+replica_engine = (
+    create_async_engine(DATABASE_REPLICA_URL, **build_engine_kwargs(DATABASE_REPLICA_URL))
+    if DATABASE_REPLICA_URL else None
+)
+if replica_engine is not None and DB_STATEMENT_TIMEOUT_MS > 0:
+    set_statement_timeout(replica_engine, DB_STATEMENT_TIMEOUT_MS)
 
 # Session factory
 async_session = async_sessionmaker(
@@ -44,6 +128,14 @@ async_session = async_sessionmaker(
     autocommit=False,
 )
 
+replica_session = async_sessionmaker(
+    replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+    autocommit=False,
+) if replica_engine else None
+
 # Base class for models
 Base = declarative_base()
 
@@ -57,40 +149,89 @@ async def get_db():
             await session.close()
 
 
+def create_migration_engine():
+    """Short-lived engine for running migrations (no pool, no statement timeout)"""
+    kwargs = build_engine_kwargs(DATABASE_URL)
+    migration_engine = create_async_engine(
+        DATABASE_URL, poolclass=NullPool, connect_args=kwargs.get('connect_args', {})
+    )
+    # Batched data migrations can legitimately run longer than a request
+    set_statement_timeout(migration_engine, 0)
+    return migration_engine
+
+
+def alembic_config(configure_logger: bool = True):
+    """Alembic config pointing at backend/alembic.ini and backend/migrations"""
+    from alembic.config import Config
+    
+    config = Config(str(BACKEND_DIR / 'alembic.ini'))
+    config.set_main_option('script_location', str(BACKEND_DIR / 'migrations'))
+    config.attributes['configure_logger'] = configure_logger
+    return config
+
+
+_REVISION_RE = re.compile(r"^(revision|down_revision)\s*=\s*(.+)$", re.MULTILINE)
+
+
+def head_revision() -> str:
+    """
+    Latest migration revision, read straight from the scripts in
+    migrations/versions. Importing alembic costs more than the rest of the
+    boot check, so it is only loaded when there is something to migrate.
+    """
+    revisions, parents = set(), set()
+    for path in (BACKEND_DIR / 'migrations' / 'versions').glob('*.py'):
+        fields = dict(_REVISION_RE.findall(path.read_text()))
+        if 'revision' not in fields:
+            continue
+        revisions.add(ast.literal_eval(fields['revision']))
+        down = ast.literal_eval(fields.get('down_revision', 'None'))
+        parents.update(down if isinstance(down, (tuple, list)) else [down])
+    heads = revisions - parents
+    if len(heads) != 1:
+        raise RuntimeError(f"Expected a single migration head, found {sorted(heads)}")
+    return heads.pop()
+
+
+async def current_revision() -> Optional[str]:
+    """Revision the database is stamped with, None for an unversioned database"""
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except ProgrammingError:
+            # No alembic_version table yet: fresh or pre-migrations database
+            return None
+        return result.scalar_one_or_none()
+
+
+def run_migrations(revision: str = 'head'):
+    """Upgrade the database (blocking; migrations/env.py runs its own event loop)"""
+    from alembic import command
+    
+    command.upgrade(alembic_config(configure_logger=False), revision)
+
+
 async def init_db():
-    """Initialize database tables"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-        
-        # Run schema migrations for existing tables
-        await conn.execute(text("""
-            -- Add missing columns to resume_analytics if they don't exist
-            DO $$ 
-            BEGIN
-                IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
-                              WHERE table_name='resume_analytics' AND column_name='ats_score_history') THEN
-                    ALTER TABLE resume_analytics ADD COLUMN ats_score_history JSONB DEFAULT '[]';
-                END IF;
-                
-                IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
-                              WHERE table_name='resume_analytics' AND column_name='last_viewed') THEN
-                    ALTER TABLE resume_analytics ADD COLUMN last_viewed TIMESTAMP WITH TIME ZONE;
-                END IF;
-                
-                IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
-                              WHERE table_name='resume_analytics' AND column_name='last_downloaded') THEN
-                    ALTER TABLE resume_analytics ADD COLUMN last_downloaded TIMESTAMP WITH TIME ZONE;
-                END IF;
-                
-                -- Drop old column if it exists
-                IF EXISTS (SELECT 1 FROM information_schema.columns 
-                          WHERE table_name='resume_analytics' AND column_name='last_viewed_at') THEN
-                    ALTER TABLE resume_analytics DROP COLUMN last_viewed_at;
-                END IF;
-            END $$;
-        """))
-        
-    print("✅ Database tables created/verified")
+    """
+    Make sure the schema is at the latest migration. The common case is a
+    single SELECT against alembic_version; DDL only runs when the database
+    is behind and DB_AUTO_MIGRATE is on (otherwise run `python manage.py migrate`).
+    """
+    head = head_revision()
+    current = await current_revision()
+    if current == head:
+        print(f"✅ Database schema up to date (revision {head})")
+        return
+    
+    if not DB_AUTO_MIGRATE:
+        raise RuntimeError(
+            f"Database schema is at {current or 'an unversioned state'}, expected {head}. "
+            f"Run `python manage.py migrate` before starting the server."
+        )
+    
+    # Migrations run on their own engine and event loop in a worker thread
+    await asyncio.to_thread(run_migrations)
+    print(f"✅ Database migrated from {current or 'unversioned'} to {head}")
 
 
 async def drop_db():
@@ -0,0 +1,176 @@
+"""
+Text-based resume exporters (TXT, Markdown, HTML) built on ResumeDocument
+"""
+
+from html import escape
+from typing import List
+
+from resume_document import ResumeDocument
+
+
+def to_text(doc: ResumeDocument) -> str:
+    personal = doc.personal
+
+    lines = []
+    lines.append(personal.full_name.upper())
+    lines.append(f"{personal.email} | {personal.phone} | {personal.location}")
+    lines.append("")
+
+    if personal.summary:
+        lines.append("PROFESSIONAL SUMMARY")
+        lines.append(personal.summary)
+        lines.append("")
+
+    if doc.experiences:
+        lines.append("EXPERIENCE")
+        for exp in doc.experiences:
+            lines.append(f"{exp.position} at {exp.company}")
+            lines.append(f"{exp.start_date} - {exp.end_label}")
+            for ach in exp.achievements:
+                lines.append(f"  • {ach}")
+            lines.append("")
+
+    if doc.education:
+        lines.append("EDUCATION")
+        for edu in doc.education:
+            lines.append(f"{edu.degree} in {edu.field}")
+            lines.append(f"{edu.institution} | {edu.end_date}")
+            lines.append("")
+
+    if doc.skills:
+        lines.append("SKILLS")
+        lines.append(", ".join(doc.skills))
+
+    return "\n".join(lines)
+
+
+def _is_web_url(url: str) -> bool:
+    return url.startswith(('http://', 'https://'))
+
+
+def _joined(*parts: str) -> str:
+    return " | ".join(p for p in parts if p)
+
+
+def _contact_parts(doc: ResumeDocument) -> List[str]:
+    personal = doc.personal
+    return [p for p in (personal.email, personal.phone, personal.location, personal.linkedin, personal.portfolio) if p]
+
+
+def to_markdown(doc: ResumeDocument) -> str:
+    personal = doc.personal
+
+    lines = [f"# {personal.full_name or doc.title}", ""]
+    contact = _contact_parts(doc)
+    if contact:
+        lines += [" | ".join(contact), ""]
+
+    if personal.summary:
+        lines += ["## Summary", "", personal.summary, ""]
+
+    if doc.experiences:
+        lines += ["## Experience", ""]
+        for exp in doc.experiences:
+            lines.append(f"### {exp.position} — {exp.company}")
+            lines.append(f"*{exp.start_date} - {exp.end_label}*")
+            lines.append("")
+            if exp.description:
+                lines += [exp.description, ""]
+            if exp.achievements:
+                lines += [f"- {ach}" for ach in exp.achievements]
+                lines.append("")
+
+    if doc.education:
+        lines += ["## Education", ""]
+        for edu in doc.education:
+            lines.append(f"### {edu.degree} in {edu.field}")
+            dates = f"{edu.start_date} - {edu.end_date}" if edu.start_date or edu.end_date else ""
+            lines.append(_joined(edu.institution, dates, f"GPA: {edu.gpa}" if edu.gpa else ""))
+            lines.append("")
+
+    if doc.skills:
+        lines += ["## Skills", "", ", ".join(doc.skills), ""]
+
+    if doc.projects:
+        lines += ["## Projects", ""]
+        for proj in doc.projects:
+            lines.append(f"### [{proj.name}]({proj.url})" if _is_web_url(proj.url) else f"### {proj.name}")
+            if proj.description:
+                lines.append(proj.description)
+            if proj.technologies:
+                lines.append(f"*Technologies: {', '.join(proj.technologies)}*")
+            lines += [f"- {h}" for h in proj.highlights]
+            lines.append("")
+
+    if doc.certifications:
+        lines += ["## Certifications", ""]
+        for cert in doc.certifications:
+            lines.append(f"- {cert.name} - {cert.issuer} ({cert.date})")
+        lines.append("")
+
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def to_html(doc: ResumeDocument) -> str:
+    personal = doc.personal
+    e = escape
+
+    parts = [
+        "<!DOCTYPE html>",
+        '<html lang="en">',
+        "<head>",
+        '<meta charset="utf-8">',
+        f"<title>{e(doc.title or personal.full_name)}</title>",
+        "</head>",
+        "<body>",
+        f"<h1>{e(personal.full_name)}</h1>",
+    ]
+    contact = _contact_parts(doc)
+    if contact:
+        parts.append(f"<p>{' | '.join(e(c) for c in contact)}</p>")
+
+    if personal.summary:
+        parts += ["<h2>Summary</h2>", f"<p>{e(personal.summary)}</p>"]
+
+    if doc.experiences:
+        parts.append("<h2>Experience</h2>")
+        for exp in doc.experiences:
+            parts.append(f"<h3>{e(exp.position)} — {e(exp.company)}</h3>")
+            parts.append(f"<p><em>{e(exp.start_date)} - {e(exp.end_label)}</em></p>")
+            if exp.description:
+                parts.append(f"<p>{e(exp.description)}</p>")
+            if exp.achievements:
+                parts.append("<ul>" + "".join(f"<li>{e(a)}</li>" for a in exp.achievements) + "</ul>")
+
+    if doc.education:
+        parts.append("<h2>Education</h2>")
+        for edu in doc.education:
+            dates = f"{edu.start_date} - {edu.end_date}" if edu.start_date or edu.end_date else ""
+            parts.append(f"<h3>{e(edu.degree)} in {e(edu.field)}</h3>")
+            parts.append(f"<p>{e(_joined(edu.institution, dates, f'GPA: {edu.gpa}' if edu.gpa else ''))}</p>")
+
+    if doc.skills:
+        parts += ["<h2>Skills</h2>", f"<p>{e(', '.join(doc.skills))}</p>"]
+
+    if doc.projects:
+        parts.append("<h2>Projects</h2>")
+        for proj in doc.projects:
+            # Only link plain web URLs so exports can't carry javascript: links
+            if _is_web_url(proj.url):
+                name = f'<a href="{e(proj.url)}">{e(proj.name)}</a>'
+            else:
+                name = e(proj.name)
+            parts.append(f"<h3>{name}</h3>")
+            if proj.description:
+                parts.append(f"<p>{e(proj.description)}</p>")
+            if proj.technologies:
+                parts.append(f"<p><em>Technologies: {e(', '.join(proj.technologies))}</em></p>")
+
+    if doc.certifications:
+        parts.append("<h2>Certifications</h2>")
+        parts.append("<ul>" + "".join(
+            f"<li>{e(c.name)} - {e(c.issuer)} ({e(c.date)})</li>" for c in doc.certifications
+        ) + "</ul>")
+
+    parts += ["</body>", "</html>"]
+    return "\n".join(parts) + "\n"
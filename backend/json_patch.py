@@ -0,0 +1,106 @@
+"""
+Minimal JSON Patch (RFC 6902) diff and apply
+
+Only the add, remove and replace operations are produced or understood,
+which is all make_patch() needs to describe any change between two JSON
+documents. List entries are aligned with difflib before diffing, so
+appending, inserting, removing or editing entries (the usual resume
+edits) yields a patch proportional to the change rather than the list.
+"""
+
+import copy
+import difflib
+import json
+from typing import Any, Dict, List
+
+Patch = List[Dict[str, Any]]
+
+
+def _escape(token) -> str:
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def make_patch(old: Any, new: Any) -> Patch:
+    """Operations that turn old into new"""
+    patch: Patch = []
+    _diff(old, new, '', patch)
+    return patch
+
+
+def _diff(old: Any, new: Any, path: str, patch: Patch):
+    if type(old) is not type(new):
+        patch.append({'op': 'replace', 'path': path, 'value': new})
+    elif isinstance(old, dict):
+        for key in old:
+            if key not in new:
+                patch.append({'op': 'remove', 'path': f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            if key not in old:
+                patch.append({'op': 'add', 'path': f"{path}/{_escape(key)}", 'value': value})
+            else:
+                _diff(old[key], value, f"{path}/{_escape(key)}", patch)
+    elif isinstance(old, list):
+        _diff_list(old, new, path, patch)
+    elif old != new:
+        patch.append({'op': 'replace', 'path': path, 'value': new})
+
+
+def _diff_list(old: list, new: list, path: str, patch: Patch):
+    # Align entries by value; before each opcode the list reads new[:j1] + old[i1:]
+    matcher = difflib.SequenceMatcher(None, [_key(v) for v in old], [_key(v) for v in new], autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        # Edit paired entries in place, then drop or insert the surplus
+        paired = min(i2 - i1, j2 - j1)
+        for k in range(paired):
+            _diff(old[i1 + k], new[j1 + k], f"{path}/{j1 + k}", patch)
+        for _ in range(i2 - i1 - paired):
+            patch.append({'op': 'remove', 'path': f"{path}/{j1 + paired}"})
+        for k in range(j1 + paired, j2):
+            patch.append({'op': 'add', 'path': f"{path}/{k}", 'value': new[k]})
+
+
+def _key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+
+def apply_patch(document: Any, patch: Patch) -> Any:
+    """A patched copy of document (the input is left untouched)"""
+    document = copy.deepcopy(document)
+    for operation in patch:
+        op, path = operation['op'], operation['path']
+        value = copy.deepcopy(operation.get('value'))
+        if path == '':
+            if op == 'remove':
+                raise ValueError("Cannot remove the document root")
+            document = value
+            continue
+
+        *parents, last = [_unescape(token) for token in path[1:].split('/')]
+        target = document
+        for token in parents:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+
+        if isinstance(target, list):
+            index = len(target) if last == '-' else int(last)
+            if op == 'add':
+                target.insert(index, value)
+            elif op == 'remove':
+                del target[index]
+            elif op == 'replace':
+                target[index] = value
+            else:
+                raise ValueError(f"Unsupported patch operation: {op}")
+        else:
+            if op in ('add', 'replace'):
+                target[last] = value
+            elif op == 'remove':
+                del target[last]
+            else:
+                raise ValueError(f"Unsupported patch operation: {op}")
+    return document
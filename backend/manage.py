@@ -0,0 +1,114 @@
+"""
+Database management commands
+
+Usage (from backend/):
+    python manage.py migrate [revision]    Upgrade to the latest (or given) revision
+    python manage.py status                Show the database revision and pending migrations
+    python manage.py downgrade <revision>  Roll back to a revision
+    python manage.py stamp <revision>      Mark the database as at a revision without running DDL
+    python manage.py revision -m "msg"     Create a new migration script (compares models with the database)
+    python manage.py compact-versions      Apply the version history retention policy once
+"""
+
+import argparse
+import asyncio
+import sys
+
+from alembic import command
+from alembic.script import ScriptDirectory
+
+from database import alembic_config, current_revision, engine, head_revision, run_migrations
+
+
+def get_current_revision():
+    async def query():
+        try:
+            return await current_revision()
+        finally:
+            await engine.dispose()
+    return asyncio.run(query())
+
+
+def migrate(args):
+    run_migrations(args.revision)
+    print(f"✅ Database at revision {get_current_revision()}")
+
+
+def status(args):
+    current = get_current_revision()
+    head = head_revision()
+    print(f"Database revision: {current or 'unversioned'}")
+    print(f"Latest revision:   {head}")
+    if current == head:
+        print("✅ Up to date")
+        return
+
+    script = ScriptDirectory.from_config(alembic_config())
+    pending = list(script.iterate_revisions(head, current))
+    print(f"{len(pending)} pending migration(s):")
+    for rev in reversed(pending):
+        print(f"  {rev.revision}  {rev.doc}")
+    sys.exit(1)
+
+
+def downgrade(args):
+    command.downgrade(alembic_config(), args.revision)
+
+
+def stamp(args):
+    command.stamp(alembic_config(), args.revision)
+
+
+def revision(args):
+    command.revision(alembic_config(), message=args.message, autogenerate=args.autogenerate)
+
+
+def compact_versions(args):
+    from version_retention import version_compactor
+
+    async def run():
+        try:
+            return await version_compactor.run_once()
+        finally:
+            await engine.dispose()
+    totals = asyncio.run(run())
+    if totals is None:
+        print("Another process is compacting version history; nothing done")
+        return
+    print(f"✅ Removed {totals['reclaimed']} version(s) from {totals['resumes']} resume(s), "
+          f"rebased {totals['rebased']}, skipped {totals['skipped_locked']} locked")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VitaeCraft database management")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('migrate', help="upgrade the database schema")
+    p.add_argument('revision', nargs='?', default='head')
+    p.set_defaults(func=migrate)
+
+    p = commands.add_parser('status', help="show current and pending migrations (exit 1 if behind)")
+    p.set_defaults(func=status)
+
+    p = commands.add_parser('downgrade', help="roll back to a revision")
+    p.add_argument('revision')
+    p.set_defaults(func=downgrade)
+
+    p = commands.add_parser('stamp', help="set the recorded revision without running migrations")
+    p.add_argument('revision')
+    p.set_defaults(func=stamp)
+
+    p = commands.add_parser('revision', help="create a new migration script")
+    p.add_argument('-m', '--message', required=True)
+    p.add_argument('--autogenerate', action='store_true', help="diff the models against the database")
+    p.set_defaults(func=revision)
+
+    p = commands.add_parser('compact-versions', help="prune version history per the retention policy")
+    p.set_defaults(func=compact_versions)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
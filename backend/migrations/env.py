@@ -0,0 +1,64 @@
+"""
+Alembic environment
+
+Uses the application's DATABASE_URL and models. Migrations run on their
+own short-lived engine without the statement timeout, whether started
+from manage.py, the alembic CLI or init_db() at boot.
+"""
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from database import Base, DATABASE_URL, create_migration_engine
+import models  # noqa: F401  (registers the tables on Base.metadata)
+
+config = context.config
+
+# Leave the application's logging alone when it runs migrations in-process
+if config.config_file_name is not None and config.attributes.get('configure_logger', True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Held for the duration of a migration run so concurrent boots/deploys queue up
+MIGRATION_LOCK_KEY = 741_285_001
+
+
+def run_migrations_offline():
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection):
+    connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    connection.commit()
+    try:
+        context.configure(connection=connection, target_metadata=target_metadata, compare_type=True)
+        with context.begin_transaction():
+            context.run_migrations()
+    finally:
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.commit()
+
+
+async def run_async_migrations():
+    engine = create_migration_engine()
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_async_migrations())
@@ -0,0 +1,187 @@
+"""Baseline schema
+
+Creates the tables as they stood before migrations were introduced. Tables
+that already exist (databases set up by the old create_all() boot path) are
+left alone, and the column fixups that used to run on every boot are
+applied once here.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamps(*names):
+    return [sa.Column(name, sa.DateTime(timezone=True), nullable=True) for name in names]
+
+
+def _create_table(name, *columns, indexes=()):
+    """Create a table and its indexes unless a pre-migrations boot already did"""
+    if sa.inspect(op.get_bind()).has_table(name):
+        return
+    op.create_table(name, *columns)
+    for index_name, index_columns, unique in indexes:
+        op.create_index(index_name, name, index_columns, unique=unique)
+
+
+def upgrade():
+    _create_table(
+        'users',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('email', sa.String(255), nullable=False),
+        sa.Column('password', sa.String(255), nullable=False),
+        sa.Column('full_name', sa.String(255), nullable=False),
+        sa.Column('is_premium', sa.Boolean(), nullable=True),
+        sa.Column('subscription_type', sa.String(50), nullable=True),
+        sa.Column('email_verified', sa.Boolean(), nullable=True),
+        sa.Column('verification_token', sa.String(255), nullable=True),
+        *_timestamps('created_at', 'updated_at'),
+        indexes=[('ix_users_email', ['email'], True)],
+    )
+    _create_table(
+        'resumes',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('title', sa.String(255), nullable=False),
+        sa.Column('template', sa.String(50), nullable=True),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.Column('ats_score', sa.Float(), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=True),
+        sa.Column('is_public', sa.Boolean(), nullable=True),
+        sa.Column('public_slug', sa.String(255), nullable=True),
+        sa.Column('public_password', sa.String(255), nullable=True),
+        *_timestamps('created_at', 'updated_at'),
+        indexes=[
+            ('ix_resumes_user_id', ['user_id'], False),
+            ('ix_resumes_public_slug', ['public_slug'], True),
+        ],
+    )
+    _create_table(
+        'resume_versions',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('resume_id', UUID(as_uuid=True), sa.ForeignKey('resumes.id'), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(255), nullable=False),
+        sa.Column('template', sa.String(50), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=False),
+        *_timestamps('created_at'),
+        indexes=[
+            ('ix_resume_versions_resume_id', ['resume_id'], False),
+            ('ix_resume_versions_resume_version', ['resume_id', 'version'], True),
+        ],
+    )
+    _create_table(
+        'cover_letters',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('resume_id', UUID(as_uuid=True), sa.ForeignKey('resumes.id'), nullable=True),
+        sa.Column('title', sa.String(255), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('company_name', sa.String(255), nullable=True),
+        sa.Column('job_description', sa.Text(), nullable=True),
+        *_timestamps('created_at', 'updated_at'),
+        indexes=[('ix_cover_letters_user_id', ['user_id'], False)],
+    )
+    _create_table(
+        'password_resets',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('token', sa.String(255), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('used', sa.Boolean(), nullable=True),
+        *_timestamps('created_at'),
+        indexes=[
+            ('ix_password_resets_user_id', ['user_id'], False),
+            ('ix_password_resets_token', ['token'], True),
+        ],
+    )
+    _create_table(
+        'payment_transactions',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('session_id', sa.String(255), nullable=False),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('plan', sa.String(50), nullable=False),
+        sa.Column('status', sa.String(50), nullable=True),
+        sa.Column('payment_status', sa.String(50), nullable=True),
+        *_timestamps('created_at', 'completed_at'),
+        indexes=[
+            ('ix_payment_transactions_session_id', ['session_id'], True),
+            ('ix_payment_transactions_user_id', ['user_id'], False),
+        ],
+    )
+    _create_table(
+        'resume_analytics',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('resume_id', UUID(as_uuid=True), sa.ForeignKey('resumes.id'), nullable=False),
+        sa.Column('view_count', sa.Integer(), nullable=True),
+        sa.Column('download_count', sa.Integer(), nullable=True),
+        sa.Column('ats_score_history', sa.JSON(), nullable=True),
+        *_timestamps('last_viewed', 'last_downloaded', 'updated_at'),
+        indexes=[('ix_resume_analytics_resume_id', ['resume_id'], True)],
+    )
+    _create_table(
+        'user_preferences',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('theme', sa.String(20), nullable=True),
+        *_timestamps('created_at', 'updated_at'),
+        indexes=[('ix_user_preferences_user_id', ['user_id'], True)],
+    )
+    _create_table(
+        'public_resumes',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('resume_id', UUID(as_uuid=True), sa.ForeignKey('resumes.id'), nullable=False),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('slug', sa.String(255), nullable=False),
+        sa.Column('password_hash', sa.String(255), nullable=True),
+        sa.Column('is_password_protected', sa.Boolean(), nullable=True),
+        sa.Column('view_count', sa.Integer(), nullable=True),
+        *_timestamps('created_at'),
+        indexes=[
+            ('ix_public_resumes_resume_id', ['resume_id'], True),
+            ('ix_public_resumes_user_id', ['user_id'], False),
+            ('ix_public_resumes_slug', ['slug'], True),
+        ],
+    )
+
+    # Column fixups for resume_analytics tables created by older releases
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                          WHERE table_name='resume_analytics' AND column_name='ats_score_history') THEN
+                ALTER TABLE resume_analytics ADD COLUMN ats_score_history JSONB DEFAULT '[]';
+            END IF;
+
+            IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                          WHERE table_name='resume_analytics' AND column_name='last_viewed') THEN
+                ALTER TABLE resume_analytics ADD COLUMN last_viewed TIMESTAMP WITH TIME ZONE;
+            END IF;
+
+            IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                          WHERE table_name='resume_analytics' AND column_name='last_downloaded') THEN
+                ALTER TABLE resume_analytics ADD COLUMN last_downloaded TIMESTAMP WITH TIME ZONE;
+            END IF;
+
+            IF EXISTS (SELECT 1 FROM information_schema.columns
+                      WHERE table_name='resume_analytics' AND column_name='last_viewed_at') THEN
+                ALTER TABLE resume_analytics DROP COLUMN last_viewed_at;
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade():
+    for table in ('public_resumes', 'user_preferences', 'resume_analytics', 'payment_transactions',
+                  'password_resets', 'cover_letters', 'resume_versions', 'resumes', 'users'):
+        op.drop_table(table)
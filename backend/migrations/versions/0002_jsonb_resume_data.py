@@ -0,0 +1,129 @@
+"""Store resume data and ATS history as JSONB with a GIN index
+
+Converts resumes.data, resume_versions.data and
+resume_analytics.ats_score_history from json to jsonb without holding a
+table lock for the length of a rewrite:
+
+1. add a shadow jsonb column, kept in sync by a trigger for concurrent writes
+2. backfill it in small keyset batches, each committed on its own
+3. swap the columns in one short transaction (NOT NULL comes from a
+   CHECK constraint validated beforehand, so the swap doesn't scan)
+
+The GIN index is then built with CREATE INDEX CONCURRENTLY.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# (table, column, NOT NULL)
+COLUMNS = (
+    ('resumes', 'data', True),
+    ('resume_versions', 'data', True),
+    ('resume_analytics', 'ats_score_history', False),
+)
+
+
+def _column_type(table, column):
+    return op.get_bind().execute(sa.text(
+        "SELECT data_type FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column"
+    ), {"table": table, "column": column}).scalar()
+
+
+def _prepare(table, column, not_null):
+    shadow = f"{column}_jsonb"
+    op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {shadow} JSONB")
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {table}_{shadow}_sync() RETURNS trigger AS $$
+        BEGIN
+            NEW.{shadow} := NEW.{column}::jsonb;
+            RETURN NEW;
+        END $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"DROP TRIGGER IF EXISTS {table}_{shadow}_sync ON {table}")
+    op.execute(f"""
+        CREATE TRIGGER {table}_{shadow}_sync BEFORE INSERT OR UPDATE OF {column} ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {table}_{shadow}_sync()
+    """)
+    if not_null:
+        # Replaced rather than added: a run that failed during the backfill
+        # leaves it committed
+        op.execute(f"""
+            ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_{shadow}_not_null,
+            ADD CONSTRAINT {table}_{shadow}_not_null CHECK ({shadow} IS NOT NULL) NOT VALID
+        """)
+
+
+def _backfill(table, column):
+    """Copy existing rows in id order, one committed batch at a time"""
+    bind = op.get_bind()
+    shadow = f"{column}_jsonb"
+    statement = sa.text(f"""
+        WITH batch AS (
+            SELECT id FROM {table} WHERE id > :after ORDER BY id LIMIT :limit
+        )
+        UPDATE {table} SET {shadow} = {table}.{column}::jsonb
+        FROM batch WHERE {table}.id = batch.id
+        RETURNING {table}.id
+    """)
+    after = '00000000-0000-0000-0000-000000000000'
+    while True:
+        ids = bind.execute(statement, {"after": after, "limit": BATCH_SIZE}).scalars().all()
+        if not ids:
+            return
+        after = max(ids)
+
+
+def _swap(table, column, not_null):
+    shadow = f"{column}_jsonb"
+    op.execute(f"DROP TRIGGER {table}_{shadow}_sync ON {table}")
+    op.execute(f"DROP FUNCTION {table}_{shadow}_sync()")
+    op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+    op.execute(f"ALTER TABLE {table} RENAME COLUMN {shadow} TO {column}")
+    if not_null:
+        # Uses the validated CHECK instead of scanning the table
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {table}_{shadow}_not_null")
+
+
+def upgrade():
+    # Older releases created ats_score_history as JSONB already
+    pending = [(t, c, n) for t, c, n in COLUMNS if _column_type(t, c) == 'json']
+
+    for table, column, not_null in pending:
+        _prepare(table, column, not_null)
+
+    with op.get_context().autocommit_block():
+        for table, column, not_null in pending:
+            _backfill(table, column)
+            if not_null:
+                # Only blocks schema changes, not reads or writes
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_jsonb_not_null")
+
+    for table, column, not_null in pending:
+        op.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        _swap(table, column, not_null)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_resumes_data_gin "
+            "ON resumes USING gin (data jsonb_path_ops)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_resumes_data_gin")
+    for table, column, _ in COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSON USING {column}::json")
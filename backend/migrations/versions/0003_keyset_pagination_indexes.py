@@ -0,0 +1,36 @@
+"""Composite indexes for keyset-paginated listings
+
+Each listing filters on the owner and pages newest-first on
+(created_at, id); a btree on (user_id, created_at, id) serves that as a
+backward range scan. Version history pages on (resume_id, version),
+which ix_resume_versions_resume_version already covers.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_resumes_user_created', 'resumes'),
+    ('ix_cover_letters_user_created', 'cover_letters'),
+    ('ix_payment_transactions_user_created', 'payment_transactions'),
+)
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} (user_id, created_at, id)")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,68 @@
+"""Delta-compressed resume versions
+
+History rows either keep the full document (data, a keyframe) or a JSON
+patch against another version (patch + base_version); see
+version_history.py. Existing rows all hold full documents, so they stay
+valid as keyframes and no data is rewritten.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('resume_versions', sa.Column('patch', JSONB(), nullable=True))
+    op.add_column('resume_versions', sa.Column('base_version', sa.Integer(), nullable=True))
+    op.alter_column('resume_versions', 'data', nullable=True)
+    # Adding the constraint NOT VALID is instant. VALIDATE then scans the
+    # existing rows under a lock that doesn't block writes, so it runs in
+    # its own transaction rather than under the ACCESS EXCLUSIVE lock above.
+    op.execute("""
+        ALTER TABLE resume_versions ADD CONSTRAINT ck_resume_versions_data_or_patch
+        CHECK ((data IS NULL) <> (patch IS NULL)) NOT VALID
+    """)
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE resume_versions VALIDATE CONSTRAINT ck_resume_versions_data_or_patch")
+
+
+def downgrade():
+    # The old schema needs every row in full: rebuild deltas newest-first
+    from json_patch import apply_patch
+
+    bind = op.get_bind()
+    resume_ids = bind.execute(sa.text(
+        "SELECT DISTINCT resume_id FROM resume_versions WHERE data IS NULL"
+    )).scalars().all()
+    for resume_id in resume_ids:
+        current = bind.execute(sa.text("SELECT version, data FROM resumes WHERE id = :id"), {"id": resume_id}).one()
+        documents = {current.version: current.data}
+        rows = bind.execute(sa.text(
+            "SELECT id, version, data, patch, base_version FROM resume_versions "
+            "WHERE resume_id = :id ORDER BY version DESC"
+        ), {"id": resume_id}).all()
+        for row in rows:
+            data = row.data
+            if data is None:
+                data = apply_patch(documents[row.base_version], row.patch)
+                bind.execute(sa.text(
+                    "UPDATE resume_versions SET data = CAST(:data AS JSONB), patch = NULL, base_version = NULL "
+                    "WHERE id = :id"
+                ), {"id": row.id, "data": json.dumps(data)})
+            documents[row.version] = data
+
+    op.drop_constraint('ck_resume_versions_data_or_patch', 'resume_versions')
+    op.alter_column('resume_versions', 'data', nullable=False)
+    op.drop_column('resume_versions', 'base_version')
+    op.drop_column('resume_versions', 'patch')
@@ -0,0 +1,32 @@
+"""Track the open autosave window on resumes
+
+Saves from the same editor session within AUTOSAVE_COALESCE_SECONDS of
+the first one share a single history entry; these columns record which
+session opened the current window and when. Coalescing leaves gaps in
+the recorded version numbers, so keyframe placement now tracks the
+newest recorded version instead of relying on version % interval.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('resumes', sa.Column('autosave_session', sa.String(80), nullable=True))
+    op.add_column('resumes', sa.Column('autosave_started_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('resumes', sa.Column('last_history_version', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('resumes', 'last_history_version')
+    op.drop_column('resumes', 'autosave_started_at')
+    op.drop_column('resumes', 'autosave_session')
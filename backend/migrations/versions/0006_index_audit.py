@@ -0,0 +1,51 @@
+"""Index hot lookups and drop indexes the composites made redundant
+
+- users.verification_token: verify-email looks users up by token. Only
+  unverified users have one, so the index is partial.
+- cover_letters.resume_id: deleting a resume checks the foreign key from
+  cover_letters, which scanned the whole table.
+
+The (user_id, created_at, id) composites from 0003 serve listings in
+either direction, and any lookup on user_id alone, so the single-column
+user_id indexes on those tables (and resume_versions.resume_id, a prefix
+of the unique (resume_id, version) index) only slowed down writes.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+NEW_INDEXES = (
+    ('ix_users_verification_token', 'users (verification_token) WHERE verification_token IS NOT NULL'),
+    ('ix_cover_letters_resume_id', 'cover_letters (resume_id)'),
+)
+
+REDUNDANT_INDEXES = (
+    ('ix_resumes_user_id', 'resumes (user_id)'),
+    ('ix_cover_letters_user_id', 'cover_letters (user_id)'),
+    ('ix_payment_transactions_user_id', 'payment_transactions (user_id)'),
+    ('ix_resume_versions_resume_id', 'resume_versions (resume_id)'),
+)
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, definition in NEW_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+        for name, _ in REDUNDANT_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, definition in REDUNDANT_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+        for name, _ in NEW_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
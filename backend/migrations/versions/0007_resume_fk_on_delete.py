@@ -0,0 +1,54 @@
+"""Let the database remove a resume's dependent rows
+
+Deleting a resume is now a single DELETE statement, so the foreign keys
+into resumes take over what the ORM cascade did: versions, analytics
+and public links are removed with the resume, and cover letters written
+for it are kept with resume_id cleared (previously they blocked the
+delete). Constraints are swapped as NOT VALID and validated afterwards,
+so existing rows are checked without blocking writes.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# (table, ON DELETE action)
+FOREIGN_KEYS = (
+    ('resume_versions', 'CASCADE'),
+    ('resume_analytics', 'CASCADE'),
+    ('public_resumes', 'CASCADE'),
+    ('cover_letters', 'SET NULL'),
+)
+
+
+def _replace(table, action):
+    op.execute(
+        f"ALTER TABLE {table} DROP CONSTRAINT {table}_resume_id_fkey, "
+        f"ADD CONSTRAINT {table}_resume_id_fkey FOREIGN KEY (resume_id) "
+        f"REFERENCES resumes(id) ON DELETE {action} NOT VALID"
+    )
+
+
+def _validate():
+    with op.get_context().autocommit_block():
+        for table, _ in FOREIGN_KEYS:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_resume_id_fkey")
+
+
+def upgrade():
+    for table, action in FOREIGN_KEYS:
+        _replace(table, action)
+    _validate()
+
+
+def downgrade():
+    for table, _ in FOREIGN_KEYS:
+        _replace(table, 'NO ACTION')
+    _validate()
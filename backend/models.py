@@ -2,8 +2,8 @@
 SQLAlchemy ORM Models
 """
 
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, Float, Text, ForeignKey, JSON, Index
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Float, Text, ForeignKey, Index, CheckConstraint, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import uuid
@@ -31,28 +31,46 @@ class User(Base):
     password_resets = relationship("PasswordReset", back_populates="user", cascade="all, delete-orphan")
     payments = relationship("PaymentTransaction", back_populates="user", cascade="all, delete-orphan")
 
+    # Email verification lookups; only unverified users have a token
+    __table_args__ = (
+        Index('ix_users_verification_token', 'verification_token', postgresql_where=text('verification_token IS NOT NULL')),
+    )
+
 
 class Resume(Base):
     """Resume Model"""
     __tablename__ = "resumes"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     title = Column(String(255), nullable=False)
     template = Column(String(50), default="professional")  # professional, modern, minimalist
-    data = Column(JSON, nullable=False, default={})  # Structured resume data
+    data = Column(JSONB, nullable=False, default={})  # Structured resume data
     ats_score = Column(Float, default=0)
     version = Column(Integer, default=1)
     is_public = Column(Boolean, default=False)
     public_slug = Column(String(255), unique=True, nullable=True, index=True)
     public_password = Column(String(255), nullable=True)
+    # Editor session whose saves are currently coalesced into one history entry
+    autosave_session = Column(String(80), nullable=True)
+    autosave_started_at = Column(DateTime(timezone=True), nullable=True)
+    # Newest version recorded in resume_versions (keyframe placement)
+    last_history_version = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     # Relationships
     user = relationship("User", back_populates="resumes")
-    versions = relationship("ResumeVersion", back_populates="resume", cascade="all, delete-orphan")
-    analytics = relationship("ResumeAnalytics", back_populates="resume", cascade="all, delete-orphan", uselist=False)
+    # Dependent rows are removed by ON DELETE CASCADE rather than loaded and deleted one by one
+    versions = relationship("ResumeVersion", back_populates="resume", cascade="all, delete-orphan", passive_deletes=True)
+    analytics = relationship("ResumeAnalytics", back_populates="resume", cascade="all, delete-orphan", uselist=False, passive_deletes=True)
+
+    __table_args__ = (
+        # Keyset pagination of a user's resumes, newest first
+        Index('ix_resumes_user_created', 'user_id', 'created_at', 'id'),
+        # Containment queries on data (e.g. resumes listing a skill)
+        Index('ix_resumes_data_gin', 'data', postgresql_using='gin', postgresql_ops={'data': 'jsonb_path_ops'}),
+    )
 
 
 class ResumeVersion(Base):
@@ -60,18 +78,25 @@ class ResumeVersion(Base):
     __tablename__ = "resume_versions"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id"), nullable=False, index=True)
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False)
     version = Column(Integer, nullable=False)
     title = Column(String(255), nullable=False)
     template = Column(String(50), nullable=False)
-    data = Column(JSON, nullable=False)
+    # Keyframes hold the full document in data; other rows hold a JSON patch
+    # that turns base_version's document into this one (see version_history.py)
+    data = Column(JSONB, nullable=True)
+    patch = Column(JSONB, nullable=True)
+    base_version = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     # Relationships
     resume = relationship("Resume", back_populates="versions")
 
-    # Index for fast lookup
-    __table_args__ = (Index('ix_resume_versions_resume_version', 'resume_id', 'version', unique=True),)
+    # Index for fast lookup (also serves lookups on resume_id alone)
+    __table_args__ = (
+        Index('ix_resume_versions_resume_version', 'resume_id', 'version', unique=True),
+        CheckConstraint('(data IS NULL) <> (patch IS NULL)', name='ck_resume_versions_data_or_patch'),
+    )
 
 
 class CoverLetter(Base):
@@ -79,8 +104,8 @@ class CoverLetter(Base):
     __tablename__ = "cover_letters"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
-    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id"), nullable=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id", ondelete="SET NULL"), nullable=True)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     company_name = Column(String(255), nullable=True)
@@ -91,6 +116,13 @@ class CoverLetter(Base):
     # Relationships
     user = relationship("User", back_populates="cover_letters")
 
+    __table_args__ = (
+        # Keyset pagination of a user's cover letters, newest first
+        Index('ix_cover_letters_user_created', 'user_id', 'created_at', 'id'),
+        # Foreign key checks when a resume is deleted
+        Index('ix_cover_letters_resume_id', 'resume_id'),
+    )
+
 
 class PasswordReset(Base):
     """Password Reset Tokens"""
@@ -113,7 +145,7 @@ class PaymentTransaction(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(String(255), unique=True, nullable=False, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     amount = Column(Float, nullable=False)
     plan = Column(String(50), nullable=False)  # 'early_bird', 'lifetime'
     status = Column(String(50), default="pending")  # pending, completed, failed
@@ -124,16 +156,19 @@ class PaymentTransaction(Base):
     # Relationships
     user = relationship("User", back_populates="payments")
 
+    # Keyset pagination of payment history, newest first
+    __table_args__ = (Index('ix_payment_transactions_user_created', 'user_id', 'created_at', 'id'),)
+
 
 class ResumeAnalytics(Base):
     """Resume View/Download Analytics"""
     __tablename__ = "resume_analytics"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id"), unique=True, nullable=False, index=True)
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id", ondelete="CASCADE"), unique=True, nullable=False, index=True)
     view_count = Column(Integer, default=0)
     download_count = Column(Integer, default=0)
-    ats_score_history = Column(JSON, default=[])
+    ats_score_history = Column(JSONB, default=[])
     last_viewed = Column(DateTime(timezone=True), nullable=True)
     last_downloaded = Column(DateTime(timezone=True), nullable=True)
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -158,7 +193,7 @@ class PublicResume(Base):
     __tablename__ = "public_resumes"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id"), unique=True, nullable=False, index=True)
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id", ondelete="CASCADE"), unique=True, nullable=False, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     slug = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=True)
@@ -0,0 +1,99 @@
+"""
+Keyset (cursor) pagination for list endpoints
+
+Pages are selected with a row-value comparison against the last row of
+the previous page, e.g. (created_at, id) < (:created_at, :id), so each
+page is an index range scan no matter how deep the client has paged.
+List bodies stay plain JSON arrays; the cursor for the next page, when
+there is one, is returned in the X-Next-Cursor response header. A request
+with neither limit nor cursor gets every row, as before pagination.
+"""
+
+import base64
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.sql import Select
+
+DEFAULT_PAGE_SIZE = int(os.environ.get('PAGE_SIZE_DEFAULT', 100))
+MAX_PAGE_SIZE = int(os.environ.get('PAGE_SIZE_MAX', 500))
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def _cursor_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, int):
+        return value
+    return str(value)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque cursor for the given sort key values"""
+    raw = json.dumps([_cursor_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Sort key values from a cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def page_size(limit: Optional[int], cursor: Optional[str] = None, default: Optional[int] = None) -> Optional[int]:
+    """Rows per page, or None for all rows (no limit, cursor or endpoint default)"""
+    if limit is None:
+        if default is not None:
+            return default
+        return DEFAULT_PAGE_SIZE if cursor else None
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def _limit(query: Select, limit: Optional[int]) -> Select:
+    """One extra row to detect a next page; no limit when fetching every row"""
+    return query if limit is None else query.limit(limit + 1)
+
+
+def paginate_by_created(query: Select, created_col, id_col, cursor: Optional[str], limit: Optional[int]) -> Select:
+    """Newest first on (created_at, id)"""
+    if cursor:
+        created, row_id = decode_cursor(cursor, 2)
+        try:
+            after = datetime.fromisoformat(created)
+            after_id = uuid.UUID(str(row_id))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        query = query.where(
+            tuple_(created_col, id_col) < tuple_(literal(after, created_col.type), literal(after_id, id_col.type))
+        )
+    return _limit(query.order_by(created_col.desc(), id_col.desc()), limit)
+
+
+def paginate_by_column(query: Select, column, cursor: Optional[str], limit: Optional[int]) -> Select:
+    """Descending on a single unique integer column (e.g. version number)"""
+    if cursor:
+        (after,) = decode_cursor(cursor, 1)
+        if not isinstance(after, int):
+            raise ValueError("Invalid cursor")
+        query = query.where(column < after)
+    return _limit(query.order_by(column.desc()), limit)
+
+
+def split_page(rows: Sequence, limit: Optional[int], key: Callable[[Any], Tuple]) -> Tuple[Sequence, Optional[str]]:
+    """Trim the look-ahead row and build the next cursor from the last row kept"""
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
@@ -0,0 +1,166 @@
+"""
+TrueType fallback fonts for non-Latin resume content
+
+The templates are designed around the base-14 Helvetica faces, which only
+cover WinAnsi (roughly Latin-1). Runs of text outside that set are tagged
+with the first fallback family in the chain that has the glyphs. Families
+are loaded and registered with ReportLab once per process, and ReportLab
+embeds only the subset of glyphs each document actually uses.
+
+backend/fonts ships DejaVu Sans (Latin, Greek, Cyrillic) and IPAexGothic
+(Japanese kana and kanji, which covers most Chinese text too), so
+deployments without system fonts still have a fallback.
+"""
+
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+
+logger = logging.getLogger(__name__)
+
+# Extra directories (os.pathsep separated) searched before the bundled and system ones
+PDF_FONT_DIRS = [d for d in os.environ.get('PDF_FONT_DIRS', '').split(os.pathsep) if d]
+
+_DEFAULT_FONT_DIRS = [
+    str(Path(__file__).resolve().parent / 'fonts'),
+    '/usr/share/fonts',
+    '/usr/local/share/fonts',
+]
+
+# Fallback chain, tried in order: (family, regular file, bold file)
+FALLBACK_FAMILIES: Tuple[Tuple[str, str, str], ...] = (
+    ('NotoSans', 'NotoSans-Regular.ttf', 'NotoSans-Bold.ttf'),
+    ('DejaVuSans', 'DejaVuSans.ttf', 'DejaVuSans-Bold.ttf'),
+    ('NotoSansDevanagari', 'NotoSansDevanagari-Regular.ttf', 'NotoSansDevanagari-Bold.ttf'),
+    ('NotoSansSC', 'NotoSansSC-Regular.ttf', 'NotoSansSC-Bold.ttf'),
+    ('IPAexGothic', 'ipaexg.ttf', ''),
+    ('DroidSansFallback', 'DroidSansFallbackFull.ttf', ''),
+)
+
+
+@dataclass(frozen=True)
+class FallbackFont:
+    regular: str
+    bold: str
+    coverage: FrozenSet[int]
+
+
+def _index_font_files() -> Dict[str, str]:
+    """Map font file names to paths, first directory wins"""
+    found: Dict[str, str] = {}
+    for root in PDF_FONT_DIRS + _DEFAULT_FONT_DIRS:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.lower().endswith('.ttf'):
+                    found.setdefault(filename, os.path.join(dirpath, filename))
+    return found
+
+
+def _register(name: str, path: str) -> Optional[TTFont]:
+    try:
+        font = TTFont(name, path)
+    except (TTFError, OSError) as e:
+        # CFF-flavoured (OpenType/PostScript) files can't be embedded by ReportLab
+        logger.warning(f"Skipping font {path}: {str(e)}")
+        return None
+    pdfmetrics.registerFont(font)
+    return font
+
+
+@lru_cache(maxsize=None)
+def font_set_id() -> str:
+    """
+    Short fingerprint of the fallback font files this process would load,
+    for cache keys: PDFs rendered with another font set (or none) differ.
+    """
+    files = _index_font_files()
+    found = []
+    for family, regular_file, bold_file in FALLBACK_FAMILIES:
+        for filename in (regular_file, bold_file):
+            if filename in files:
+                found.append(f"{filename}:{os.path.getsize(files[filename])}")
+    return hashlib.sha256('|'.join(found).encode('utf-8')).hexdigest()[:12]
+
+
+@lru_cache(maxsize=None)
+def fallback_fonts() -> Tuple[FallbackFont, ...]:
+    """Load and register the available fallback families (once per process)"""
+    files = _index_font_files()
+    fonts: List[FallbackFont] = []
+    for family, regular_file, bold_file in FALLBACK_FAMILIES:
+        if regular_file not in files:
+            continue
+        regular = _register(family, files[regular_file])
+        if regular is None:
+            continue
+        bold_name = family
+        if bold_file in files and _register(f"{family}-Bold", files[bold_file]) is not None:
+            bold_name = f"{family}-Bold"
+        fonts.append(FallbackFont(
+            regular=family,
+            bold=bold_name,
+            coverage=frozenset(regular.face.charToGlyph),
+        ))
+    if not fonts:
+        logger.warning(
+            "No fallback fonts found; text outside Latin-1 will render as empty boxes. "
+            "Add TTF files to backend/fonts or set PDF_FONT_DIRS."
+        )
+    return tuple(fonts)
+
+
+def _in_base_fonts(char: str) -> bool:
+    # Helvetica and friends are WinAnsi-encoded
+    try:
+        char.encode('cp1252')
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+@lru_cache(maxsize=8192)
+def _font_for_char(char: str) -> Optional[FallbackFont]:
+    """None when the base font can draw char (or no fallback can)"""
+    if _in_base_fonts(char):
+        return None
+    code = ord(char)
+    for font in fallback_fonts():
+        if code in font.coverage:
+            return font
+    return None
+
+
+def with_fallback_fonts(text: str, font_name: str) -> str:
+    """
+    Wrap runs the paragraph's base font can't draw in <font> tags for the
+    first fallback family covering them. Text the base font covers
+    entirely (the common case) is returned unchanged.
+    """
+    if text.isascii():
+        return text
+
+    bold = 'Bold' in font_name
+    runs: List[str] = []
+    current: Optional[FallbackFont] = None
+    start = 0
+    for i, char in enumerate(text):
+        font = _font_for_char(char)
+        if font is not current:
+            runs.append(_tagged(text[start:i], current, bold))
+            current, start = font, i
+    runs.append(_tagged(text[start:], current, bold))
+    return ''.join(runs)
+
+
+def _tagged(run: str, font: Optional[FallbackFont], bold: bool) -> str:
+    if not run or font is None:
+        return run
+    return f'<font face="{font.bold if bold else font.regular}">{run}</font>'
+
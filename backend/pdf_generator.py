@@ -0,0 +1,573 @@
+"""
+PDF Generation for resume templates
+
+Kept free of web/database imports so it can be loaded by render worker
+processes without pulling in the API application.
+
+Templates are compiled once at import time into an immutable style set and
+an ordered section plan, then looked up by name for every render.
+"""
+
+import io
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Flowable, LayoutError
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+
+from pdf_fonts import with_fallback_fonts
+from resume_document import ResumeDocument
+
+DEFAULT_TEMPLATE = 'professional'
+
+# A section builder turns a resume document into flowables using the template's styles
+SectionBuilder = Callable[[Mapping[str, ParagraphStyle], ResumeDocument], List[Flowable]]
+
+
+@dataclass(frozen=True)
+class PdfTemplate:
+    """A compiled resume template"""
+    name: str
+    margins: Tuple[float, float, float, float]  # top, bottom, left, right
+    styles: Mapping[str, ParagraphStyle]
+    sections: Tuple[Tuple[str, SectionBuilder], ...]
+
+
+_TEMPLATES: Dict[str, PdfTemplate] = {}
+
+
+def register_template(name: str, margins: Tuple[float, float, float, float],
+                      styles: Dict[str, dict], sections: Sequence[Tuple[str, SectionBuilder]]) -> PdfTemplate:
+    """Compile a template's style definitions and section plan and make it available by name"""
+    compiled = MappingProxyType({
+        role: ParagraphStyle(name=f"{name}.{role}", **attrs)
+        for role, attrs in styles.items()
+    })
+    template = PdfTemplate(name=name, margins=margins, styles=compiled, sections=tuple(sections))
+    _TEMPLATES[name] = template
+    return template
+
+
+def resolve_template(template: str) -> str:
+    """Map unknown or empty template names to the default template"""
+    return template if template in _TEMPLATES else DEFAULT_TEMPLATE
+
+
+def get_template(template: str) -> PdfTemplate:
+    return _TEMPLATES[resolve_template(template)]
+
+
+def template_names() -> List[str]:
+    return list(_TEMPLATES)
+
+
+def build_sections(template: PdfTemplate, document: ResumeDocument,
+                   styles: Optional[Mapping[str, ParagraphStyle]] = None) -> List[Tuple[str, List[Flowable]]]:
+    """Run the template's section plan, skipping sections with no content"""
+    styles = styles or template.styles
+    sections = []
+    for key, builder in template.sections:
+        flowables = builder(styles, document)
+        if flowables:
+            sections.append((key, flowables))
+    return sections
+
+
+def _paragraph(text: str, style: ParagraphStyle) -> Paragraph:
+    """Paragraph with non-Latin runs switched to a fallback font that has the glyphs"""
+    return Paragraph(with_fallback_fonts(text, style.fontName), style)
+
+
+# ============== SCALING & MEASUREMENT ==============
+
+# Auto-fit never shrinks type and spacing below this fraction of the design size
+MIN_FIT_SCALE = float(os.environ.get('PDF_MIN_FIT_SCALE', 0.7))
+
+# SimpleDocTemplate pads its single frame by 6pt on every side
+_FRAME_PADDING = 6
+_FUZZ = 1e-6
+
+
+@dataclass(frozen=True)
+class SectionMeasurement:
+    key: str
+    height: float  # points used on the page, including paragraph spacing
+    first_page: int
+    last_page: int
+
+
+@dataclass(frozen=True)
+class PdfMeasurement:
+    pages: int
+    scale: float
+    sections: Tuple[SectionMeasurement, ...]
+
+    def as_dict(self) -> dict:
+        return {
+            "pages": self.pages,
+            "scale": self.scale,
+            "sections": [
+                {
+                    "key": s.key,
+                    "height": round(s.height, 2),
+                    "first_page": s.first_page,
+                    "last_page": s.last_page,
+                }
+                for s in self.sections
+            ],
+        }
+
+
+def _scale_percent(scale: float) -> int:
+    # Whole percent steps keep the scaled style cache small
+    return max(1, min(100, round(scale * 100)))
+
+
+@lru_cache(maxsize=256)
+def _scaled_styles(template_name: str, percent: int) -> Mapping[str, ParagraphStyle]:
+    """The template's styles with font size, leading and paragraph spacing scaled"""
+    template = _TEMPLATES[template_name]
+    if percent == 100:
+        return template.styles
+    factor = percent / 100
+    return MappingProxyType({
+        role: ParagraphStyle(
+            name=f"{style.name}@{percent}",
+            parent=style,
+            fontSize=style.fontSize * factor,
+            leading=style.leading * factor,
+            spaceBefore=style.spaceBefore * factor,
+            spaceAfter=style.spaceAfter * factor,
+        )
+        for role, style in template.styles.items()
+    })
+
+
+class _MeasureFrame:
+    """
+    Mirrors the placement rules of platypus Frame.add/split and
+    BaseDocTemplate.handle_flowable, but only wraps flowables: nothing is
+    drawn and no PDF is serialized.
+    """
+
+    def __init__(self, width: float, height: float):
+        self.width = width
+        self.height = height
+        self.page = 1
+        self._new_frame()
+
+    def _new_frame(self):
+        self.y = self.height
+        self.at_top = True
+        self.prev_space_after = 0.0
+
+    def _space_before(self, flowable: Flowable) -> float:
+        if self.at_top:
+            return 0.0
+        # Adjacent spaceAfter/spaceBefore overlap (rl_config.overlapAttachedSpace)
+        return max(flowable.getSpaceBefore() - self.prev_space_after, 0)
+
+    def _add(self, flowable: Flowable) -> Optional[float]:
+        """Place flowable if it fits, returning the vertical space it used"""
+        space_before = self._space_before(flowable)
+        available = self.y - space_before
+        if available <= 0:
+            return None
+        _, height = flowable.wrap(self.width, available)
+        if self.y - (height + space_before) < -_FUZZ:
+            return None
+        space_after = flowable.getSpaceAfter()
+        used = space_before + height + space_after
+        if used:
+            self.at_top = False
+        self.y -= used
+        self.prev_space_after = space_after
+        return used
+
+    def place(self, flowable: Flowable) -> float:
+        """Lay out flowable, splitting it or starting new pages as needed"""
+        pending = [flowable]
+        used = 0.0
+        while pending:
+            current = pending.pop(0)
+            placed = self._add(current)
+            if placed is not None:
+                used += placed
+                continue
+
+            available = self.y - self._space_before(current)
+            parts = current.split(self.width, available) if available > 0 else []
+            if parts:
+                placed = self._add(parts[0])
+                if placed is None:
+                    raise LayoutError(f"Splitting error on page {self.page}")
+                used += placed
+                pending[0:0] = parts[1:]
+            elif self.at_top:
+                raise LayoutError(f"Flowable too large on page {self.page}")
+            else:
+                pending.insert(0, current)
+                self.page += 1
+                self._new_frame()
+        return used
+
+
+def measure_pdf(template: str, document: ResumeDocument, scale: float = 1.0) -> PdfMeasurement:
+    """Page count and per-section heights for a render, without building the PDF"""
+    compiled = get_template(template)
+    percent = _scale_percent(scale)
+    top, bottom, left, right = compiled.margins
+    page_width, page_height = letter
+
+    frame = _MeasureFrame(
+        width=page_width - left - right - 2 * _FRAME_PADDING,
+        height=page_height - top - bottom - 2 * _FRAME_PADDING,
+    )
+    sections = []
+    for key, flowables in build_sections(compiled, document, _scaled_styles(compiled.name, percent)):
+        first_page = frame.page
+        height = sum(frame.place(flowable) for flowable in flowables)
+        sections.append(SectionMeasurement(key=key, height=height, first_page=first_page, last_page=frame.page))
+
+    return PdfMeasurement(pages=frame.page, scale=percent / 100, sections=tuple(sections))
+
+
+def fit_scale(template: str, document: ResumeDocument, max_pages: int) -> float:
+    """
+    Largest scale (in whole percent) at which the resume fits in max_pages,
+    found by binary search over measurement passes. Falls back to
+    MIN_FIT_SCALE when even that does not fit.
+    """
+    if measure_pdf(template, document).pages <= max_pages:
+        return 1.0
+
+    low, high = _scale_percent(MIN_FIT_SCALE), 99
+    best = low
+    while low <= high:
+        mid = (low + high) // 2
+        if measure_pdf(template, document, mid / 100).pages <= max_pages:
+            best, low = mid, mid + 1
+        else:
+            high = mid - 1
+    return best / 100
+
+
+def render_pdf(template: str, document: ResumeDocument, fit_pages: Optional[int] = None) -> bytes:
+    """
+    Render a resume to PDF bytes (entry point for render workers). With
+    fit_pages set, type and spacing are scaled down until the resume fits.
+    """
+    compiled = get_template(template)
+    top, bottom, left, right = compiled.margins
+    scale = fit_scale(template, document, fit_pages) if fit_pages else 1.0
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=top, bottomMargin=bottom, leftMargin=left, rightMargin=right, invariant=True)
+
+    styles = _scaled_styles(compiled.name, _scale_percent(scale))
+    story = [flowable for _, flowables in build_sections(compiled, document, styles) for flowable in flowables]
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+# ============== PROFESSIONAL ==============
+
+def _professional_header(styles, doc):
+    story = []
+    personal = doc.personal
+
+    story.append(_paragraph(personal.full_name or 'Your Name', styles['name']))
+
+    contact_parts = []
+    if personal.email: contact_parts.append(personal.email)
+    if personal.phone: contact_parts.append(personal.phone)
+    if personal.location: contact_parts.append(personal.location)
+    if contact_parts:
+        story.append(_paragraph(' | '.join(contact_parts), styles['contact']))
+
+    links = []
+    if personal.linkedin: links.append(f"LinkedIn: {personal.linkedin}")
+    if personal.portfolio: links.append(f"Portfolio: {personal.portfolio}")
+    if links:
+        story.append(_paragraph(' | '.join(links), styles['contact']))
+    return story
+
+
+def _professional_summary(styles, doc):
+    summary = doc.personal.summary
+    if not summary:
+        return []
+    return [
+        _paragraph('PROFESSIONAL SUMMARY', styles['section']),
+        _paragraph(summary, styles['summary']),
+    ]
+
+
+def _professional_experience(styles, doc):
+    story = []
+    if doc.experiences:
+        story.append(_paragraph('EXPERIENCE', styles['section']))
+        for exp in doc.experiences:
+            story.append(_paragraph(exp.position, styles['job']))
+            date_str = f"{exp.start_date} - {exp.end_label}"
+            story.append(_paragraph(f"{exp.company} | {date_str}", styles['company']))
+            if exp.description:
+                story.append(_paragraph(exp.description, styles['bullet']))
+            for achievement in exp.achievements:
+                story.append(_paragraph(f"• {achievement}", styles['bullet']))
+            story.append(Spacer(1, 8))
+    return story
+
+
+def _professional_education(styles, doc):
+    story = []
+    if doc.education:
+        story.append(_paragraph('EDUCATION', styles['section']))
+        for edu in doc.education:
+            story.append(_paragraph(f"{edu.degree} in {edu.field}", styles['job']))
+            date_str = f"{edu.start_date} - {edu.end_date}"
+            gpa_str = f" | GPA: {edu.gpa}" if edu.gpa else ""
+            story.append(_paragraph(f"{edu.institution} | {date_str}{gpa_str}", styles['company']))
+            story.append(Spacer(1, 8))
+    return story
+
+
+def _professional_skills(styles, doc):
+    if not doc.skills:
+        return []
+    return [
+        _paragraph('SKILLS', styles['section']),
+        _paragraph(', '.join(doc.skills), styles['summary']),
+    ]
+
+
+def _professional_projects(styles, doc):
+    story = []
+    if doc.projects:
+        story.append(_paragraph('PROJECTS', styles['section']))
+        for proj in doc.projects:
+            story.append(_paragraph(proj.name, styles['job']))
+            if proj.description:
+                story.append(_paragraph(proj.description, styles['bullet']))
+            if proj.technologies:
+                story.append(_paragraph(f"Technologies: {', '.join(proj.technologies)}", styles['company']))
+            story.append(Spacer(1, 8))
+    return story
+
+
+def _professional_certifications(styles, doc):
+    story = []
+    if doc.certifications:
+        story.append(_paragraph('CERTIFICATIONS', styles['section']))
+        for cert in doc.certifications:
+            story.append(_paragraph(f"{cert.name} - {cert.issuer} ({cert.date})", styles['bullet']))
+    return story
+
+
+register_template(
+    'professional',
+    margins=(0.5*inch, 0.5*inch, 0.75*inch, 0.75*inch),
+    styles={
+        'name': dict(fontSize=24, spaceAfter=6, textColor=colors.HexColor('#002FA7'), fontName='Helvetica-Bold'),
+        'contact': dict(fontSize=10, spaceAfter=12, textColor=colors.HexColor('#64748B')),
+        'section': dict(fontSize=14, spaceBefore=16, spaceAfter=8, textColor=colors.HexColor('#002FA7'), fontName='Helvetica-Bold'),
+        'job': dict(fontSize=12, spaceAfter=2, fontName='Helvetica-Bold'),
+        'company': dict(fontSize=11, spaceAfter=4, textColor=colors.HexColor('#64748B')),
+        'bullet': dict(fontSize=10, leftIndent=15, spaceAfter=4, bulletIndent=0),
+        'summary': dict(fontSize=10, spaceAfter=12, leading=14),
+    },
+    sections=(
+        ('header', _professional_header),
+        ('summary', _professional_summary),
+        ('experience', _professional_experience),
+        ('education', _professional_education),
+        ('skills', _professional_skills),
+        ('projects', _professional_projects),
+        ('certifications', _professional_certifications),
+    ),
+)
+
+
+# ============== MODERN ==============
+
+def _modern_header(styles, doc):
+    story = []
+    personal = doc.personal
+
+    story.append(_paragraph((personal.full_name or 'Your Name').upper(), styles['name']))
+
+    contact_parts = []
+    if personal.email: contact_parts.append(personal.email)
+    if personal.phone: contact_parts.append(personal.phone)
+    if personal.location: contact_parts.append(personal.location)
+    if personal.linkedin: contact_parts.append(personal.linkedin)
+    if contact_parts:
+        story.append(_paragraph(' • '.join(contact_parts), styles['contact']))
+    return story
+
+
+def _modern_summary(styles, doc):
+    summary = doc.personal.summary
+    if not summary:
+        return []
+    return [
+        _paragraph('— ABOUT —', styles['section']),
+        _paragraph(summary, styles['summary']),
+    ]
+
+
+def _modern_experience(styles, doc):
+    story = []
+    if doc.experiences:
+        story.append(_paragraph('— EXPERIENCE —', styles['section']))
+        for exp in doc.experiences:
+            story.append(_paragraph(exp.position, styles['job']))
+            date_str = f"{exp.start_date} - {exp.end_label}"
+            story.append(_paragraph(f"{exp.company} | {date_str}", styles['company']))
+            if exp.description:
+                story.append(_paragraph(exp.description, styles['bullet']))
+            for achievement in exp.achievements:
+                story.append(_paragraph(f"→ {achievement}", styles['bullet']))
+            story.append(Spacer(1, 6))
+    return story
+
+
+def _modern_skills(styles, doc):
+    if not doc.skills:
+        return []
+    return [
+        _paragraph('— SKILLS —', styles['section']),
+        _paragraph(' • '.join(doc.skills), styles['summary']),
+    ]
+
+
+def _modern_education(styles, doc):
+    story = []
+    if doc.education:
+        story.append(_paragraph('— EDUCATION —', styles['section']))
+        for edu in doc.education:
+            story.append(_paragraph(f"{edu.degree} in {edu.field}", styles['job']))
+            story.append(_paragraph(f"{edu.institution} | {edu.start_date} - {edu.end_date}", styles['company']))
+            story.append(Spacer(1, 6))
+    return story
+
+
+def _modern_projects(styles, doc):
+    story = []
+    if doc.projects:
+        story.append(_paragraph('— PROJECTS —', styles['section']))
+        for proj in doc.projects:
+            story.append(_paragraph(proj.name, styles['job']))
+            if proj.description:
+                story.append(_paragraph(proj.description, styles['bullet']))
+            story.append(Spacer(1, 6))
+    return story
+
+
+register_template(
+    'modern',
+    margins=(0.5*inch, 0.5*inch, 0.75*inch, 0.75*inch),
+    styles={
+        'name': dict(fontSize=28, spaceAfter=4, textColor=colors.HexColor('#0F172A'), fontName='Helvetica-Bold'),
+        'contact': dict(fontSize=10, spaceAfter=16, textColor=colors.HexColor('#FF4F00')),
+        'section': dict(fontSize=12, spaceBefore=14, spaceAfter=6, textColor=colors.HexColor('#FF4F00'), fontName='Helvetica-Bold', borderPadding=4),
+        'job': dict(fontSize=11, spaceAfter=2, fontName='Helvetica-Bold', textColor=colors.HexColor('#0F172A')),
+        'company': dict(fontSize=10, spaceAfter=4, textColor=colors.HexColor('#64748B'), fontName='Helvetica-Oblique'),
+        'bullet': dict(fontSize=10, leftIndent=12, spaceAfter=3),
+        'summary': dict(fontSize=10, spaceAfter=10, leading=13, textColor=colors.HexColor('#374151')),
+    },
+    sections=(
+        ('header', _modern_header),
+        ('summary', _modern_summary),
+        ('experience', _modern_experience),
+        ('skills', _modern_skills),
+        ('education', _modern_education),
+        ('projects', _modern_projects),
+    ),
+)
+
+
+# ============== MINIMALIST ==============
+
+def _minimalist_header(styles, doc):
+    story = []
+    personal = doc.personal
+
+    story.append(_paragraph(personal.full_name or 'Your Name', styles['name']))
+
+    contact_parts = []
+    if personal.email: contact_parts.append(personal.email)
+    if personal.phone: contact_parts.append(personal.phone)
+    if personal.location: contact_parts.append(personal.location)
+    if contact_parts:
+        story.append(_paragraph(' / '.join(contact_parts), styles['contact']))
+    return story
+
+
+def _minimalist_summary(styles, doc):
+    summary = doc.personal.summary
+    if not summary:
+        return []
+    return [_paragraph(summary, styles['summary'])]
+
+
+def _minimalist_experience(styles, doc):
+    story = []
+    if doc.experiences:
+        story.append(_paragraph('Experience', styles['section']))
+        for exp in doc.experiences:
+            date_str = f"{exp.start_date}–{exp.end_label}"
+            story.append(_paragraph(f"{exp.position} at {exp.company}", styles['job']))
+            story.append(_paragraph(date_str, styles['company']))
+            for achievement in exp.achievements:
+                story.append(_paragraph(f"· {achievement}", styles['bullet']))
+            story.append(Spacer(1, 4))
+    return story
+
+
+def _minimalist_education(styles, doc):
+    story = []
+    if doc.education:
+        story.append(_paragraph('Education', styles['section']))
+        for edu in doc.education:
+            story.append(_paragraph(f"{edu.degree} · {edu.field}", styles['job']))
+            story.append(_paragraph(f"{edu.institution} · {edu.end_date}", styles['company']))
+            story.append(Spacer(1, 4))
+    return story
+
+
+def _minimalist_skills(styles, doc):
+    if not doc.skills:
+        return []
+    return [
+        _paragraph('Skills', styles['section']),
+        _paragraph(', '.join(doc.skills), styles['summary']),
+    ]
+
+
+register_template(
+    'minimalist',
+    margins=(0.75*inch, 0.75*inch, 1*inch, 1*inch),
+    styles={
+        'name': dict(fontSize=20, spaceAfter=8, textColor=colors.HexColor('#0F172A'), fontName='Helvetica'),
+        'contact': dict(fontSize=9, spaceAfter=20, textColor=colors.HexColor('#6B7280')),
+        'section': dict(fontSize=10, spaceBefore=16, spaceAfter=8, textColor=colors.HexColor('#9CA3AF'), fontName='Helvetica', leftIndent=0),
+        'job': dict(fontSize=10, spaceAfter=2, fontName='Helvetica-Bold'),
+        'company': dict(fontSize=9, spaceAfter=4, textColor=colors.HexColor('#6B7280')),
+        'bullet': dict(fontSize=9, leftIndent=10, spaceAfter=2, textColor=colors.HexColor('#374151')),
+        'summary': dict(fontSize=9, spaceAfter=8, leading=12, textColor=colors.HexColor('#374151')),
+    },
+    sections=(
+        ('header', _minimalist_header),
+        ('summary', _minimalist_summary),
+        ('experience', _minimalist_experience),
+        ('education', _minimalist_education),
+        ('skills', _minimalist_skills),
+    ),
+)
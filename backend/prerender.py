@@ -0,0 +1,84 @@
+"""
+Debounced background pre-rendering of resume PDFs
+
+After a save, the new version is rendered into the render cache so the
+next download is a cache hit. Saves arriving within the debounce window
+replace the pending job, so a burst of autosaves costs one render.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, Set
+
+logger = logging.getLogger(__name__)
+
+# Background tasks don't survive past the response on serverless platforms
+PRERENDER_ENABLED = os.environ.get(
+    'PRERENDER_ENABLED', 'false' if os.environ.get('VERCEL') else 'true'
+).lower() == 'true'
+PRERENDER_DEBOUNCE_SECONDS = float(os.environ.get('PRERENDER_DEBOUNCE_SECONDS', 3))
+
+
+class Prerenderer:
+    """Per-key debounce in front of a render job"""
+
+    def __init__(self, debounce: float, enabled: bool):
+        self.debounce = debounce
+        self.enabled = enabled
+        # Jobs still inside their debounce window; once a job starts rendering
+        # it is left to finish and populate the cache
+        self._waiting: Dict[str, asyncio.Task] = {}
+        # The event loop only holds weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.scheduled = 0
+        self.cancelled = 0
+        self.completed = 0
+        self.failed = 0
+
+    def schedule(self, key: str, job: Callable[[], Awaitable]):
+        """Run job after the debounce window unless another schedule() for key replaces it"""
+        if not self.enabled:
+            return
+        self.cancel(key)
+        self.scheduled += 1
+        task = asyncio.create_task(self._run(key, job))
+        self._waiting[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def cancel(self, key: str):
+        pending = self._waiting.pop(key, None)
+        if pending is not None:
+            pending.cancel()
+            self.cancelled += 1
+
+    async def _run(self, key: str, job: Callable[[], Awaitable]):
+        await asyncio.sleep(self.debounce)
+        self._waiting.pop(key, None)
+        try:
+            await job()
+            self.completed += 1
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Pre-render failed for {key}: {type(e).__name__}")
+
+    def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        self._waiting.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "debounce_seconds": self.debounce,
+            "waiting": len(self._waiting),
+            "scheduled": self.scheduled,
+            "cancelled": self.cancelled,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+prerenderer = Prerenderer(debounce=PRERENDER_DEBOUNCE_SECONDS, enabled=PRERENDER_ENABLED)
@@ -0,0 +1,33 @@
+"""
+Cached authentication principals
+
+get_current_user() resolves a token's user id to the few user fields
+routes need (a Principal) from a per-process TTL/LRU cache, so most
+authenticated requests make no users lookup. Routes that change those
+fields invalidate the entry after committing. Other server processes
+only see the change once their entry expires, so keep
+PRINCIPAL_CACHE_TTL_SECONDS short; premium checks re-read the database
+before refusing, so an upgrade is never held back by a stale entry.
+"""
+
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from ttl_cache import TTLCache
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', 60))
+PRINCIPAL_CACHE_ENTRIES = int(os.environ.get('PRINCIPAL_CACHE_ENTRIES', 10000))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by route handlers"""
+    id: uuid.UUID
+    email: str
+    is_premium: bool
+    subscription_type: Optional[str]
+
+
+principal_cache = TTLCache(ttl=PRINCIPAL_CACHE_TTL_SECONDS, max_entries=PRINCIPAL_CACHE_ENTRIES)
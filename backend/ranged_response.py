@@ -0,0 +1,100 @@
+"""
+File response with single-range (resumable download) support
+
+Starlette's FileResponse always sends the whole file, and opens it by path
+only once the response is being sent. This one sends a file the caller has
+already opened, whole or as one Accept-Ranges/Range/If-Range byte range, so
+a cache entry pruned in the meantime is still sent in full (an unlinked
+file stays readable through an open descriptor).
+"""
+
+import os
+import re
+from typing import BinaryIO, Mapping, Optional, Tuple
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) for a single bytes range. Raises ValueError when
+    the range can't be satisfied; returns None for headers we don't honour
+    (multiple ranges, other units), which means sending the whole file.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("unsatisfiable range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("unsatisfiable range")
+    return start, end
+
+
+class RangedFileResponse(Response):
+    chunk_size = 64 * 1024
+
+    def __init__(self, file: BinaryIO, range_header: Optional[str] = None, if_range: Optional[str] = None,
+                 headers: Optional[Mapping[str, str]] = None, media_type: Optional[str] = None):
+        # Like FileResponse, no body: content-length is set once the range is known
+        self.file = file
+        self.status_code = 200
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+        self.headers["accept-ranges"] = "bytes"
+        self.range_header = range_header
+        # A stale validator means the client's partial copy is of another version
+        if if_range is not None and if_range.strip() != self.headers.get("etag"):
+            self.range_header = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self._send(send)
+        finally:
+            await anyio.to_thread.run_sync(self.file.close)
+
+    async def _send(self, send: Send):
+        fd = self.file.fileno()
+        size = (await anyio.to_thread.run_sync(os.fstat, fd)).st_size
+        try:
+            byte_range = parse_range(self.range_header, size) if self.range_header else None
+        except ValueError:
+            self.status_code = 416
+            self.headers["content-range"] = f"bytes */{size}"
+            self.headers["content-length"] = "0"
+            await send({"type": "http.response.start", "status": 416, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        start, end = byte_range or (0, size - 1)
+        if byte_range is not None:
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+        remaining = end - start + 1
+        self.headers["content-length"] = str(remaining)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        offset = start
+        while remaining > 0:
+            chunk = await anyio.to_thread.run_sync(os.pread, fd, min(self.chunk_size, remaining), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0 or end < start:
+            # Empty file, or it shrank underneath us: end the body rather than hang the client
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -0,0 +1,90 @@
+"""
+Read-replica routing with read-your-writes protection
+
+Read-only routes depend on get_read_db() instead of get_db(). Their
+sessions go to the replica, except for a short window after the same
+client's last write, so a user never reads a replica that hasn't caught
+up with their own change yet. Clients are identified by their
+Authorization header; anonymous traffic (public resume pages) always reads
+from the replica.
+
+Write tracking is per process. With several server processes, keep the
+window comfortably above the replica's typical lag.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from database import get_db, replica_session
+
+READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+_MAX_TRACKED_WRITERS = 10000
+
+# Authorization header -> monotonic time until which reads stay on the primary.
+# Every entry gets the same window, so insertion order is expiry order.
+_recent_writers: "OrderedDict[str, float]" = OrderedDict()
+
+
+def note_write(client_key: str):
+    now = time.monotonic()
+    _recent_writers.pop(client_key, None)
+    while _recent_writers and next(iter(_recent_writers.values())) <= now:
+        _recent_writers.popitem(last=False)
+    # Past the limit the oldest writers fall back to the replica early
+    while len(_recent_writers) >= _MAX_TRACKED_WRITERS:
+        _recent_writers.popitem(last=False)
+    _recent_writers[client_key] = now + READ_YOUR_WRITES_SECONDS
+
+
+def wrote_recently(client_key: Optional[str]) -> bool:
+    if not client_key:
+        return False
+    until = _recent_writers.get(client_key)
+    return until is not None and until > time.monotonic()
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)):
+    """Dependency for read-only routes: a replica session unless this client just wrote"""
+    # Share the request's primary session rather than opening a second one
+    if replica_session is None or wrote_recently(request.headers.get("authorization")):
+        yield db
+        return
+    async with replica_session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+class WriteTrackingMiddleware:
+    """Record authenticated writes so the client's next reads go to the primary"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            return await self.app(scope, receive, send)
+
+        client_key = Headers(scope=scope).get("authorization")
+        if not client_key:
+            return await self.app(scope, receive, send)
+
+        async def send_and_track(message):
+            # The route has committed by the time its response starts
+            if message["type"] == "http.response.start":
+                note_write(client_key)
+            await send(message)
+
+        note_write(client_key)
+        await self.app(scope, receive, send_and_track)
@@ -0,0 +1,260 @@
+"""
+Content-addressed cache for rendered resume PDFs
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, BinaryIO, Callable, Dict, Optional
+
+from pdf_fonts import font_set_id
+
+# Bump whenever a change to the PDF templates alters rendered output, so that
+# previously cached documents are no longer served. Keys also include the
+# fallback font set, which changes output without a code change.
+RENDERER_REVISION = "3"
+
+PDF_CACHE_MEMORY_BYTES = int(os.environ.get('PDF_CACHE_MEMORY_BYTES', 64 * 1024 * 1024))
+PDF_CACHE_DISK_BYTES = int(os.environ.get('PDF_CACHE_DISK_BYTES', 512 * 1024 * 1024))
+PDF_CACHE_DIR = os.environ.get(
+    'PDF_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'vitaecraft-pdf-cache')
+)
+
+# Previews of unsaved edits are memory-only and expire quickly
+PREVIEW_CACHE_MEMORY_BYTES = int(os.environ.get('PREVIEW_CACHE_MEMORY_BYTES', 16 * 1024 * 1024))
+PREVIEW_CACHE_TTL_SECONDS = float(os.environ.get('PREVIEW_CACHE_TTL_SECONDS', 300))
+
+
+def render_cache_key(resume_id, version: int, template: str, fit_pages: Optional[int] = None,
+                     revision: str = RENDERER_REVISION) -> str:
+    """Cache key (and strong ETag) for one rendered resume version"""
+    variant = f"{template}:fit{fit_pages}" if fit_pages else template
+    raw = f"{resume_id}:{version}:{variant}:{revision}:{font_set_id()}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def preview_cache_key(fingerprint: str, template: str, fit_pages: Optional[int] = None,
+                      revision: str = RENDERER_REVISION) -> str:
+    """Cache key for a preview of unsaved resume content"""
+    variant = f"{template}:fit{fit_pages}" if fit_pages else template
+    raw = f"preview:{fingerprint}:{variant}:{revision}:{font_set_id()}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """
+    Two-tier PDF cache: an in-memory LRU bounded by total bytes in front of
+    an on-disk store. Concurrent requests for the same key share one render.
+    With ttl set, memory entries also expire that many seconds after insert.
+    """
+
+    def __init__(self, max_memory_bytes: int, disk_dir: Optional[str], max_disk_bytes: int,
+                 ttl: Optional[float] = None):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.ttl = ttl
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._expires: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self._disk_lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.shared_renders = 0
+
+    # ---------- memory tier ----------
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        data = self._memory.get(key)
+        if data is None:
+            return None
+        if self.ttl is not None and self._expires[key] <= time.monotonic():
+            self._memory_evict(key)
+            return None
+        self._memory.move_to_end(key)
+        return data
+
+    def _memory_evict(self, key: str):
+        evicted = self._memory.pop(key, None)
+        if evicted is not None:
+            self._memory_bytes -= len(evicted)
+        self._expires.pop(key, None)
+
+    def _memory_put(self, key: str, data: bytes):
+        if len(data) > self.max_memory_bytes:
+            return
+        self._memory_evict(key)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        if self.ttl is not None:
+            self._expires[key] = time.monotonic() + self.ttl
+        while self._memory_bytes > self.max_memory_bytes:
+            self._memory_evict(next(iter(self._memory)))
+
+    # ---------- disk tier ----------
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.pdf"
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        try:
+            return self._disk_path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _disk_put(self, key: str, data: bytes):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so readers never see a partial PDF
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._prune_disk()
+
+    def _open(self, path: Path) -> Optional[BinaryIO]:
+        """
+        Open a disk entry for sending and mark it recently used, so pruning
+        keeps it; None if missing. Once open it stays readable even if it is
+        pruned before the response is sent.
+        """
+        try:
+            file = open(path, 'rb')
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return file
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.disk_dir.glob('*/*.pdf'))
+
+    def _prune_disk(self):
+        """Delete least recently written files until under the disk budget"""
+        files = sorted(self.disk_dir.glob('*/*.pdf'), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        target = self.max_disk_bytes * 0.9
+        for path in files:
+            if total <= target:
+                break
+            try:
+                size = path.stat().st_size
+                path.unlink()
+                total -= size
+            except OSError:
+                continue
+        self._disk_bytes = total
+
+    # ---------- public API ----------
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Return cached bytes for key, rendering at most once across concurrent callers"""
+        data = self._memory_get(key)
+        if data is not None:
+            self.memory_hits += 1
+            return data
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared_renders += 1
+        else:
+            # The render belongs to the cache rather than to the first caller,
+            # so that caller going away (client disconnect) doesn't cancel it
+            # for everyone else waiting on the same key
+            task = asyncio.create_task(self._fill(key, render))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._fill_done(key, done))
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        data = await asyncio.to_thread(self._disk_get, key)
+        if data is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            data = await render()
+            await asyncio.to_thread(self._disk_put, key, data)
+        self._memory_put(key, data)
+        return data
+
+    def _fill_done(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved when every caller has gone away
+        if not task.cancelled():
+            task.exception()
+
+    async def get_or_render_file(self, key: str, render: Callable[[], Awaitable[bytes]]) -> Optional[BinaryIO]:
+        """
+        Like get_or_render(), but return the spooled file, opened for reading,
+        so it can be sent without loading it into memory. The caller closes
+        it. None when there is no usable disk tier.
+        """
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        file = await asyncio.to_thread(self._open, path)
+        if file is not None:
+            self.disk_hits += 1
+            return file
+
+        data = await self.get_or_render(key, render)
+        file = await asyncio.to_thread(self._open, path)
+        if file is None:
+            # A memory hit may outlive its disk copy after pruning; spool it again
+            await asyncio.to_thread(self._disk_put, key, data)
+            file = await asyncio.to_thread(self._open, path)
+        return file
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "shared_renders": self.shared_renders,
+            "inflight": len(self._inflight),
+        }
+
+
+render_cache = RenderCache(
+    max_memory_bytes=PDF_CACHE_MEMORY_BYTES,
+    disk_dir=PDF_CACHE_DIR or None,
+    max_disk_bytes=PDF_CACHE_DISK_BYTES,
+)
+
+preview_cache = RenderCache(
+    max_memory_bytes=PREVIEW_CACHE_MEMORY_BYTES,
+    disk_dir=None,
+    max_disk_bytes=0,
+    ttl=PREVIEW_CACHE_TTL_SECONDS,
+)
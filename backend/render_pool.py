@@ -0,0 +1,180 @@
+"""
+Managed process pool for PDF rendering
+
+ReportLab's doc.build() is CPU-bound and synchronous, so renders run in
+dedicated worker processes instead of on the event loop.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from pdf_fonts import fallback_fonts
+from pdf_generator import PdfMeasurement, measure_pdf, fit_scale, render_pdf
+from resume_document import ResumeDocument
+
+logger = logging.getLogger(__name__)
+
+# Serverless platforms (Vercel/Lambda) cannot host a process pool, so renders
+# fall back to a thread there. RENDER_POOL_WORKERS=0 forces the same mode.
+RENDER_POOL_WORKERS = int(os.environ.get('RENDER_POOL_WORKERS', 0 if os.environ.get('VERCEL') else 2))
+RENDER_QUEUE_MAX = int(os.environ.get('RENDER_QUEUE_MAX', 32))
+RENDER_TIMEOUT_SECONDS = float(os.environ.get('RENDER_TIMEOUT_SECONDS', 20))
+RENDER_RETRY_AFTER_SECONDS = int(os.environ.get('RENDER_RETRY_AFTER_SECONDS', 5))
+
+
+class RenderQueueFull(Exception):
+    """Raised when the render queue is at capacity"""
+
+
+class RenderTimeout(Exception):
+    """Raised when a render job exceeds the per-job timeout"""
+
+
+def _warm_worker():
+    """Worker initializer: pay reportlab's import and font setup cost up front"""
+    from reportlab.pdfbase.pdfmetrics import getFont
+    getFont('Helvetica')
+    getFont('Helvetica-Bold')
+    fallback_fonts()
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+def _measure_job(template: str, document: ResumeDocument, fit_pages: Optional[int]) -> PdfMeasurement:
+    scale = fit_scale(template, document, fit_pages) if fit_pages else 1.0
+    return measure_pdf(template, document, scale)
+
+
+class RenderPool:
+    """Bounded render queue in front of a process pool (or a thread when workers=0)"""
+
+    def __init__(self, workers: int, max_queue: int, timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self._outstanding = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.total_render_seconds = 0.0
+        self.max_render_seconds = 0.0
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn keeps workers free of the parent's event loop and DB connections
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_warm_worker,
+        )
+
+    async def start(self):
+        if self.workers <= 0:
+            print("✅ PDF render pool disabled, rendering in threads")
+            return
+        try:
+            self._executor = self._create_executor()
+            loop = asyncio.get_running_loop()
+            # Start every worker now so the first downloads don't pay for process spawn
+            await asyncio.gather(*[
+                loop.run_in_executor(self._executor, _noop) for _ in range(self.workers)
+            ])
+            print(f"✅ PDF render pool started with {self.workers} workers")
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            logger.warning(f"Process pool unavailable, rendering in threads: {str(e)}")
+            self.shutdown()
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a free worker"""
+        return max(0, self._outstanding - max(self.workers, 1))
+
+    async def _run(self, fn: Callable, *args):
+        if self._outstanding >= self.max_queue:
+            self.rejected += 1
+            raise RenderQueueFull()
+
+        executor = self._executor
+        if executor:
+            job = asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        else:
+            job = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        # A job that times out keeps its worker busy until it really finishes,
+        # so it stays counted against the queue limit until then
+        self._outstanding += 1
+        job.add_done_callback(self._job_done)
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(asyncio.shield(job), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise RenderTimeout()
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); replace the pool for subsequent jobs.
+            # Every job that was on it lands here, but only the first may
+            # replace it, or it would shut down jobs already on the new pool.
+            self.failed += 1
+            if self._executor is executor:
+                logger.error("PDF render pool broken, restarting workers")
+                self.shutdown()
+                self._executor = self._create_executor()
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+
+        elapsed = time.perf_counter() - started
+        self.completed += 1
+        self.total_render_seconds += elapsed
+        self.max_render_seconds = max(self.max_render_seconds, elapsed)
+        return result
+
+    def _job_done(self, job: asyncio.Future):
+        self._outstanding -= 1
+        # Nobody awaits a job that timed out; mark its exception as retrieved
+        if not job.cancelled():
+            job.exception()
+
+    async def render(self, template: str, document: ResumeDocument, fit_pages: Optional[int] = None) -> bytes:
+        return await self._run(render_pdf, template, document, fit_pages)
+
+    async def measure(self, template: str, document: ResumeDocument, fit_pages: Optional[int] = None) -> PdfMeasurement:
+        """Layout-only pass; with fit_pages, measures at the scale auto-fit would pick"""
+        return await self._run(_measure_job, template, document, fit_pages)
+
+    def stats(self) -> dict:
+        return {
+            "mode": "process" if self._executor else "thread",
+            "workers": self.workers,
+            "outstanding": self._outstanding,
+            "queue_depth": self.queue_depth,
+            "queue_limit": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "avg_render_ms": round(self.total_render_seconds / self.completed * 1000, 2) if self.completed else 0,
+            "max_render_ms": round(self.max_render_seconds * 1000, 2),
+        }
+
+
+render_pool = RenderPool(
+    workers=RENDER_POOL_WORKERS,
+    max_queue=RENDER_QUEUE_MAX,
+    timeout=RENDER_TIMEOUT_SECONDS,
+)
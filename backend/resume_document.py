@@ -0,0 +1,168 @@
+"""
+Normalized resume document shared by all exporters
+
+resume.data is free-form JSON; build_document() walks it once, fills in
+defaults and precomputes display values so the PDF, TXT, JSON, Markdown and
+HTML exporters don't each repeat the same .get() chains.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+DOCUMENT_CACHE_SIZE = int(os.environ.get('DOCUMENT_CACHE_SIZE', 512))
+
+
+@dataclass(frozen=True)
+class PersonalInfo:
+    full_name: str = ""
+    email: str = ""
+    phone: str = ""
+    location: str = ""
+    linkedin: str = ""
+    portfolio: str = ""
+    summary: str = ""
+
+
+@dataclass(frozen=True)
+class ExperienceEntry:
+    id: str = ""
+    company: str = ""
+    position: str = ""
+    start_date: str = ""
+    end_date: str = ""
+    current: bool = False
+    description: str = ""
+    achievements: Tuple[str, ...] = ()
+
+    @property
+    def end_label(self) -> str:
+        return 'Present' if self.current else self.end_date
+
+
+@dataclass(frozen=True)
+class EducationEntry:
+    id: str = ""
+    institution: str = ""
+    degree: str = ""
+    field: str = ""
+    start_date: str = ""
+    end_date: str = ""
+    gpa: str = ""
+    achievements: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class ProjectEntry:
+    id: str = ""
+    name: str = ""
+    description: str = ""
+    technologies: Tuple[str, ...] = ()
+    url: str = ""
+    highlights: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class CertificationEntry:
+    id: str = ""
+    name: str = ""
+    issuer: str = ""
+    date: str = ""
+    expiry: str = ""
+    credential_id: str = ""
+
+
+@dataclass(frozen=True)
+class ResumeDocument:
+    title: str
+    template: str
+    personal: PersonalInfo
+    experiences: Tuple[ExperienceEntry, ...] = ()
+    education: Tuple[EducationEntry, ...] = ()
+    skills: Tuple[str, ...] = ()
+    projects: Tuple[ProjectEntry, ...] = ()
+    certifications: Tuple[CertificationEntry, ...] = ()
+
+    def as_data(self) -> Dict[str, Any]:
+        """Serialize back to the ResumeData JSON shape"""
+        return {
+            "personal_info": _fields(self.personal),
+            "experiences": [_fields(e) for e in self.experiences],
+            "education": [_fields(e) for e in self.education],
+            "skills": list(self.skills),
+            "projects": [_fields(p) for p in self.projects],
+            "certifications": [_fields(c) for c in self.certifications],
+        }
+
+    def fingerprint(self) -> str:
+        """Hash of the rendered content; title and client-generated entry ids are ignored"""
+        data = self.as_data()
+        for section in ("experiences", "education", "projects", "certifications"):
+            for entry in data[section]:
+                entry.pop("id", None)
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _fields(entry) -> Dict[str, Any]:
+    return {
+        name: list(value) if isinstance(value, tuple) else value
+        for name, value in entry.__dict__.items()
+    }
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _texts(values) -> Tuple[str, ...]:
+    return tuple(_text(v) for v in (values or ()) if v is not None)
+
+
+def _entry(cls, raw: Optional[dict]):
+    raw = raw or {}
+    values = {}
+    for name, default in cls.__dataclass_fields__.items():
+        value = raw.get(name)
+        if isinstance(default.default, bool):
+            values[name] = bool(value)
+        elif isinstance(default.default, tuple):
+            values[name] = _texts(value)
+        else:
+            values[name] = _text(value)
+    return cls(**values)
+
+
+def build_document(title: str, template: str, data: Optional[dict]) -> ResumeDocument:
+    """Normalize raw resume JSON into a ResumeDocument"""
+    data = data or {}
+    return ResumeDocument(
+        title=title or "",
+        template=template or "",
+        personal=_entry(PersonalInfo, data.get('personal_info')),
+        experiences=tuple(_entry(ExperienceEntry, e) for e in data.get('experiences') or ()),
+        education=tuple(_entry(EducationEntry, e) for e in data.get('education') or ()),
+        skills=_texts(data.get('skills')),
+        projects=tuple(_entry(ProjectEntry, p) for p in data.get('projects') or ()),
+        certifications=tuple(_entry(CertificationEntry, c) for c in data.get('certifications') or ()),
+    )
+
+
+_document_cache: "OrderedDict[Tuple[str, int], ResumeDocument]" = OrderedDict()
+
+
+def cached_document(resume_id, version: int, title: str, template: str, data: Optional[dict]) -> ResumeDocument:
+    """build_document() memoized per (resume id, version); any edit bumps the version"""
+    key = (str(resume_id), version)
+    document = _document_cache.get(key)
+    if document is not None:
+        _document_cache.move_to_end(key)
+        return document
+    document = build_document(title, template, data)
+    _document_cache[key] = document
+    if len(_document_cache) > DOCUMENT_CACHE_SIZE:
+        _document_cache.popitem(last=False)
+    return document
@@ -1,9 +1,10 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Header
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, update, delete
+from sqlalchemy import select, func, and_, or_, delete
+from sqlalchemy.orm import load_only
 import os
 import logging
 import asyncio
@@ -15,22 +16,32 @@ import secrets
 from datetime import datetime, timezone, timedelta
 import jwt
 from passlib.context import CryptContext
-import io
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+import json
+import copy
 from openai import AsyncOpenAI
 import stripe as stripe_sdk
 import resend
 
 # Database imports
-from database import get_db, init_db, engine
+from database import get_db, init_db, engine, async_session, replica_engine, describe_engine
+from read_routing import get_read_db, WriteTrackingMiddleware
 from models import (
     User, Resume, ResumeVersion, CoverLetter, PasswordReset, 
     PaymentTransaction, ResumeAnalytics, UserPreferences, PublicResume
 )
+from render_cache import render_cache, render_cache_key, preview_cache, preview_cache_key
+from render_pool import render_pool, RenderQueueFull, RenderTimeout, RENDER_RETRY_AFTER_SECONDS
+from pdf_generator import resolve_template, template_names
+from resume_document import ResumeDocument, build_document, cached_document
+from exporters import to_text, to_markdown, to_html
+from zip_stream import ZipStreamWriter
+from ranged_response import RangedFileResponse
+from prerender import prerenderer
+from analytics_buffer import analytics_buffer, dashboard_cache
+from version_history import load_version_data, newest_delta, save_resume, version_cache, autosave_stats
+from version_retention import version_compactor
+from principal_cache import Principal, principal_cache
+from pagination import NEXT_CURSOR_HEADER, page_size, paginate_by_created, paginate_by_column, split_page
 
 ROOT_DIR = Path(__file__).parent
 
@@ -55,6 +66,9 @@ RESEND_API_KEY = os.environ.get('RESEND_API_KEY', '')
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'onboarding@resend.dev')
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
 
+# /api/metrics answers only requests carrying this in X-Metrics-Token (unset: disabled)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 # Initialize Resend
 if RESEND_API_KEY:
     resend.api_key = RESEND_API_KEY
@@ -76,8 +90,12 @@ app.add_middleware(
     allow_origins=CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Sends a client's reads to the primary for a short window after its writes
+app.add_middleware(WriteTrackingMiddleware)
+
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
@@ -189,6 +207,11 @@ class ResumeUpdate(BaseModel):
     template: Optional[str] = None
     data: Optional[ResumeData] = None
 
+class PreviewRequest(BaseModel):
+    template: str = "professional"
+    data: ResumeData = Field(default_factory=ResumeData)
+    fit_pages: Optional[int] = None
+
 class ResumeResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
@@ -201,6 +224,16 @@ class ResumeResponse(BaseModel):
     created_at: str
     updated_at: str
 
+class ResumeSummaryResponse(BaseModel):
+    """Listing view of a resume, without the document itself"""
+    id: str
+    title: str
+    template: str
+    ats_score: Optional[int] = None
+    version: int = 1
+    created_at: str
+    updated_at: str
+
 class ResumeVersionResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
@@ -244,7 +277,7 @@ class CoverLetterResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
     user_id: str
-    resume_id: str
+    resume_id: Optional[str] = None  # cleared when the resume is deleted
     title: str
     content: str
     company_name: str
@@ -252,6 +285,15 @@ class CoverLetterResponse(BaseModel):
     created_at: str
     updated_at: str
 
+class CoverLetterSummaryResponse(BaseModel):
+    """Listing view of a cover letter, without its text"""
+    id: str
+    resume_id: Optional[str] = None
+    title: str
+    company_name: Optional[str] = None
+    created_at: str
+    updated_at: str
+
 class CoverLetterCreate(BaseModel):
     resume_id: str
     title: str
@@ -342,7 +384,25 @@ async def send_email(to_email: str, subject: str, html_content: str) -> bool:
         logger.error(f"Failed to send email: {str(e)}")
         return False
 
-async def get_current_user(authorization: str = Header(None), db: AsyncSession = Depends(get_db)) -> User:
+async def load_principal(user_id: uuid.UUID, db: AsyncSession) -> Optional[Principal]:
+    """Read a user's principal from the database and cache it"""
+    generation = principal_cache.generation()
+    result = await db.execute(
+        select(User.id, User.email, User.is_premium, User.subscription_type).where(User.id == user_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    principal = Principal(
+        id=row.id,
+        email=row.email,
+        is_premium=bool(row.is_premium),
+        subscription_type=row.subscription_type
+    )
+    principal_cache.put(principal.id, principal, generation)
+    return principal
+
+async def get_current_user(authorization: str = Header(None), db: AsyncSession = Depends(get_db)) -> Principal:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
     
@@ -353,11 +413,11 @@ async def get_current_user(authorization: str = Header(None), db: AsyncSession =
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        result = await db.execute(select(User).where(User.id == uuid.UUID(user_id)))
-        user = result.scalar_one_or_none()
-        if user is None:
+        user_uuid = uuid.UUID(user_id)
+        principal = principal_cache.get(user_uuid) or await load_principal(user_uuid, db)
+        if principal is None:
             raise HTTPException(status_code=401, detail="User not found")
-        return user
+        return principal
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.PyJWTError:
@@ -365,6 +425,37 @@ async def get_current_user(authorization: str = Header(None), db: AsyncSession =
     except (ValueError, TypeError):
         raise HTTPException(status_code=401, detail="Invalid token format")
 
+async def get_current_user_record(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)) -> User:
+    """The full users row, for routes that need more than the principal or change the user"""
+    result = await db.execute(select(User).where(User.id == current_user.id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+async def get_premium_user(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)) -> Principal:
+    if not current_user.is_premium:
+        # The cached principal may predate an upgrade handled by another process
+        current_user = await load_principal(current_user.id, db)
+        if current_user is None or not current_user.is_premium:
+            raise HTTPException(status_code=403, detail="Premium subscription required")
+    return current_user
+
+def paged_query(paginate, *args, cursor: Optional[str], limit: Optional[int], default: Optional[int] = None):
+    """Apply keyset pagination to a query; returns (query, page size or None for all rows)"""
+    try:
+        size = page_size(limit, cursor, default)
+        return paginate(*args, cursor, size), size
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def page_rows(response: Response, rows, size: Optional[int], key):
+    """Trim a fetched page and advertise the next cursor in X-Next-Cursor"""
+    rows, next_cursor = split_page(rows, size, key)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
+
 # ============== AUTH ROUTES ==============
 
 @api_router.post("/auth/register", response_model=TokenResponse)
@@ -449,7 +540,7 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     return TokenResponse(access_token=token, user=user_response)
 
 @api_router.get("/auth/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user_record)):
     return UserResponse(
         id=str(current_user.id),
         email=current_user.email,
@@ -475,7 +566,7 @@ async def verify_email(data: VerifyEmailRequest, db: AsyncSession = Depends(get_
     return {"message": "Email verified successfully"}
 
 @api_router.post("/auth/resend-verification")
-async def resend_verification(current_user: User = Depends(get_current_user), request: Request = None, db: AsyncSession = Depends(get_db)):
+async def resend_verification(current_user: User = Depends(get_current_user_record), request: Request = None, db: AsyncSession = Depends(get_db)):
     if current_user.email_verified:
         raise HTTPException(status_code=400, detail="Email already verified")
     
@@ -562,11 +653,12 @@ async def reset_password(data: ResetPasswordRequest, db: AsyncSession = Depends(
         user.password = get_password_hash(data.new_password)
         reset_record.used = True
         await db.commit()
+        principal_cache.invalidate(user.id)
     
     return {"message": "Password reset successfully"}
 
 @api_router.put("/auth/update-profile", response_model=UserResponse)
-async def update_profile(data: UserUpdateRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def update_profile(data: UserUpdateRequest, current_user: User = Depends(get_current_user_record), db: AsyncSession = Depends(get_db)):
     update_data = {}
     
     if data.full_name:
@@ -580,6 +672,7 @@ async def update_profile(data: UserUpdateRequest, current_user: User = Depends(g
         current_user.password = get_password_hash(data.new_password)
     
     await db.commit()
+    principal_cache.invalidate(current_user.id)
     await db.refresh(current_user)
     
     return UserResponse(
@@ -595,7 +688,7 @@ async def update_profile(data: UserUpdateRequest, current_user: User = Depends(g
 # ============== RESUME ROUTES ==============
 
 @api_router.post("/resumes", response_model=ResumeResponse)
-async def create_resume(resume: ResumeCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def create_resume(resume: ResumeCreate, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     resume_id = uuid.uuid4()
     now = datetime.now(timezone.utc)
     
@@ -613,6 +706,7 @@ async def create_resume(resume: ResumeCreate, current_user: User = Depends(get_c
     
     db.add(resume_obj)
     await db.commit()
+    dashboard_cache.invalidate(current_user.id)
     await db.refresh(resume_obj)
     
     return ResumeResponse(
@@ -627,12 +721,21 @@ async def create_resume(resume: ResumeCreate, current_user: User = Depends(get_c
         updated_at=resume_obj.updated_at.isoformat()
     )
 
+def resume_list_query(user: Principal, skill: Optional[str]):
+    query = select(Resume).where(Resume.user_id == user.id)
+    if skill:
+        # Exact skill match via JSONB containment, served by the GIN (jsonb_path_ops) index on data
+        query = query.where(Resume.data.contains({"skills": [skill]}))
+    return query
+
 @api_router.get("/resumes", response_model=List[ResumeResponse])
-async def get_resumes(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Resume).where(Resume.user_id == current_user.id).order_by(Resume.created_at.desc())
+async def get_resumes(response: Response, skill: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    query, size = paged_query(
+        paginate_by_created, resume_list_query(current_user, skill), Resume.created_at, Resume.id,
+        cursor=cursor, limit=limit
     )
-    resumes = result.scalars().all()
+    result = await db.execute(query)
+    resumes = page_rows(response, result.scalars().all(), size, lambda r: (r.created_at, r.id))
     
     return [
         ResumeResponse(
@@ -649,8 +752,36 @@ async def get_resumes(current_user: User = Depends(get_current_user), db: AsyncS
         for r in resumes
     ]
 
+@api_router.get("/resumes/summary", response_model=List[ResumeSummaryResponse])
+async def get_resume_summaries(response: Response, skill: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    """Resume listing without the document data; same filters and paging as GET /resumes"""
+    query, size = paged_query(
+        paginate_by_created, resume_list_query(current_user, skill), Resume.created_at, Resume.id,
+        cursor=cursor, limit=limit
+    )
+    # Only the listed columns are fetched; touching any other attribute raises
+    query = query.options(load_only(
+        Resume.id, Resume.title, Resume.template, Resume.version, Resume.ats_score,
+        Resume.created_at, Resume.updated_at, raiseload=True
+    ))
+    result = await db.execute(query)
+    resumes = page_rows(response, result.scalars().all(), size, lambda r: (r.created_at, r.id))
+    
+    return [
+        ResumeSummaryResponse(
+            id=str(r.id),
+            title=r.title,
+            template=r.template,
+            ats_score=r.ats_score,
+            version=r.version,
+            created_at=r.created_at.isoformat(),
+            updated_at=r.updated_at.isoformat()
+        )
+        for r in resumes
+    ]
+
 @api_router.get("/resumes/{resume_id}", response_model=ResumeResponse)
-async def get_resume(resume_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_resume(resume_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     try:
         resume_uuid = uuid.UUID(resume_id)
     except ValueError:
@@ -678,85 +809,94 @@ async def get_resume(resume_id: str, current_user: User = Depends(get_current_us
         updated_at=resume.updated_at.isoformat()
     )
 
+def editor_session_key(user: Principal, editor_session: Optional[str]) -> str:
+    """Autosave coalescing key: the editor tab's session id, else the user"""
+    if editor_session:
+        return f"session:{editor_session.strip()[:64]}"
+    return f"user:{user.id}"
+
+# A save re-reads the resume and tries again when a concurrent save took its version number
+SAVE_ATTEMPTS = 3
+
+async def get_resume_for_save(resume_uuid: uuid.UUID, current_user: Principal, db: AsyncSession):
+    """The owned resume (re-read from the database) and its newest history delta, or 404"""
+    result = await db.execute(
+        select(Resume, newest_delta())
+        .where(and_(Resume.id == resume_uuid, Resume.user_id == current_user.id))
+        .execution_options(populate_existing=True)
+    )
+    row = result.one_or_none()
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return row
+
 @api_router.put("/resumes/{resume_id}", response_model=ResumeResponse)
-async def update_resume(resume_id: str, update: ResumeUpdate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def update_resume(resume_id: str, update: ResumeUpdate, checkpoint: bool = False, x_editor_session: Optional[str] = Header(None), current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     try:
         resume_uuid = uuid.UUID(resume_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid resume ID format")
     
-    result = await db.execute(
-        select(Resume).where(
-            and_(Resume.id == resume_uuid, Resume.user_id == current_user.id)
-        )
-    )
-    resume = result.scalar_one_or_none()
-    
-    if not resume:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    
-    # Save current version to history before updating
-    version_doc = ResumeVersion(
-        id=uuid.uuid4(),
-        resume_id=resume.id,
-        version=resume.version,
-        title=resume.title,
-        template=resume.template,
-        data=resume.data,
-        created_at=resume.updated_at
-    )
-    db.add(version_doc)
-    
-    # Update resume
-    if update.title is not None:
-        resume.title = update.title
-    if update.template is not None:
-        resume.template = update.template
-    if update.data is not None:
-        resume.data = update.data.model_dump()
-    
-    resume.updated_at = datetime.now(timezone.utc)
-    resume.version = resume.version + 1
+    session_key = editor_session_key(current_user, x_editor_session)
+    for _ in range(SAVE_ATTEMPTS):
+        resume, newest_patch = await get_resume_for_save(resume_uuid, current_user, db)
+        
+        changes = {"data": update.data.model_dump() if update.data is not None else resume.data}
+        if update.title is not None:
+            changes["title"] = update.title
+        if update.template is not None:
+            changes["template"] = update.template
+        
+        # Bumps the version and records the replaced state in history (or
+        # coalesces it into the editor session's autosave window)
+        saved = await save_resume(db, resume, newest_patch, changes, session_key, datetime.now(timezone.utc), checkpoint)
+        if saved is not None:
+            break
+    else:
+        raise HTTPException(status_code=409, detail="Resume is being saved elsewhere, please retry")
     
     await db.commit()
-    await db.refresh(resume)
+    if update.title is not None:
+        dashboard_cache.invalidate_resumes([saved.id])
+    schedule_prerender(saved)
     
     return ResumeResponse(
-        id=str(resume.id),
-        user_id=str(resume.user_id),
-        title=resume.title,
-        template=resume.template,
-        data=ResumeData(**resume.data),
-        ats_score=resume.ats_score,
-        version=resume.version,
-        created_at=resume.created_at.isoformat(),
-        updated_at=resume.updated_at.isoformat()
+        id=str(saved.id),
+        user_id=str(saved.user_id),
+        title=saved.title,
+        template=saved.template,
+        data=ResumeData(**saved.data),
+        ats_score=saved.ats_score,
+        version=saved.version,
+        created_at=saved.created_at.isoformat(),
+        updated_at=saved.updated_at.isoformat()
     )
 
 @api_router.delete("/resumes/{resume_id}")
-async def delete_resume(resume_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def delete_resume(resume_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     try:
         resume_uuid = uuid.UUID(resume_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid resume ID format")
     
+    # Versions, analytics and public links go with it (ON DELETE CASCADE)
     result = await db.execute(
-        select(Resume).where(
-            and_(Resume.id == resume_uuid, Resume.user_id == current_user.id)
-        )
+        delete(Resume)
+        .where(and_(Resume.id == resume_uuid, Resume.user_id == current_user.id))
+        .returning(Resume.id)
     )
-    resume = result.scalar_one_or_none()
-    
-    if not resume:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    await db.delete(resume)
     await db.commit()
+    dashboard_cache.invalidate(current_user.id)
+    prerenderer.cancel(str(resume_uuid))
     
     return {"message": "Resume deleted successfully"}
 
 @api_router.post("/resumes/{resume_id}/duplicate", response_model=ResumeResponse)
-async def duplicate_resume(resume_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def duplicate_resume(resume_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Duplicate an existing resume"""
     try:
         resume_uuid = uuid.UUID(resume_id)
@@ -790,7 +930,9 @@ async def duplicate_resume(resume_id: str, current_user: User = Depends(get_curr
     
     db.add(new_resume)
     await db.commit()
+    dashboard_cache.invalidate(current_user.id)
     await db.refresh(new_resume)
+    schedule_prerender(new_resume)
     
     return ResumeResponse(
         id=str(new_resume.id),
@@ -805,7 +947,7 @@ async def duplicate_resume(resume_id: str, current_user: User = Depends(get_curr
     )
 
 @api_router.get("/resumes/{resume_id}/versions", response_model=List[ResumeVersionResponse])
-async def get_resume_versions(resume_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_resume_versions(resume_id: str, response: Response, limit: Optional[int] = None, cursor: Optional[str] = None, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     """Get version history for a resume"""
     try:
         resume_uuid = uuid.UUID(resume_id)
@@ -822,10 +964,20 @@ async def get_resume_versions(resume_id: str, current_user: User = Depends(get_c
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    result = await db.execute(
-        select(ResumeVersion).where(ResumeVersion.resume_id == resume_uuid).order_by(ResumeVersion.version.desc())
-    )
-    versions = result.scalars().all()
+    # Documents are rebuilt from keyframes and deltas below, so only list metadata here
+    query, size = paged_query(
+        paginate_by_column,
+        select(ResumeVersion)
+        .where(and_(ResumeVersion.resume_id == resume_uuid, ResumeVersion.version < resume.version))
+        .options(load_only(
+            ResumeVersion.id, ResumeVersion.resume_id, ResumeVersion.version,
+            ResumeVersion.title, ResumeVersion.template, ResumeVersion.created_at, raiseload=True
+        )),
+        ResumeVersion.version, cursor=cursor, limit=limit
+    )
+    result = await db.execute(query)
+    versions = page_rows(response, result.scalars().all(), size, lambda v: (v.version,))
+    documents = await load_version_data(db, resume, [v.version for v in versions])
     
     return [
         ResumeVersionResponse(
@@ -834,61 +986,51 @@ async def get_resume_versions(resume_id: str, current_user: User = Depends(get_c
             version=v.version,
             title=v.title,
             template=v.template,
-            data=ResumeData(**v.data),
+            data=ResumeData(**documents[v.version]),
             created_at=v.created_at.isoformat()
         )
         for v in versions
     ]
 
 @api_router.post("/resumes/{resume_id}/restore/{version}")
-async def restore_resume_version(resume_id: str, version: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def restore_resume_version(resume_id: str, version: int, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Restore a resume to a previous version"""
     try:
         resume_uuid = uuid.UUID(resume_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid resume ID format")
     
-    result = await db.execute(
-        select(Resume).where(
-            and_(Resume.id == resume_uuid, Resume.user_id == current_user.id)
-        )
-    )
-    resume = result.scalar_one_or_none()
-    
-    if not resume:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    
-    result = await db.execute(
-        select(ResumeVersion).where(
-            and_(ResumeVersion.resume_id == resume_uuid, ResumeVersion.version == version)
+    for _ in range(SAVE_ATTEMPTS):
+        resume, newest_patch = await get_resume_for_save(resume_uuid, current_user, db)
+        
+        result = await db.execute(
+            select(ResumeVersion.title, ResumeVersion.template).where(
+                and_(ResumeVersion.resume_id == resume_uuid, ResumeVersion.version == version)
+            )
         )
-    )
-    version_doc = result.scalar_one_or_none()
-    
-    if not version_doc:
-        raise HTTPException(status_code=404, detail="Version not found")
-    
-    # Save current as a version first
-    current_version_doc = ResumeVersion(
-        id=uuid.uuid4(),
-        resume_id=resume.id,
-        version=resume.version,
-        title=resume.title,
-        template=resume.template,
-        data=resume.data,
-        created_at=resume.updated_at
-    )
-    db.add(current_version_doc)
-    
-    # Restore the old version
-    now = datetime.now(timezone.utc)
-    resume.title = version_doc.title
-    resume.template = version_doc.template
-    resume.data = version_doc.data
-    resume.version = resume.version + 1
-    resume.updated_at = now
+        version_doc = result.one_or_none()
+        
+        if not version_doc:
+            raise HTTPException(status_code=404, detail="Version not found")
+        
+        documents = await load_version_data(db, resume, [version])
+        changes = {
+            "title": version_doc.title,
+            "template": version_doc.template,
+            "data": copy.deepcopy(documents[version]),
+        }
+        
+        # Saved as a checkpoint: the current state is always recorded first,
+        # and any autosave window ends
+        saved = await save_resume(db, resume, newest_patch, changes, None, datetime.now(timezone.utc), checkpoint=True)
+        if saved is not None:
+            break
+    else:
+        raise HTTPException(status_code=409, detail="Resume is being saved elsewhere, please retry")
     
     await db.commit()
+    dashboard_cache.invalidate_resumes([saved.id])
+    schedule_prerender(saved)
     
     return {"message": f"Resume restored to version {version}"}
 
@@ -919,10 +1061,7 @@ async def get_ai_response(prompt: str) -> str:
     return (response.output_text or "").strip()
 
 @api_router.post("/ai/star-enhance")
-async def enhance_with_star(request: STARRequest, current_user: dict = Depends(get_current_user)):
-    if not current_user.get("is_premium", False):
-        raise HTTPException(status_code=403, detail="Premium subscription required")
-    
+async def enhance_with_star(request: STARRequest, current_user: Principal = Depends(get_premium_user)):
     prompt = f"""Transform this job experience into a powerful STAR-formatted achievement:
 
 Role: {request.role}
@@ -942,10 +1081,7 @@ Return only the bullet points, no explanations."""
     return {"enhanced_text": response}
 
 @api_router.post("/ai/ats-optimize")
-async def optimize_for_ats(request: ATSOptimizeRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    if not current_user.is_premium:
-        raise HTTPException(status_code=403, detail="Premium subscription required")
-    
+async def optimize_for_ats(request: ATSOptimizeRequest, current_user: Principal = Depends(get_premium_user), db: AsyncSession = Depends(get_db)):
     try:
         resume_uuid = uuid.UUID(request.resume_id)
     except ValueError:
@@ -992,10 +1128,7 @@ Respond in JSON format:
         return {"raw_response": response}
 
 @api_router.post("/ai/tailor-resume")
-async def tailor_resume(request: ATSOptimizeRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    if not current_user.is_premium:
-        raise HTTPException(status_code=403, detail="Premium subscription required")
-    
+async def tailor_resume(request: ATSOptimizeRequest, current_user: Principal = Depends(get_premium_user), db: AsyncSession = Depends(get_db)):
     try:
         resume_uuid = uuid.UUID(request.resume_id)
     except ValueError:
@@ -1042,10 +1175,7 @@ Respond in JSON format:
         return {"raw_response": response}
 
 @api_router.post("/ai/improve-text")
-async def improve_text(request: AIRequest, current_user: User = Depends(get_current_user)):
-    if not current_user.is_premium:
-        raise HTTPException(status_code=403, detail="Premium subscription required")
-    
+async def improve_text(request: AIRequest, current_user: Principal = Depends(get_premium_user)):
     prompt = f"""Improve this resume text to be more impactful and professional:
 
 Original: {request.text}
@@ -1064,11 +1194,8 @@ Return only the improved text."""
     return {"improved_text": response}
 
 @api_router.post("/ai/generate-summary")
-async def generate_summary(request: SummaryGenerateRequest, current_user: User = Depends(get_current_user)):
+async def generate_summary(request: SummaryGenerateRequest, current_user: Principal = Depends(get_premium_user)):
     """Generate a professional summary based on experiences and skills"""
-    if not current_user.is_premium:
-        raise HTTPException(status_code=403, detail="Premium subscription required")
-    
     tone_instructions = {
         "professional": "formal, corporate, and achievement-focused",
         "casual": "friendly, approachable, but still professional",
@@ -1099,11 +1226,8 @@ Return only the summary text, no explanations."""
     return {"summary": response}
 
 @api_router.post("/ai/suggest-skills")
-async def suggest_skills(request: SkillsSuggestRequest, current_user: User = Depends(get_current_user)):
+async def suggest_skills(request: SkillsSuggestRequest, current_user: Principal = Depends(get_premium_user)):
     """Suggest relevant skills based on job title and industry"""
-    if not current_user.is_premium:
-        raise HTTPException(status_code=403, detail="Premium subscription required")
-    
     prompt = f"""Suggest relevant skills for a resume based on:
 
 Job Title: {request.job_title}
@@ -1131,11 +1255,8 @@ Respond in JSON format:
         return {"raw_response": response}
 
 @api_router.post("/ai/generate-cover-letter")
-async def generate_cover_letter(request: CoverLetterRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def generate_cover_letter(request: CoverLetterRequest, current_user: Principal = Depends(get_premium_user), db: AsyncSession = Depends(get_db)):
     """Generate a cover letter based on resume and job description"""
-    if not current_user.is_premium:
-        raise HTTPException(status_code=403, detail="Premium subscription required")
-    
     try:
         resume_uuid = uuid.UUID(request.resume_id)
     except ValueError:
@@ -1176,7 +1297,7 @@ Return only the cover letter text."""
 # ============== COVER LETTER ROUTES ==============
 
 @api_router.post("/cover-letters", response_model=CoverLetterResponse)
-async def create_cover_letter(data: CoverLetterCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def create_cover_letter(data: CoverLetterCreate, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     cover_letter_id = uuid.uuid4()
     now = datetime.now(timezone.utc)
     
@@ -1214,11 +1335,13 @@ async def create_cover_letter(data: CoverLetterCreate, current_user: User = Depe
     )
 
 @api_router.get("/cover-letters", response_model=List[CoverLetterResponse])
-async def get_cover_letters(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(CoverLetter).where(CoverLetter.user_id == current_user.id).order_by(CoverLetter.created_at.desc())
+async def get_cover_letters(response: Response, limit: Optional[int] = None, cursor: Optional[str] = None, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    query, size = paged_query(
+        paginate_by_created, select(CoverLetter).where(CoverLetter.user_id == current_user.id),
+        CoverLetter.created_at, CoverLetter.id, cursor=cursor, limit=limit
     )
-    letters = result.scalars().all()
+    result = await db.execute(query)
+    letters = page_rows(response, result.scalars().all(), size, lambda letter: (letter.created_at, letter.id))
     
     return [
         CoverLetterResponse(
@@ -1235,8 +1358,34 @@ async def get_cover_letters(current_user: User = Depends(get_current_user), db:
         for letter in letters
     ]
 
+@api_router.get("/cover-letters/summary", response_model=List[CoverLetterSummaryResponse])
+async def get_cover_letter_summaries(response: Response, limit: Optional[int] = None, cursor: Optional[str] = None, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """Cover letter listing without content or job description"""
+    query, size = paged_query(
+        paginate_by_created, select(CoverLetter).where(CoverLetter.user_id == current_user.id),
+        CoverLetter.created_at, CoverLetter.id, cursor=cursor, limit=limit
+    )
+    query = query.options(load_only(
+        CoverLetter.id, CoverLetter.resume_id, CoverLetter.title, CoverLetter.company_name,
+        CoverLetter.created_at, CoverLetter.updated_at, raiseload=True
+    ))
+    result = await db.execute(query)
+    letters = page_rows(response, result.scalars().all(), size, lambda letter: (letter.created_at, letter.id))
+    
+    return [
+        CoverLetterSummaryResponse(
+            id=str(letter.id),
+            resume_id=str(letter.resume_id) if letter.resume_id else None,
+            title=letter.title,
+            company_name=letter.company_name,
+            created_at=letter.created_at.isoformat(),
+            updated_at=letter.updated_at.isoformat()
+        )
+        for letter in letters
+    ]
+
 @api_router.get("/cover-letters/{letter_id}", response_model=CoverLetterResponse)
-async def get_cover_letter(letter_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_cover_letter(letter_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     try:
         letter_uuid = uuid.UUID(letter_id)
     except ValueError:
@@ -1265,7 +1414,7 @@ async def get_cover_letter(letter_id: str, current_user: User = Depends(get_curr
     )
 
 @api_router.put("/cover-letters/{letter_id}", response_model=CoverLetterResponse)
-async def update_cover_letter(letter_id: str, update: CoverLetterUpdate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def update_cover_letter(letter_id: str, update: CoverLetterUpdate, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     try:
         letter_uuid = uuid.UUID(letter_id)
     except ValueError:
@@ -1304,246 +1453,27 @@ async def update_cover_letter(letter_id: str, update: CoverLetterUpdate, current
     )
 
 @api_router.delete("/cover-letters/{letter_id}")
-async def delete_cover_letter(letter_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def delete_cover_letter(letter_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     try:
         letter_uuid = uuid.UUID(letter_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid cover letter ID format")
     
     result = await db.execute(
-        select(CoverLetter).where(
-            and_(CoverLetter.id == letter_uuid, CoverLetter.user_id == current_user.id)
-        )
+        delete(CoverLetter)
+        .where(and_(CoverLetter.id == letter_uuid, CoverLetter.user_id == current_user.id))
+        .returning(CoverLetter.id)
     )
-    letter = result.scalar_one_or_none()
-    
-    if not letter:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Cover letter not found")
     
-    await db.delete(letter)
     await db.commit()
     
     return {"message": "Cover letter deleted"}
 
 # ============== PDF GENERATION ==============
 
-def generate_professional_pdf(resume_data: dict) -> io.BytesIO:
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch, leftMargin=0.75*inch, rightMargin=0.75*inch)
-    
-    styles = getSampleStyleSheet()
-    
-    styles.add(ParagraphStyle(name='Name', fontSize=24, spaceAfter=6, textColor=colors.HexColor('#002FA7'), fontName='Helvetica-Bold'))
-    styles.add(ParagraphStyle(name='ContactInfo', fontSize=10, spaceAfter=12, textColor=colors.HexColor('#64748B')))
-    styles.add(ParagraphStyle(name='SectionTitle', fontSize=14, spaceBefore=16, spaceAfter=8, textColor=colors.HexColor('#002FA7'), fontName='Helvetica-Bold'))
-    styles.add(ParagraphStyle(name='JobTitle', fontSize=12, spaceAfter=2, fontName='Helvetica-Bold'))
-    styles.add(ParagraphStyle(name='Company', fontSize=11, spaceAfter=4, textColor=colors.HexColor('#64748B')))
-    styles.add(ParagraphStyle(name='BulletPoint', fontSize=10, leftIndent=15, spaceAfter=4, bulletIndent=0))
-    styles.add(ParagraphStyle(name='Summary', fontSize=10, spaceAfter=12, leading=14))
-    
-    story = []
-    data = resume_data.get('data', {})
-    personal = data.get('personal_info', {})
-    
-    story.append(Paragraph(personal.get('full_name', 'Your Name'), styles['Name']))
-    
-    contact_parts = []
-    if personal.get('email'): contact_parts.append(personal['email'])
-    if personal.get('phone'): contact_parts.append(personal['phone'])
-    if personal.get('location'): contact_parts.append(personal['location'])
-    if contact_parts:
-        story.append(Paragraph(' | '.join(contact_parts), styles['ContactInfo']))
-    
-    links = []
-    if personal.get('linkedin'): links.append(f"LinkedIn: {personal['linkedin']}")
-    if personal.get('portfolio'): links.append(f"Portfolio: {personal['portfolio']}")
-    if links:
-        story.append(Paragraph(' | '.join(links), styles['ContactInfo']))
-    
-    if personal.get('summary'):
-        story.append(Paragraph('PROFESSIONAL SUMMARY', styles['SectionTitle']))
-        story.append(Paragraph(personal['summary'], styles['Summary']))
-    
-    experiences = data.get('experiences', [])
-    if experiences:
-        story.append(Paragraph('EXPERIENCE', styles['SectionTitle']))
-        for exp in experiences:
-            story.append(Paragraph(exp.get('position', ''), styles['JobTitle']))
-            date_str = f"{exp.get('start_date', '')} - {'Present' if exp.get('current') else exp.get('end_date', '')}"
-            story.append(Paragraph(f"{exp.get('company', '')} | {date_str}", styles['Company']))
-            if exp.get('description'):
-                story.append(Paragraph(exp['description'], styles['BulletPoint']))
-            for achievement in exp.get('achievements', []):
-                story.append(Paragraph(f"• {achievement}", styles['BulletPoint']))
-            story.append(Spacer(1, 8))
-    
-    education = data.get('education', [])
-    if education:
-        story.append(Paragraph('EDUCATION', styles['SectionTitle']))
-        for edu in education:
-            story.append(Paragraph(f"{edu.get('degree', '')} in {edu.get('field', '')}", styles['JobTitle']))
-            date_str = f"{edu.get('start_date', '')} - {edu.get('end_date', '')}"
-            gpa_str = f" | GPA: {edu['gpa']}" if edu.get('gpa') else ""
-            story.append(Paragraph(f"{edu.get('institution', '')} | {date_str}{gpa_str}", styles['Company']))
-            story.append(Spacer(1, 8))
-    
-    skills = data.get('skills', [])
-    if skills:
-        story.append(Paragraph('SKILLS', styles['SectionTitle']))
-        story.append(Paragraph(', '.join(skills), styles['Summary']))
-    
-    projects = data.get('projects', [])
-    if projects:
-        story.append(Paragraph('PROJECTS', styles['SectionTitle']))
-        for proj in projects:
-            story.append(Paragraph(proj.get('name', ''), styles['JobTitle']))
-            if proj.get('description'):
-                story.append(Paragraph(proj['description'], styles['BulletPoint']))
-            if proj.get('technologies'):
-                story.append(Paragraph(f"Technologies: {', '.join(proj['technologies'])}", styles['Company']))
-            story.append(Spacer(1, 8))
-    
-    certs = data.get('certifications', [])
-    if certs:
-        story.append(Paragraph('CERTIFICATIONS', styles['SectionTitle']))
-        for cert in certs:
-            story.append(Paragraph(f"{cert.get('name', '')} - {cert.get('issuer', '')} ({cert.get('date', '')})", styles['BulletPoint']))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
-
-def generate_modern_pdf(resume_data: dict) -> io.BytesIO:
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch, leftMargin=0.75*inch, rightMargin=0.75*inch)
-    
-    styles = getSampleStyleSheet()
-    
-    styles.add(ParagraphStyle(name='ModernName', fontSize=28, spaceAfter=4, textColor=colors.HexColor('#0F172A'), fontName='Helvetica-Bold'))
-    styles.add(ParagraphStyle(name='ModernContact', fontSize=10, spaceAfter=16, textColor=colors.HexColor('#FF4F00')))
-    styles.add(ParagraphStyle(name='ModernSection', fontSize=12, spaceBefore=14, spaceAfter=6, textColor=colors.HexColor('#FF4F00'), fontName='Helvetica-Bold', borderPadding=4))
-    styles.add(ParagraphStyle(name='ModernJob', fontSize=11, spaceAfter=2, fontName='Helvetica-Bold', textColor=colors.HexColor('#0F172A')))
-    styles.add(ParagraphStyle(name='ModernCompany', fontSize=10, spaceAfter=4, textColor=colors.HexColor('#64748B'), fontName='Helvetica-Oblique'))
-    styles.add(ParagraphStyle(name='ModernBullet', fontSize=10, leftIndent=12, spaceAfter=3))
-    styles.add(ParagraphStyle(name='ModernSummary', fontSize=10, spaceAfter=10, leading=13, textColor=colors.HexColor('#374151')))
-    
-    story = []
-    data = resume_data.get('data', {})
-    personal = data.get('personal_info', {})
-    
-    story.append(Paragraph(personal.get('full_name', 'Your Name').upper(), styles['ModernName']))
-    
-    contact_parts = []
-    if personal.get('email'): contact_parts.append(personal['email'])
-    if personal.get('phone'): contact_parts.append(personal['phone'])
-    if personal.get('location'): contact_parts.append(personal['location'])
-    if personal.get('linkedin'): contact_parts.append(personal['linkedin'])
-    if contact_parts:
-        story.append(Paragraph(' • '.join(contact_parts), styles['ModernContact']))
-    
-    if personal.get('summary'):
-        story.append(Paragraph('— ABOUT —', styles['ModernSection']))
-        story.append(Paragraph(personal['summary'], styles['ModernSummary']))
-    
-    experiences = data.get('experiences', [])
-    if experiences:
-        story.append(Paragraph('— EXPERIENCE —', styles['ModernSection']))
-        for exp in experiences:
-            story.append(Paragraph(exp.get('position', ''), styles['ModernJob']))
-            date_str = f"{exp.get('start_date', '')} - {'Present' if exp.get('current') else exp.get('end_date', '')}"
-            story.append(Paragraph(f"{exp.get('company', '')} | {date_str}", styles['ModernCompany']))
-            if exp.get('description'):
-                story.append(Paragraph(exp['description'], styles['ModernBullet']))
-            for achievement in exp.get('achievements', []):
-                story.append(Paragraph(f"→ {achievement}", styles['ModernBullet']))
-            story.append(Spacer(1, 6))
-    
-    skills = data.get('skills', [])
-    if skills:
-        story.append(Paragraph('— SKILLS —', styles['ModernSection']))
-        story.append(Paragraph(' • '.join(skills), styles['ModernSummary']))
-    
-    education = data.get('education', [])
-    if education:
-        story.append(Paragraph('— EDUCATION —', styles['ModernSection']))
-        for edu in education:
-            story.append(Paragraph(f"{edu.get('degree', '')} in {edu.get('field', '')}", styles['ModernJob']))
-            story.append(Paragraph(f"{edu.get('institution', '')} | {edu.get('start_date', '')} - {edu.get('end_date', '')}", styles['ModernCompany']))
-            story.append(Spacer(1, 6))
-    
-    projects = data.get('projects', [])
-    if projects:
-        story.append(Paragraph('— PROJECTS —', styles['ModernSection']))
-        for proj in projects:
-            story.append(Paragraph(proj.get('name', ''), styles['ModernJob']))
-            if proj.get('description'):
-                story.append(Paragraph(proj['description'], styles['ModernBullet']))
-            story.append(Spacer(1, 6))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
-
-def generate_minimalist_pdf(resume_data: dict) -> io.BytesIO:
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.75*inch, bottomMargin=0.75*inch, leftMargin=1*inch, rightMargin=1*inch)
-    
-    styles = getSampleStyleSheet()
-    
-    styles.add(ParagraphStyle(name='MinName', fontSize=20, spaceAfter=8, textColor=colors.HexColor('#0F172A'), fontName='Helvetica'))
-    styles.add(ParagraphStyle(name='MinContact', fontSize=9, spaceAfter=20, textColor=colors.HexColor('#6B7280')))
-    styles.add(ParagraphStyle(name='MinSection', fontSize=10, spaceBefore=16, spaceAfter=8, textColor=colors.HexColor('#9CA3AF'), fontName='Helvetica', leftIndent=0))
-    styles.add(ParagraphStyle(name='MinJob', fontSize=10, spaceAfter=2, fontName='Helvetica-Bold'))
-    styles.add(ParagraphStyle(name='MinCompany', fontSize=9, spaceAfter=4, textColor=colors.HexColor('#6B7280')))
-    styles.add(ParagraphStyle(name='MinBullet', fontSize=9, leftIndent=10, spaceAfter=2, textColor=colors.HexColor('#374151')))
-    styles.add(ParagraphStyle(name='MinSummary', fontSize=9, spaceAfter=8, leading=12, textColor=colors.HexColor('#374151')))
-    
-    story = []
-    data = resume_data.get('data', {})
-    personal = data.get('personal_info', {})
-    
-    story.append(Paragraph(personal.get('full_name', 'Your Name'), styles['MinName']))
-    
-    contact_parts = []
-    if personal.get('email'): contact_parts.append(personal['email'])
-    if personal.get('phone'): contact_parts.append(personal['phone'])
-    if personal.get('location'): contact_parts.append(personal['location'])
-    if contact_parts:
-        story.append(Paragraph(' / '.join(contact_parts), styles['MinContact']))
-    
-    if personal.get('summary'):
-        story.append(Paragraph(personal['summary'], styles['MinSummary']))
-    
-    experiences = data.get('experiences', [])
-    if experiences:
-        story.append(Paragraph('Experience', styles['MinSection']))
-        for exp in experiences:
-            date_str = f"{exp.get('start_date', '')}–{'Present' if exp.get('current') else exp.get('end_date', '')}"
-            story.append(Paragraph(f"{exp.get('position', '')} at {exp.get('company', '')}", styles['MinJob']))
-            story.append(Paragraph(date_str, styles['MinCompany']))
-            for achievement in exp.get('achievements', []):
-                story.append(Paragraph(f"· {achievement}", styles['MinBullet']))
-            story.append(Spacer(1, 4))
-    
-    education = data.get('education', [])
-    if education:
-        story.append(Paragraph('Education', styles['MinSection']))
-        for edu in education:
-            story.append(Paragraph(f"{edu.get('degree', '')} · {edu.get('field', '')}", styles['MinJob']))
-            story.append(Paragraph(f"{edu.get('institution', '')} · {edu.get('end_date', '')}", styles['MinCompany']))
-            story.append(Spacer(1, 4))
-    
-    skills = data.get('skills', [])
-    if skills:
-        story.append(Paragraph('Skills', styles['MinSection']))
-        story.append(Paragraph(', '.join(skills), styles['MinSummary']))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
-
-@api_router.get("/resumes/{resume_id}/pdf")
-async def generate_pdf(resume_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_owned_resume(resume_id: str, current_user: Principal, db: AsyncSession) -> Resume:
     try:
         resume_uuid = uuid.UUID(resume_id)
     except ValueError:
@@ -1558,133 +1488,284 @@ async def generate_pdf(resume_id: str, current_user: User = Depends(get_current_
     
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
+    return resume
+
+def get_resume_document(resume: Resume) -> ResumeDocument:
+    """Normalized document for the resume's current version, shared by all exporters"""
+    return cached_document(resume.id, resume.version, resume.title, resume.template, resume.data)
+
+MAX_FIT_PAGES = 5
+
+async def await_render(job):
+    """Await a render pool job, mapping back-pressure and timeouts to HTTP errors"""
+    try:
+        return await job
+    except RenderQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF renderer is busy, please retry shortly",
+            headers={"Retry-After": str(RENDER_RETRY_AFTER_SECONDS)}
+        )
+    except RenderTimeout:
+        raise HTTPException(status_code=504, detail="PDF generation timed out")
+
+def check_fit_pages(fit_pages: Optional[int]):
+    if fit_pages is not None and not 1 <= fit_pages <= MAX_FIT_PAGES:
+        raise HTTPException(status_code=400, detail=f"fit_pages must be between 1 and {MAX_FIT_PAGES}")
+
+async def render_resume_pdf(resume_id, version: int, template: str, document: ResumeDocument, fit_pages: Optional[int] = None) -> bytes:
+    """Render through the process pool, at most once per (resume, version, template, fit)"""
+    template = resolve_template(template)
+    cache_key = render_cache_key(resume_id, version, template, fit_pages)
+    return await render_cache.get_or_render(
+        cache_key, lambda: render_pool.render(template, document, fit_pages)
+    )
+
+def schedule_prerender(resume: Resume):
+    """Warm the render cache for a just-saved version once autosaves settle"""
+    resume_id, version, template = resume.id, resume.version, resume.template
+    document = get_resume_document(resume)
     
-    # Convert to dict format for PDF generation
-    resume_data = {
-        "id": str(resume.id),
-        "title": resume.title,
-        "template": resume.template,
-        "data": resume.data
+    async def job():
+        # Leave the workers to interactive downloads when they are backed up
+        if render_pool.queue_depth > 0:
+            return
+        await render_resume_pdf(resume_id, version, template, document)
+    
+    prerenderer.schedule(str(resume_id), job)
+
+async def build_pdf_response(resume: Resume, if_none_match: Optional[str], fit_pages: Optional[int] = None, template: Optional[str] = None,
+                             range_header: Optional[str] = None, if_range: Optional[str] = None) -> Response:
+    """
+    Serve a resume PDF from the render cache, rendering it at most once per
+    version. Spooled files are sent from disk with Range support.
+    """
+    check_fit_pages(fit_pages)
+    template = resolve_template(template or resume.template)
+    cache_key = render_cache_key(resume.id, resume.version, template, fit_pages)
+    etag = f'"{cache_key}"'
+    filename = f"{(resume.title or 'resume').replace(' ', '_')}.pdf"
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f"attachment; filename={filename}",
     }
     
-    template = resume.template
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+        return Response(status_code=304, headers=headers)
     
-    if template == 'modern':
-        pdf_buffer = generate_modern_pdf(resume_data)
-    elif template == 'minimalist':
-        pdf_buffer = generate_minimalist_pdf(resume_data)
-    else:
-        pdf_buffer = generate_professional_pdf(resume_data)
+    document = get_resume_document(resume)
+    render = lambda: render_pool.render(template, document, fit_pages)
     
-    # Track download analytics
-    await track_resume_event(resume_id, "download", db)
+    pdf_file = await await_render(render_cache.get_or_render_file(cache_key, render))
+    if pdf_file:
+        return RangedFileResponse(pdf_file, range_header=range_header, if_range=if_range, headers=headers, media_type="application/pdf")
     
-    filename = f"{resume.title.replace(' ', '_')}.pdf"
-    
-    return StreamingResponse(
-        pdf_buffer,
+    # No disk tier (e.g. read-only filesystem): serve from memory
+    pdf_bytes = await await_render(render_cache.get_or_render(cache_key, render))
+    return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
+
+@api_router.get("/resumes/{resume_id}/pdf")
+async def generate_pdf(resume_id: str, fit_pages: Optional[int] = None, template: Optional[str] = None, if_none_match: Optional[str] = Header(None), range_header: Optional[str] = Header(None, alias="Range"), if_range: Optional[str] = Header(None), current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    # template renders the current version in another template without saving it
+    resume = await get_owned_resume(resume_id, current_user, db)
+    
+    response = await build_pdf_response(resume, if_none_match, fit_pages, template, range_header, if_range)
+    
+    # Track download analytics (resumed partial downloads aren't new downloads)
+    if not range_header:
+        await analytics_buffer.record(db, resume.id, "download")
+    
+    return response
+
+@api_router.get("/resumes/{resume_id}/pdf/measure")
+async def measure_pdf_layout(resume_id: str, fit_pages: Optional[int] = None, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """Page count and per-section heights without rendering; with fit_pages, at the auto-fit scale"""
+    check_fit_pages(fit_pages)
+    resume = await get_owned_resume(resume_id, current_user, db)
+    
+    measurement = await await_render(
+        render_pool.measure(resolve_template(resume.template), get_resume_document(resume), fit_pages)
+    )
+    return measurement.as_dict()
+
+@api_router.get("/resumes/{resume_id}/pdf/templates")
+async def download_template_bundle(resume_id: str, fit_pages: Optional[int] = None, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """Render the resume in every template at once and return the PDFs as a ZIP"""
+    check_fit_pages(fit_pages)
+    resume = await get_owned_resume(resume_id, current_user, db)
+    document = get_resume_document(resume)
+    templates = template_names()
+    
+    # Fan out across the render pool; each variant also lands in the render
+    # cache, so a later single-template download is served without a render
+    rendered = await await_render(asyncio.gather(*[
+        render_resume_pdf(resume.id, resume.version, template, document, fit_pages)
+        for template in templates
+    ]))
+    
+    stem = (resume.title or 'resume').replace(' ', '_').replace('/', '_')
+    archive = ZipStreamWriter()
+    content = b"".join(
+        archive.add(f"{stem}-{template}.pdf", pdf_bytes, compress=False)
+        for template, pdf_bytes in zip(templates, rendered)
+    ) + archive.close()
+    
+    return Response(
+        content=content,
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={stem}-templates.zip"}
+    )
+
+@api_router.post("/render/preview")
+async def render_preview(request: PreviewRequest, current_user: Principal = Depends(get_current_user)):
+    """Render unsaved resume data to PDF without writing a version"""
+    check_fit_pages(request.fit_pages)
+    template = resolve_template(request.template)
+    document = build_document("", template, request.data.model_dump())
+    cache_key = preview_cache_key(document.fingerprint(), template, request.fit_pages)
+    
+    pdf_bytes = await await_render(preview_cache.get_or_render(
+        cache_key, lambda: render_pool.render(template, document, request.fit_pages)
+    ))
+    return Response(
+        content=pdf_bytes,
         media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        headers={"Cache-Control": "no-store", "Content-Disposition": "inline; filename=preview.pdf"}
     )
 
 # ============== EXPORT ROUTES ==============
 
-@api_router.get("/resumes/{resume_id}/export/json")
-async def export_resume_json(resume_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    """Export resume data as JSON for backup"""
-    try:
-        resume_uuid = uuid.UUID(resume_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid resume ID format")
-    
-    result = await db.execute(
-        select(Resume).where(
-            and_(Resume.id == resume_uuid, Resume.user_id == current_user.id)
+ARCHIVE_FORMATS = ("pdf", "json", "txt", "md", "html")
+ARCHIVE_ROWS_PER_FETCH = 20
+
+async def stream_resume_archive(user_id: uuid.UUID, formats: List[str]):
+    """
+    Yield a ZIP of every resume owned by user_id. Rows are fetched in small
+    batches and PDF renders are kept to a fixed window, so memory stays flat
+    no matter how many resumes the account has.
+    """
+    archive = ZipStreamWriter()
+    window = max(render_pool.workers, 1) * 2
+    pending = set()
+    errors = []
+    
+    async def render_entry(name: str, resume_id, version: int, template: str, document: ResumeDocument):
+        try:
+            return name, await render_resume_pdf(resume_id, version, template, document)
+        except Exception as e:
+            errors.append(f"{name}: {type(e).__name__}")
+            return name, None
+    
+    def collect(done) -> bytes:
+        chunks = []
+        for task in done:
+            name, pdf_bytes = task.result()
+            if pdf_bytes is not None:
+                chunks.append(archive.add(name, pdf_bytes, compress=False))
+        return b"".join(chunks)
+    
+    # The request's session is closed before streaming starts, so use a dedicated one
+    async with async_session() as session:
+        result = await session.stream(
+            select(Resume)
+            .where(Resume.user_id == user_id)
+            .order_by(Resume.created_at.desc())
+            .execution_options(yield_per=ARCHIVE_ROWS_PER_FETCH)
         )
+        async for resume in result.scalars():
+            document = build_document(resume.title, resume.template, resume.data)
+            stem = f"{(resume.title or 'resume').replace(' ', '_').replace('/', '_')}-{str(resume.id)[:8]}"
+            
+            if "json" in formats:
+                payload = json.dumps(resume_export_dict(resume, document), indent=2)
+                yield archive.add(f"{stem}.json", payload.encode('utf-8'))
+            if "txt" in formats:
+                yield archive.add(f"{stem}.txt", to_text(document).encode('utf-8'))
+            if "md" in formats:
+                yield archive.add(f"{stem}.md", to_markdown(document).encode('utf-8'))
+            if "html" in formats:
+                yield archive.add(f"{stem}.html", to_html(document).encode('utf-8'))
+            
+            if "pdf" in formats:
+                pending.add(asyncio.create_task(
+                    render_entry(f"{stem}.pdf", resume.id, resume.version, resume.template, document)
+                ))
+                if len(pending) >= window:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    yield collect(done)
+    
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        yield collect(done)
+    
+    if errors:
+        yield archive.add("export_errors.txt", "\n".join(errors).encode('utf-8'))
+    yield archive.close()
+
+def text_download(content: str, media_type: str, title: str, extension: str) -> Response:
+    filename = f"{(title or 'resume').replace(' ', '_')}.{extension}"
+    return Response(
+        content=content.encode('utf-8'),
+        media_type=f"{media_type}; charset=utf-8",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
-    resume = result.scalar_one_or_none()
-    
-    if not resume:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    
+
+def resume_export_dict(resume: Resume, document: ResumeDocument) -> dict:
     return {
         "id": str(resume.id),
         "user_id": str(resume.user_id),
         "title": resume.title,
         "template": resume.template,
-        "data": resume.data,
+        "data": document.as_data(),
         "ats_score": resume.ats_score,
         "version": resume.version,
         "created_at": resume.created_at.isoformat(),
         "updated_at": resume.updated_at.isoformat()
     }
 
-@api_router.get("/resumes/{resume_id}/export/txt")
-async def export_resume_txt(resume_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    """Export resume as plain text"""
-    try:
-        resume_uuid = uuid.UUID(resume_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid resume ID format")
-    
-    result = await db.execute(
-        select(Resume).where(
-            and_(Resume.id == resume_uuid, Resume.user_id == current_user.id)
-        )
-    )
-    resume = result.scalar_one_or_none()
-    
-    if not resume:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    
-    data = resume.data
-    personal = data.get('personal_info', {})
-    
-    lines = []
-    lines.append(personal.get('full_name', '').upper())
-    lines.append(f"{personal.get('email', '')} | {personal.get('phone', '')} | {personal.get('location', '')}")
-    lines.append("")
-    
-    if personal.get('summary'):
-        lines.append("PROFESSIONAL SUMMARY")
-        lines.append(personal['summary'])
-        lines.append("")
-    
-    experiences = data.get('experiences', [])
-    if experiences:
-        lines.append("EXPERIENCE")
-        for exp in experiences:
-            lines.append(f"{exp.get('position', '')} at {exp.get('company', '')}")
-            lines.append(f"{exp.get('start_date', '')} - {'Present' if exp.get('current') else exp.get('end_date', '')}")
-            for ach in exp.get('achievements', []):
-                lines.append(f"  • {ach}")
-            lines.append("")
-    
-    education = data.get('education', [])
-    if education:
-        lines.append("EDUCATION")
-        for edu in education:
-            lines.append(f"{edu.get('degree', '')} in {edu.get('field', '')}")
-            lines.append(f"{edu.get('institution', '')} | {edu.get('end_date', '')}")
-            lines.append("")
-    
-    skills = data.get('skills', [])
-    if skills:
-        lines.append("SKILLS")
-        lines.append(", ".join(skills))
-    
-    text_content = "\n".join(lines)
+@api_router.get("/resumes/export/archive")
+async def export_resume_archive(format: str = "pdf", current_user: Principal = Depends(get_current_user)):
+    """Export all of the user's resumes as a streamed ZIP archive"""
+    formats = [f.strip().lower() for f in format.split(',') if f.strip()]
+    unknown = set(formats) - set(ARCHIVE_FORMATS)
+    if not formats or unknown:
+        raise HTTPException(status_code=400, detail=f"Supported formats: {', '.join(ARCHIVE_FORMATS)}")
     
     return StreamingResponse(
-        io.BytesIO(text_content.encode('utf-8')),
-        media_type="text/plain",
-        headers={"Content-Disposition": f"attachment; filename={resume.get('title', 'resume')}.txt"}
+        stream_resume_archive(current_user.id, formats),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=vitaecraft-resumes.zip"}
     )
 
+@api_router.get("/resumes/{resume_id}/export/json")
+async def export_resume_json(resume_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """Export resume data as JSON for backup"""
+    resume = await get_owned_resume(resume_id, current_user, db)
+    return resume_export_dict(resume, get_resume_document(resume))
+
+@api_router.get("/resumes/{resume_id}/export/txt")
+async def export_resume_txt(resume_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """Export resume as plain text"""
+    resume = await get_owned_resume(resume_id, current_user, db)
+    return text_download(to_text(get_resume_document(resume)), "text/plain", resume.title, "txt")
+
+@api_router.get("/resumes/{resume_id}/export/md")
+async def export_resume_markdown(resume_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """Export resume as Markdown"""
+    resume = await get_owned_resume(resume_id, current_user, db)
+    return text_download(to_markdown(get_resume_document(resume)), "text/markdown", resume.title, "md")
+
+@api_router.get("/resumes/{resume_id}/export/html")
+async def export_resume_html(resume_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """Export resume as a standalone HTML page"""
+    resume = await get_owned_resume(resume_id, current_user, db)
+    return text_download(to_html(get_resume_document(resume)), "text/html", resume.title, "html")
+
 # ============== PAYMENT ROUTES ==============
 
 @api_router.post("/payments/create-checkout")
-async def create_checkout(request: PaymentRequest, http_request: Request, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def create_checkout(request: PaymentRequest, http_request: Request, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if request.plan not in PRICING:
         raise HTTPException(status_code=400, detail="Invalid plan selected")
     
@@ -1738,7 +1819,7 @@ async def create_checkout(request: PaymentRequest, http_request: Request, curren
     return {"url": session.url, "session_id": session.id}
 
 @api_router.get("/payments/status/{session_id}")
-async def get_payment_status(session_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_payment_status(session_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     stripe_api_key = os.environ.get('STRIPE_API_KEY')
     if not stripe_api_key:
         raise HTTPException(status_code=500, detail="STRIPE_API_KEY is not set")
@@ -1767,6 +1848,7 @@ async def get_payment_status(session_id: str, current_user: User = Depends(get_c
                 user.subscription_type = transaction.plan
             
             await db.commit()
+            principal_cache.invalidate(current_user.id)
     elif transaction and session.status == "expired":
         transaction.status = "expired"
         transaction.payment_status = "expired"
@@ -1780,15 +1862,14 @@ async def get_payment_status(session_id: str, current_user: User = Depends(get_c
     }
 
 @api_router.get("/payments/history")
-async def get_payment_history(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_payment_history(response: Response, limit: Optional[int] = None, cursor: Optional[str] = None, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Get user's payment history"""
-    result = await db.execute(
-        select(PaymentTransaction)
-        .where(PaymentTransaction.user_id == current_user.id)
-        .order_by(PaymentTransaction.created_at.desc())
-        .limit(50)
+    query, size = paged_query(
+        paginate_by_created, select(PaymentTransaction).where(PaymentTransaction.user_id == current_user.id),
+        PaymentTransaction.created_at, PaymentTransaction.id, cursor=cursor, limit=limit, default=50
     )
-    transactions = result.scalars().all()
+    result = await db.execute(query)
+    transactions = page_rows(response, result.scalars().all(), size, lambda t: (t.created_at, t.id))
     
     return [
         {
@@ -1844,6 +1925,7 @@ async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_db)):
                     user.subscription_type = transaction.plan
                 
                 await db.commit()
+                principal_cache.invalidate(transaction.user_id)
         
         return {"received": True}
     except Exception as e:
@@ -1853,7 +1935,7 @@ async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_db)):
 # ============== LINKEDIN IMPORT (COMING SOON) ==============
 
 @api_router.post("/linkedin/import")
-async def import_linkedin(request: LinkedInImportRequest, current_user: User = Depends(get_current_user)):
+async def import_linkedin(request: LinkedInImportRequest, current_user: Principal = Depends(get_current_user)):
     """
     LinkedIn Import - COMING SOON
     This feature requires LinkedIn OAuth integration which needs LinkedIn Developer approval.
@@ -1867,7 +1949,7 @@ async def import_linkedin(request: LinkedInImportRequest, current_user: User = D
 # ============== P3: USER PREFERENCES (DARK MODE) ==============
 
 @api_router.get("/user/preferences")
-async def get_user_preferences(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_user_preferences(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Get user preferences including theme"""
     result = await db.execute(
         select(UserPreferences).where(UserPreferences.user_id == current_user.id)
@@ -1884,7 +1966,7 @@ async def get_user_preferences(current_user: User = Depends(get_current_user), d
     }
 
 @api_router.put("/user/preferences")
-async def update_user_preferences(data: UserPreferencesUpdate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def update_user_preferences(data: UserPreferencesUpdate, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Update user preferences (theme, etc.)"""
     if data.theme:
         if data.theme not in ["light", "dark"]:
@@ -1922,7 +2004,7 @@ async def update_user_preferences(data: UserPreferencesUpdate, current_user: Use
 # ============== P3: RESUME ANALYTICS ==============
 
 @api_router.get("/resumes/{resume_id}/analytics", response_model=ResumeAnalyticsResponse)
-async def get_resume_analytics(resume_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_resume_analytics(resume_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     """Get analytics for a specific resume"""
     try:
         resume_uuid = uuid.UUID(resume_id)
@@ -1966,92 +2048,53 @@ async def get_resume_analytics(resume_id: str, current_user: User = Depends(get_
     )
 
 @api_router.get("/analytics/dashboard")
-async def get_analytics_dashboard(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_analytics_dashboard(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Get analytics overview for all user's resumes"""
+    # Misses read the primary: a lagging replica's dashboard would be cached
+    # past the invalidations this process has already seen
+    dashboard = dashboard_cache.get(current_user.id)
+    if dashboard is not None:
+        return dashboard
+    
+    generation = dashboard_cache.generation()
+    views = func.coalesce(ResumeAnalytics.view_count, 0)
+    downloads = func.coalesce(ResumeAnalytics.download_count, 0)
+    # One pass over the user's resumes; the totals ride along on every row
     result = await db.execute(
-        select(Resume.id, Resume.title)
+        select(
+            Resume.id,
+            Resume.title,
+            views.label("view_count"),
+            downloads.label("download_count"),
+            func.sum(views).over().label("total_views"),
+            func.sum(downloads).over().label("total_downloads"),
+        )
+        .outerjoin(ResumeAnalytics, ResumeAnalytics.resume_id == Resume.id)
         .where(Resume.user_id == current_user.id)
     )
-    resumes = result.all()
-    
-    analytics_list = []
-    total_views = 0
-    total_downloads = 0
+    rows = result.all()
     
-    for resume_id, title in resumes:
-        result = await db.execute(
-            select(ResumeAnalytics).where(ResumeAnalytics.resume_id == resume_id)
-        )
-        analytics = result.scalar_one_or_none()
-        
-        if analytics:
-            analytics_dict = {
-                "resume_id": str(resume_id),
-                "title": title,
-                "view_count": analytics.view_count,
-                "download_count": analytics.download_count
-            }
-            total_views += analytics.view_count
-            total_downloads += analytics.download_count
-        else:
-            analytics_dict = {
-                "resume_id": str(resume_id),
-                "title": title,
-                "view_count": 0,
-                "download_count": 0
+    dashboard = {
+        "total_resumes": len(rows),
+        "total_views": rows[0].total_views if rows else 0,
+        "total_downloads": rows[0].total_downloads if rows else 0,
+        "resumes": [
+            {
+                "resume_id": str(row.id),
+                "title": row.title,
+                "view_count": row.view_count,
+                "download_count": row.download_count
             }
-        analytics_list.append(analytics_dict)
-    
-    return {
-        "total_resumes": len(resumes),
-        "total_views": total_views,
-        "total_downloads": total_downloads,
-        "resumes": analytics_list
+            for row in rows
+        ]
     }
-
-async def track_resume_event(resume_id: str, event_type: str, db: AsyncSession, ats_score: int = None):
-    """Helper to track resume events"""
-    try:
-        resume_uuid = uuid.UUID(resume_id)
-    except ValueError:
-        return
-    
-    now = datetime.now(timezone.utc)
-    
-    # Get or create analytics record
-    result = await db.execute(
-        select(ResumeAnalytics).where(ResumeAnalytics.resume_id == resume_uuid)
-    )
-    analytics = result.scalar_one_or_none()
-    
-    if not analytics:
-        analytics = ResumeAnalytics(
-            id=uuid.uuid4(),
-            resume_id=resume_uuid,
-            view_count=0,
-            download_count=0,
-            ats_score_history=[]
-        )
-        db.add(analytics)
-    
-    if event_type == "view":
-        analytics.view_count += 1
-        analytics.last_viewed = now
-    elif event_type == "download":
-        analytics.download_count += 1
-        analytics.last_downloaded = now
-    elif event_type == "ats_score" and ats_score is not None:
-        if analytics.ats_score_history is None:
-            analytics.ats_score_history = []
-        analytics.ats_score_history.append({"score": ats_score, "date": now.isoformat()})
-    
-    analytics.updated_at = now
-    await db.commit()
+    dashboard_cache.put(current_user.id, [row.id for row in rows], dashboard, generation)
+    return dashboard
 
 # ============== P3: PUBLIC RESUME SHARING ==============
 
 @api_router.post("/resumes/{resume_id}/share", response_model=PublicResumeResponse)
-async def create_public_share(resume_id: str, data: PublicResumeCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def create_public_share(resume_id: str, data: PublicResumeCreate, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Create a public shareable link for a resume"""
     try:
         resume_uuid = uuid.UUID(resume_id)
@@ -2116,7 +2159,7 @@ async def create_public_share(resume_id: str, data: PublicResumeCreate, current_
     )
 
 @api_router.get("/resumes/{resume_id}/share")
-async def get_share_info(resume_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_share_info(resume_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Get public share info for a resume"""
     try:
         resume_uuid = uuid.UUID(resume_id)
@@ -2153,38 +2196,35 @@ async def get_share_info(resume_id: str, current_user: User = Depends(get_curren
     }
 
 @api_router.delete("/resumes/{resume_id}/share")
-async def delete_public_share(resume_id: str, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def delete_public_share(resume_id: str, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Remove public sharing for a resume"""
     try:
         resume_uuid = uuid.UUID(resume_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid resume ID format")
     
-    # Check if resume exists and belongs to user
-    result = await db.execute(
-        select(Resume).where(and_(Resume.id == resume_uuid, Resume.user_id == current_user.id))
-    )
-    resume = result.scalar_one_or_none()
-    if not resume:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    
-    # Delete share
     result = await db.execute(
-        select(PublicResume).where(PublicResume.resume_id == resume_uuid)
+        delete(PublicResume)
+        .where(and_(PublicResume.resume_id == resume_uuid, PublicResume.user_id == current_user.id))
+        .returning(PublicResume.id)
     )
-    share = result.scalar_one_or_none()
-    if not share:
+    if result.scalar_one_or_none() is None:
+        # Only the failure path needs to tell a missing resume from a missing link
+        result = await db.execute(
+            select(Resume.id).where(and_(Resume.id == resume_uuid, Resume.user_id == current_user.id))
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Resume not found")
         raise HTTPException(status_code=404, detail="No public link found")
     
-    await db.delete(share)
     await db.commit()
     
     return {"message": "Public link removed"}
 
 @api_router.get("/public/resume/{slug}")
-async def get_public_resume(slug: str, password: str = None, db: AsyncSession = Depends(get_db)):
+async def get_public_resume(slug: str, password: str = None, db: AsyncSession = Depends(get_db), read_db: AsyncSession = Depends(get_read_db)):
     """View a public resume (no auth required)"""
-    result = await db.execute(
+    result = await read_db.execute(
         select(PublicResume).where(PublicResume.slug == slug)
     )
     share = result.scalar_one_or_none()
@@ -2199,17 +2239,15 @@ async def get_public_resume(slug: str, password: str = None, db: AsyncSession =
             raise HTTPException(status_code=401, detail="Invalid password")
     
     # Get resume
-    result = await db.execute(
+    result = await read_db.execute(
         select(Resume).where(Resume.id == share.resume_id)
     )
     resume = result.scalar_one_or_none()
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    # Track view
-    share.view_count += 1
-    await db.commit()
-    await track_resume_event(str(share.resume_id), "view", db)
+    # Track view (on the primary; the share row above may come from the replica)
+    await analytics_buffer.record(db, share.resume_id, "view", share_id=share.id)
     
     # Return resume data (excluding user_id for privacy)
     return {
@@ -2219,9 +2257,9 @@ async def get_public_resume(slug: str, password: str = None, db: AsyncSession =
     }
 
 @api_router.get("/public/resume/{slug}/pdf")
-async def get_public_resume_pdf(slug: str, password: str = None, db: AsyncSession = Depends(get_db)):
+async def get_public_resume_pdf(slug: str, password: str = None, fit_pages: Optional[int] = None, if_none_match: Optional[str] = Header(None), range_header: Optional[str] = Header(None, alias="Range"), if_range: Optional[str] = Header(None), db: AsyncSession = Depends(get_db), read_db: AsyncSession = Depends(get_read_db)):
     """Download public resume as PDF"""
-    result = await db.execute(
+    result = await read_db.execute(
         select(PublicResume).where(PublicResume.slug == slug)
     )
     share = result.scalar_one_or_none()
@@ -2235,32 +2273,20 @@ async def get_public_resume_pdf(slug: str, password: str = None, db: AsyncSessio
             raise HTTPException(status_code=401, detail="Invalid password")
     
     # Get resume
-    result = await db.execute(
+    result = await read_db.execute(
         select(Resume).where(Resume.id == share.resume_id)
     )
     resume = result.scalar_one_or_none()
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    template = resume.template or 'professional'
-    
-    if template == 'modern':
-        pdf_buffer = generate_modern_pdf(resume)
-    elif template == 'minimalist':
-        pdf_buffer = generate_minimalist_pdf(resume)
-    else:
-        pdf_buffer = generate_professional_pdf(resume)
+    response = await build_pdf_response(resume, if_none_match, fit_pages, range_header=range_header, if_range=if_range)
     
     # Track download
-    await track_resume_event(share["resume_id"], "download")
-    
-    filename = f"{resume.get('title', 'resume').replace(' ', '_')}.pdf"
+    if not range_header:
+        await analytics_buffer.record(db, share.resume_id, "download")
     
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    return response
 
 # ============== ROOT ROUTE ==============
 
@@ -2268,6 +2294,27 @@ async def get_public_resume_pdf(slug: str, password: str = None, db: AsyncSessio
 async def root():
     return {"message": "VitaeCraft API", "version": "1.1.0"}
 
+@api_router.get("/metrics")
+async def get_metrics(x_metrics_token: Optional[str] = Header(None)):
+    """Runtime metrics for the PDF render pipeline, version history and auth cache"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_metrics_token or not secrets.compare_digest(x_metrics_token, METRICS_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    
+    return {
+        "render_pool": render_pool.stats(),
+        "render_cache": render_cache.stats(),
+        "preview_cache": preview_cache.stats(),
+        "prerender": prerenderer.stats(),
+        "version_cache": version_cache.stats(),
+        "autosave": autosave_stats(),
+        "principal_cache": principal_cache.stats(),
+        "version_compaction": version_compactor.stats(),
+        "analytics_buffer": analytics_buffer.stats(),
+        "analytics_dashboard_cache": dashboard_cache.stats(),
+    }
+
 @app.options("/{full_path:path}")
 async def preflight_handler(full_path: str):
     """Handle CORS preflight requests"""
@@ -2281,8 +2328,21 @@ app.include_router(api_router)
 async def startup():
     await init_db()
     print("✅ Database initialized on startup")
+    print(f"✅ Database engine: {describe_engine()}")
+    if replica_engine is not None:
+        print("✅ Read replica enabled for read-only routes")
+    await render_pool.start()
+    version_compactor.start()
+    analytics_buffer.start()
 
 @app.on_event("shutdown")
 async def shutdown():
+    version_compactor.shutdown()
+    await analytics_buffer.shutdown()
+    prerenderer.shutdown()
+    render_pool.shutdown()
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
     print("🛑 Shutting down VitaeCraft API")
 
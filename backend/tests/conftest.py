@@ -0,0 +1,108 @@
+"""
+Shared test setup
+
+Puts backend/ on sys.path and, when TEST_DATABASE_URL is set, points the
+app's engine at it before any test module imports database.py. Tests that
+need the database skip themselves when it is unset.
+"""
+
+import asyncio
+import copy
+import os
+import random
+import sys
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+if TEST_DATABASE_URL:
+    os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+
+
+@pytest.fixture(scope="module")
+def run():
+    """Runs a coroutine to completion against the migrated test database"""
+    from database import engine, init_db
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(init_db())
+    try:
+        yield loop.run_until_complete
+    finally:
+        loop.run_until_complete(engine.dispose())
+        loop.close()
+
+
+def edit_document(document, rng):
+    """Copy of a resume document with one random edit, nested lists included"""
+    document = copy.deepcopy(document)
+    experience = document["experience"]
+    choice = rng.randrange(5)
+    if choice == 0 or not experience:
+        experience.insert(rng.randrange(len(experience) + 1), {
+            "company": f"Company {rng.randrange(1000)}",
+            "bullets": [f"Built {rng.randrange(1000)}"],
+        })
+    elif choice == 1:
+        del experience[rng.randrange(len(experience))]
+    elif choice == 2:
+        bullets = rng.choice(experience)["bullets"]
+        bullets.insert(rng.randrange(len(bullets) + 1), f"Shipped {rng.randrange(1000)}")
+    elif choice == 3:
+        document["skills"].append(f"skill/{rng.randrange(100)}~{rng.randrange(10)}")
+    else:
+        document["summary"] = f"Summary {rng.randrange(10 ** 6)}"
+    return document
+
+
+@pytest.fixture(scope="module")
+def build_history(run):
+    """
+    Creates a resume and saves an edit of it at each (time, editor session)
+    in saves. Returns the resume id and {version: document} for every
+    version it went through, the working copy included.
+    """
+    from sqlalchemy import select
+
+    from database import async_session
+    from models import Resume, User
+    from version_history import newest_delta, save_resume
+
+    async def build(saves, seed):
+        rng = random.Random(seed)
+        # Big enough that a single edit is stored as a patch, not in full
+        data = {
+            "summary": "Engineer " * 20,
+            "skills": [f"skill {n}" for n in range(10)],
+            "experience": [{"company": f"Company {n}", "bullets": [f"Built {n}"] * 3} for n in range(5)],
+        }
+        created = saves[0][0] - timedelta(minutes=1)
+        async with async_session() as db:
+            user = User(email=f"history-{uuid.uuid4()}@example.com", password="x", full_name="History")
+            db.add(user)
+            await db.flush()
+            resume = Resume(user_id=user.id, title="History", data=data, version=1,
+                            created_at=created, updated_at=created)
+            db.add(resume)
+            await db.commit()
+            resume_id = resume.id
+
+        documents = {1: data}
+        for version, (now, session) in enumerate(saves, start=2):
+            data = edit_document(data, rng)
+            async with async_session() as db:
+                resume, newest_patch = (await db.execute(
+                    select(Resume, newest_delta()).where(Resume.id == resume_id)
+                )).one()
+                assert await save_resume(db, resume, newest_patch, {"data": data}, session, now) is not None
+                await db.commit()
+            documents[version] = data
+        return resume_id, documents
+
+    return lambda saves, seed=0: run(build(saves, seed))
@@ -0,0 +1,101 @@
+"""
+make_patch()/apply_patch() round trips
+
+Usage (from backend/):
+    pytest tests/test_json_patch.py
+"""
+
+import copy
+import random
+
+import pytest
+
+from json_patch import apply_patch, make_patch
+
+CASES = [
+    ({}, {}),
+    ({"a": 1}, {"a": 2}),
+    ({"a": 1, "b": 2}, {"b": 2}),
+    ({"a": 1}, {"a": 1, "b": {"c": [1, 2]}}),
+    ({"a": {"b": {"c": 1, "d": [1, 2, 3]}}}, {"a": {"b": {"c": 2, "d": [1, 3]}}}),
+    ({"list": [1, 2, 3]}, {"list": [0, 1, 2, 3]}),
+    ({"list": [1, 2, 3]}, {"list": [1, 2, 3, 4, 5]}),
+    ({"list": [1, 2, 3, 4]}, {"list": [1, 4]}),
+    ({"list": [1, 2, 3]}, {"list": []}),
+    ({"list": []}, {"list": [{"a": 1}, {"b": 2}]}),
+    ({"list": [{"a": 1}, {"b": 2}]}, {"list": [{"b": 2}, {"a": 1}]}),
+    ({"list": [[1, 2], [3]]}, {"list": [[1], [3, 4], []]}),
+    ({"list": [1, 2]}, {"list": {"0": 1, "1": 2}}),
+    ({"a/b": 1, "c~d": 2}, {"a/b": 3, "c~d": 2, "~1": 4}),
+    ({"x/y": {"~0": [1]}}, {"x/y": {"~0": [1, 2], "/": None}}),
+    ({"": 1}, {"": 2}),
+    (
+        {"experience": [{"company": "A", "bullets": ["x", "y"]}, {"company": "B", "bullets": []}]},
+        {"experience": [{"company": "C", "bullets": ["z"]}, {"company": "A", "bullets": ["y"]}]},
+    ),
+]
+
+
+@pytest.mark.parametrize("old,new", CASES)
+def test_round_trip(old, new):
+    original = copy.deepcopy(old)
+    assert apply_patch(old, make_patch(old, new)) == new
+    assert old == original
+
+
+def test_identical_documents_need_no_operations():
+    document = {"a": [1, {"b": "c"}], "d/e": {"f~g": None}}
+    assert make_patch(document, copy.deepcopy(document)) == []
+
+
+def test_special_characters_in_keys_are_escaped():
+    patch = make_patch({"a/b": 1, "c~d": 2}, {"a/b": 3})
+    assert {op["path"] for op in patch} == {"/a~1b", "/c~0d"}
+
+
+def _random_value(rng, depth=0):
+    kind = rng.randrange(4 if depth < 3 else 2)
+    if kind == 0:
+        return rng.randrange(5)
+    if kind == 1:
+        return rng.choice(["", "a", "a/b", "~", "~1", "x~0/"])
+    if kind == 2:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randrange(5))]
+    return {rng.choice(["a", "b", "a/b", "~0", "c~", "/"]): _random_value(rng, depth + 1)
+            for _ in range(rng.randrange(4))}
+
+
+def _mutate(value, rng):
+    if isinstance(value, list) and value and rng.random() < 0.7:
+        value = list(value)
+        choice = rng.randrange(3)
+        if choice == 0:
+            del value[rng.randrange(len(value))]
+        elif choice == 1:
+            value.insert(rng.randrange(len(value) + 1), _random_value(rng, 2))
+        else:
+            index = rng.randrange(len(value))
+            value[index] = _mutate(value[index], rng)
+        return value
+    if isinstance(value, dict) and value and rng.random() < 0.7:
+        value = dict(value)
+        key = rng.choice(list(value))
+        choice = rng.randrange(3)
+        if choice == 0:
+            del value[key]
+        elif choice == 1:
+            value[key + "/"] = _random_value(rng, 2)
+        else:
+            value[key] = _mutate(value[key], rng)
+        return value
+    return _random_value(rng, 1)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_random_round_trip(seed):
+    rng = random.Random(seed)
+    old = {"root": _random_value(rng)}
+    new = old
+    for _ in range(rng.randrange(1, 5)):
+        new = _mutate(new, rng)
+    assert apply_patch(old, make_patch(old, new)) == new
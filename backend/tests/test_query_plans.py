@@ -0,0 +1,212 @@
+"""
+Query plan checks for the hot routes
+
+Seeds large fixture tables in the database at TEST_DATABASE_URL, records
+the SQL each route issues and fails if EXPLAIN shows a sequential scan of
+any seeded table. Foreign keys into those tables are checked the same
+way, since deletes look up referencing rows with a query of their own.
+
+TEST_DATABASE_URL must point at a throwaway database: it is migrated
+and its tables are truncated. Skipped when unset.
+
+Usage (from backend/):
+    TEST_DATABASE_URL=postgresql+asyncpg://.../vitaecraft_test pytest tests/test_query_plans.py
+"""
+
+import json
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+USERS = 10000
+RESUMES_PER_USER = 5
+VERSIONS_PER_RESUME = 2
+
+# Tables big enough that a sequential scan in a per-request query is a bug
+LARGE_TABLES = {"users", "resumes", "resume_versions", "cover_letters", "payment_transactions"}
+
+SEED_SQL = (
+    "TRUNCATE users, resumes, resume_versions, cover_letters, payment_transactions, password_resets, "
+    "resume_analytics, user_preferences, public_resumes CASCADE",
+    f"""
+    INSERT INTO users (id, email, password, full_name, is_premium, email_verified, verification_token, created_at, updated_at)
+    SELECT gen_random_uuid(), 'user' || n || '@example.com', 'x', 'User ' || n, false, n % 3 = 0,
+           CASE WHEN n % 3 <> 0 THEN md5(n::text) END,
+           now() - n * interval '1 minute', now()
+    FROM generate_series(1, {USERS}) AS n
+    """,
+    f"""
+    INSERT INTO resumes (id, user_id, title, template, data, ats_score, version, is_public, created_at, updated_at)
+    SELECT gen_random_uuid(), u.id, 'Resume ' || n, 'professional',
+           jsonb_build_object('skills', jsonb_build_array('skill' || abs(hashtext(u.email || n)) % 1000)),
+           0, {VERSIONS_PER_RESUME + 1}, false, now() - n * interval '1 hour', now()
+    FROM users u CROSS JOIN generate_series(1, {RESUMES_PER_USER}) AS n
+    """,
+    f"""
+    INSERT INTO resume_versions (id, resume_id, version, title, template, data, created_at)
+    SELECT gen_random_uuid(), r.id, v, r.title, r.template, r.data, r.created_at + v * interval '1 minute'
+    FROM resumes r CROSS JOIN generate_series(1, {VERSIONS_PER_RESUME}) AS v
+    """,
+    """
+    INSERT INTO cover_letters (id, user_id, resume_id, title, content, company_name, job_description, created_at, updated_at)
+    SELECT gen_random_uuid(), r.user_id, r.id, 'Letter for ' || r.title, 'Dear hiring manager', 'Acme', 'Engineer',
+           r.created_at, r.updated_at
+    FROM resumes r
+    """,
+    """
+    INSERT INTO payment_transactions (id, session_id, user_id, amount, plan, status, payment_status, created_at)
+    SELECT gen_random_uuid(), 'cs_' || md5(u.id::text || n), u.id, 9.99, 'early_bird', 'completed', 'complete',
+           u.created_at + n * interval '1 day'
+    FROM users u CROSS JOIN generate_series(1, 2) AS n
+    """,
+    "ANALYZE",
+)
+
+# (name, method, path, body); {resume_id}, {letter_id} and {token} are filled from the fixtures
+ROUTES = [
+    ("me", "GET", "/api/auth/me", None),
+    ("verify email", "POST", "/api/auth/verify-email", {"token": "{token}"}),
+    ("list resumes", "GET", "/api/resumes?limit=2", None),
+    ("resumes with skill", "GET", "/api/resumes?skill=skill7", None),
+    ("resume summary", "GET", "/api/resumes/summary?limit=2", None),
+    ("get resume", "GET", "/api/resumes/{resume_id}", None),
+    ("resume versions", "GET", "/api/resumes/{resume_id}/versions?limit=1", None),
+    ("save resume", "PUT", "/api/resumes/{resume_id}", {"title": "Renamed"}),
+    ("resume analytics", "GET", "/api/resumes/{resume_id}/analytics", None),
+    ("list cover letters", "GET", "/api/cover-letters?limit=2", None),
+    ("cover letter summary", "GET", "/api/cover-letters/summary?limit=2", None),
+    ("get cover letter", "GET", "/api/cover-letters/{letter_id}", None),
+    ("payment history", "GET", "/api/payments/history?limit=1", None),
+    ("analytics dashboard", "GET", "/api/analytics/dashboard", None),
+]
+
+
+def seq_scans(plan):
+    """Relations from LARGE_TABLES that the plan reads with a sequential scan"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+@pytest.fixture(scope="module")
+def app():
+    os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+    os.environ['DATABASE_REPLICA_URL'] = ''
+    os.environ['PRERENDER_ENABLED'] = 'false'
+    os.environ['VERSION_COMPACTION_INTERVAL_SECONDS'] = '0'
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, text
+
+    import server
+    from database import engine
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    with TestClient(server.app) as client:
+        async def seed():
+            async with engine.begin() as conn:
+                for sql in SEED_SQL:
+                    await conn.execute(text(sql))
+                user = (await conn.execute(text(
+                    "SELECT id, email, verification_token AS token FROM users WHERE email = 'user1@example.com'"
+                ))).one()
+                resume_id = (await conn.execute(text(
+                    "SELECT id FROM resumes WHERE user_id = :user ORDER BY created_at DESC LIMIT 1"
+                ), {"user": user.id})).scalar()
+                letter_id = (await conn.execute(text(
+                    "SELECT id FROM cover_letters WHERE user_id = :user ORDER BY created_at DESC LIMIT 1"
+                ), {"user": user.id})).scalar()
+            return user, resume_id, letter_id
+
+        user, resume_id, letter_id = client.portal.call(seed)
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            yield {
+                "client": client,
+                "engine": engine,
+                "statements": statements,
+                "headers": {"Authorization": f"Bearer {server.create_access_token(str(user.id), user.email)}"},
+                "values": {"resume_id": str(resume_id), "letter_id": str(letter_id), "token": user.token},
+            }
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def explain(app, statement, parameters):
+    async def run():
+        async with app["engine"].connect() as conn:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            await conn.rollback()
+        return json.loads(plan) if isinstance(plan, str) else plan
+    return app["client"].portal.call(run)[0]["Plan"]
+
+
+def fill(value, values):
+    if isinstance(value, str):
+        return value.format(**values)
+    if isinstance(value, dict):
+        return {k: fill(v, values) for k, v in value.items()}
+    return value
+
+
+@pytest.mark.parametrize("name,method,path,body", ROUTES, ids=[r[0] for r in ROUTES])
+def test_route_queries_use_indexes(app, name, method, path, body):
+    client, values = app["client"], app["values"]
+    app["statements"].clear()
+    response = client.request(method, fill(path, values), json=fill(body, values), headers=app["headers"])
+    assert response.status_code == 200, response.text
+    # Later pages go through the keyset predicate, so check one of those too
+    cursor = response.headers.get("X-Next-Cursor")
+    if cursor:
+        separator = "&" if "?" in path else "?"
+        response = client.request(method, f"{fill(path, values)}{separator}cursor={cursor}", headers=app["headers"])
+        assert response.status_code == 200, response.text
+
+    statements = [
+        (statement, parameters) for statement, parameters in app["statements"]
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH"))
+    ]
+    assert statements, f"{name} issued no queries"
+    for statement, parameters in statements:
+        scanned = seq_scans(explain(app, statement, parameters))
+        assert not scanned, f"{name}: sequential scan of {', '.join(scanned)} in\n{statement}"
+
+
+def test_foreign_keys_into_large_tables_are_indexed(app):
+    """Deleting a parent row looks up its children by the referencing column"""
+    async def foreign_keys():
+        async with app["engine"].connect() as conn:
+            result = await conn.exec_driver_sql("""
+                SELECT c.conrelid::regclass::text, a.attname
+                FROM pg_constraint c
+                JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+                WHERE c.contype = 'f' AND array_length(c.conkey, 1) = 1
+            """)
+            return result.all()
+
+    checked = 0
+    for table, column in app["client"].portal.call(foreign_keys):
+        if table not in LARGE_TABLES:
+            continue
+        scanned = seq_scans(explain(app, f"SELECT 1 FROM {table} WHERE {column} = $1", (uuid.uuid4(),)))
+        assert not scanned, f"no index on {table}.{column}"
+        checked += 1
+    assert checked
@@ -0,0 +1,88 @@
+"""
+RangedFileResponse: whole files, byte ranges, and files unlinked before sending
+
+Usage (from backend/):
+    pytest tests/test_ranged_response.py
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from ranged_response import RangedFileResponse
+
+BODY = bytes(range(256)) * 1000
+
+
+def _send(response):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response({"type": "http", "method": "GET"}, None, send))
+    start = messages[0]
+    headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    assert not messages[-1].get("more_body")
+    return start["status"], headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "cached.pdf"
+    path.write_bytes(BODY)
+    return path
+
+
+def test_whole_file(pdf):
+    status, headers, body = _send(RangedFileResponse(open(pdf, "rb"), media_type="application/pdf"))
+    assert (status, body) == (200, BODY)
+    assert headers["content-length"] == str(len(BODY))
+    assert headers["accept-ranges"] == "bytes"
+
+
+def test_file_unlinked_after_opening_is_sent_in_full(pdf):
+    # e.g. pruned from the render cache between the lookup and the send
+    response = RangedFileResponse(open(pdf, "rb"), media_type="application/pdf")
+    os.unlink(pdf)
+    assert _send(response)[::2] == (200, BODY)
+
+
+def test_file_is_closed_after_sending(pdf):
+    file = open(pdf, "rb")
+    _send(RangedFileResponse(file))
+    assert file.closed
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=-10", (len(BODY) - 10, len(BODY) - 1)),
+    ("bytes=100000-", (100000, len(BODY) - 1)),
+    ("bytes=200000-999999", (200000, len(BODY) - 1)),
+])
+def test_single_range(pdf, header, expected):
+    status, headers, body = _send(RangedFileResponse(open(pdf, "rb"), range_header=header))
+    start, end = expected
+    assert (status, body) == (206, BODY[start:end + 1])
+    assert headers["content-range"] == f"bytes {start}-{end}/{len(BODY)}"
+    assert headers["content-length"] == str(end - start + 1)
+
+
+def test_unsatisfiable_range(pdf):
+    status, headers, body = _send(RangedFileResponse(open(pdf, "rb"), range_header=f"bytes={len(BODY)}-"))
+    assert (status, body) == (416, b"")
+    assert headers["content-range"] == f"bytes */{len(BODY)}"
+
+
+@pytest.mark.parametrize("header,if_range", [("bytes=0-1,5-6", None), ("bytes=0-99", '"stale"')])
+def test_ignored_ranges_send_the_whole_file(pdf, header, if_range):
+    response = RangedFileResponse(open(pdf, "rb"), range_header=header, if_range=if_range, headers={"ETag": '"v1"'})
+    assert _send(response)[::2] == (200, BODY)
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.pdf"
+    path.write_bytes(b"")
+    status, headers, body = _send(RangedFileResponse(open(path, "rb")))
+    assert (status, headers["content-length"], body) == (200, "0", b"")
@@ -0,0 +1,57 @@
+"""
+Read-your-writes tracking
+
+Usage (from backend/):
+    pytest tests/test_read_routing.py
+"""
+
+from collections import OrderedDict
+
+import pytest
+
+import read_routing
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(read_routing, "_recent_writers", OrderedDict())
+    monkeypatch.setattr(read_routing, "READ_YOUR_WRITES_SECONDS", 5)
+    monkeypatch.setattr(read_routing.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_recent_writers_read_the_primary_until_the_window_ends(clock):
+    read_routing.note_write("a")
+    clock[0] += 4
+    assert read_routing.wrote_recently("a")
+    assert not read_routing.wrote_recently("b")
+    assert not read_routing.wrote_recently(None)
+    clock[0] += 1
+    assert not read_routing.wrote_recently("a")
+
+
+def test_writing_again_extends_the_window(clock):
+    read_routing.note_write("a")
+    clock[0] += 4
+    read_routing.note_write("a")
+    clock[0] += 4
+    assert read_routing.wrote_recently("a")
+
+
+def test_expired_writers_are_dropped(clock):
+    for key in "abc":
+        read_routing.note_write(key)
+    clock[0] += 5
+    read_routing.note_write("d")
+    assert list(read_routing._recent_writers) == ["d"]
+
+
+def test_tracked_writers_are_capped(clock, monkeypatch):
+    monkeypatch.setattr(read_routing, "_MAX_TRACKED_WRITERS", 3)
+    for n in range(10):
+        read_routing.note_write(str(n))
+    # All still inside the window: the oldest are evicted anyway
+    assert list(read_routing._recent_writers) == ["7", "8", "9"]
+    read_routing.note_write("7")
+    assert list(read_routing._recent_writers) == ["8", "9", "7"]
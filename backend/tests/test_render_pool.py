@@ -0,0 +1,57 @@
+"""
+Render pool recovery from dead workers
+
+Starts a real process pool (spawned workers import this module to run
+the jobs below).
+
+Usage (from backend/):
+    pytest tests/test_render_pool.py
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from render_pool import RenderPool
+
+
+def _die_after(seconds: float):
+    time.sleep(seconds)
+    os._exit(1)
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+def test_broken_pool_is_replaced_once(monkeypatch):
+    pool = RenderPool(workers=2, max_queue=8, timeout=30)
+    created = []
+    create_executor = pool._create_executor
+
+    def counting_create_executor():
+        created.append(create_executor())
+        return created[-1]
+
+    monkeypatch.setattr(pool, "_create_executor", counting_create_executor)
+
+    async def scenario():
+        await pool.start()
+        assert len(created) == 1
+        results = await asyncio.gather(
+            pool._run(_die_after, 0.5), pool._run(_die_after, 0.5), return_exceptions=True
+        )
+        assert all(isinstance(result, BrokenProcessPool) for result in results)
+        # Both failures saw the same dead pool; it was replaced once and serves new jobs
+        assert len(created) == 2
+        assert pool._executor is created[1]
+        assert isinstance(await pool._run(_pid), int)
+        await asyncio.sleep(0)
+        assert pool.stats()["failed"] == 2
+        assert pool.stats()["outstanding"] == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
@@ -0,0 +1,109 @@
+"""
+Version reconstruction from delta-compressed history
+
+Builds resume histories in the database at TEST_DATABASE_URL (a
+throwaway database; it is migrated) and checks that every version reads
+back as the document that was saved. Skipped when unset.
+
+Usage (from backend/):
+    TEST_DATABASE_URL=postgresql+asyncpg://.../vitaecraft_test pytest tests/test_version_history.py
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not os.environ.get('TEST_DATABASE_URL'), reason="TEST_DATABASE_URL is not set")
+
+
+@pytest.fixture
+def history(monkeypatch):
+    """version_history with a small keyframe interval and an empty cache"""
+    import version_history
+
+    monkeypatch.setattr(version_history, "VERSION_KEYFRAME_INTERVAL", 4)
+    monkeypatch.setattr(version_history, "version_cache", version_history.VersionCache(512))
+    return version_history
+
+
+def _saves(count):
+    start = datetime.now(timezone.utc) - timedelta(days=1)
+    return [(start + timedelta(minutes=n), None) for n in range(count)]
+
+
+async def _load(history, resume_id, versions):
+    from database import async_session
+    from models import Resume
+
+    async with async_session() as db:
+        resume = await db.get(Resume, resume_id)
+        return await history.load_version_data(db, resume, versions)
+
+
+async def _delete_version(resume_id, version):
+    from sqlalchemy import delete
+
+    from database import async_session
+    from models import ResumeVersion
+
+    async with async_session() as db:
+        await db.execute(delete(ResumeVersion).where(
+            (ResumeVersion.resume_id == resume_id) & (ResumeVersion.version == version)
+        ))
+        await db.commit()
+
+
+async def _keyframes(resume_id):
+    from sqlalchemy import select
+
+    from database import async_session
+    from models import ResumeVersion
+
+    async with async_session() as db:
+        result = await db.execute(
+            select(ResumeVersion.version)
+            .where((ResumeVersion.resume_id == resume_id) & ResumeVersion.data.isnot(None))
+        )
+        return set(result.scalars())
+
+
+def test_versions_reconstruct_across_keyframes(run, build_history, history):
+    resume_id, documents = build_history(_saves(13))
+    versions = sorted(documents)[:-1]
+    keyframes = run(_keyframes(resume_id))
+    assert {1, 4, 8, 12} <= keyframes < set(versions)
+
+    history.version_cache = history.VersionCache(512)
+    assert run(_load(history, resume_id, versions)) == {v: documents[v] for v in versions}
+
+    # One at a time, each read starts from a cold cache and its own keyframe
+    for version in versions:
+        history.version_cache = history.VersionCache(512)
+        assert run(_load(history, resume_id, [version])) == {version: documents[version]}
+
+
+def test_cached_versions_are_served_without_a_query(run, build_history, history):
+    resume_id, documents = build_history(_saves(6), seed=1)
+    history.version_cache = history.VersionCache(512)
+    run(_load(history, resume_id, [2, 3]))
+
+    class Resume:
+        id = resume_id
+
+    assert run(history.load_version_data(None, Resume, [2, 3])) == {2: documents[2], 3: documents[3]}
+
+
+def test_missing_base_falls_back_to_the_cache(run, build_history, history):
+    resume_id, documents = build_history(_saves(6), seed=2)
+    # Version 2 is a delta against 3, which is a delta against 4
+    assert run(_keyframes(resume_id)) & {2, 3} == set()
+
+    history.version_cache = history.VersionCache(512)
+    run(_load(history, resume_id, [3]))
+    run(_delete_version(resume_id, 3))
+    assert run(_load(history, resume_id, [2])) == {2: documents[2]}
+
+    history.version_cache = history.VersionCache(512)
+    with pytest.raises(RuntimeError, match="no base version 3"):
+        run(_load(history, resume_id, [2]))
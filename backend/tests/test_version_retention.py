@@ -0,0 +1,118 @@
+"""
+Version history compaction
+
+plan_rebase() is checked on its own; the compaction test builds a long
+history in the database at TEST_DATABASE_URL (a throwaway database; it is
+migrated) and is skipped when that is unset.
+
+Usage (from backend/):
+    TEST_DATABASE_URL=postgresql+asyncpg://.../vitaecraft_test pytest tests/test_version_retention.py
+"""
+
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from version_retention import plan_rebase
+
+requires_database = pytest.mark.skipif(not os.environ.get('TEST_DATABASE_URL'), reason="TEST_DATABASE_URL is not set")
+
+
+@pytest.mark.parametrize("rows,doomed,working,expected", [
+    # The survivor above a removed delta becomes the new base
+    ([(5, False, 6), (4, False, 5), (3, False, 4)], {4}, 6, {3: 5}),
+    # Removing the newest history row rebases onto the working copy
+    ([(5, False, 6), (4, False, 5)], {5}, 6, {4: 6}),
+    # A consecutive run of removed versions is bridged in one step
+    ([(5, False, 6), (4, False, 5), (3, False, 4), (2, False, 3)], {3, 4, 5}, 6, {2: 6}),
+    # A row that depended on a removed keyframe is stored in full
+    ([(5, False, 6), (4, True, None), (3, False, 4)], {4}, 6, {3: None}),
+    # Keyframes don't depend on anything
+    ([(5, False, 6), (4, True, None), (3, False, 4)], {5}, 6, {}),
+    # Gaps left by coalesced saves: bases are the next row up, not version + 1
+    ([(9, False, 12), (6, False, 9), (2, False, 6), (1, False, 2)], {6}, 12, {2: 9}),
+    ([(9, False, 12), (6, False, 9), (2, False, 6)], {9}, 12, {6: 12}),
+])
+def test_plan_rebase(rows, doomed, working, expected):
+    assert plan_rebase(rows, doomed, working) == expected
+
+
+def _saves(now, seed):
+    """About 200 days of saves, with bursts from one editor session that coalesce"""
+    rng = random.Random(seed)
+    saves = []
+    at = now - timedelta(days=200)
+    while at < now - timedelta(hours=1):
+        burst = rng.random() < 0.3
+        saves.append((at, "editor" if burst else None))
+        at += timedelta(seconds=20) if burst else timedelta(hours=rng.choice([1, 5, 20, 60]))
+    return saves
+
+
+async def _history(resume_id):
+    """{version: (created_at, document)} for every history row, read with an empty cache"""
+    from sqlalchemy import select
+
+    import version_history
+    from database import async_session
+    from models import Resume, ResumeVersion
+
+    version_history.version_cache = version_history.VersionCache(0)
+    async with async_session() as db:
+        resume = await db.get(Resume, resume_id)
+        result = await db.execute(
+            select(ResumeVersion.version, ResumeVersion.created_at).where(ResumeVersion.resume_id == resume_id)
+        )
+        created = dict(result.all())
+        documents = await version_history.load_version_data(db, resume, created)
+    return {version: (created[version], documents[version]) for version in created}
+
+
+async def _compact(resume_id, now):
+    from database import async_session
+    from version_retention import compact_resume
+
+    removed = rebased = 0
+    while True:
+        async with async_session() as db:
+            outcome = await compact_resume(db, resume_id, now, max_rows=25)
+            await db.commit()
+        removed += outcome[0]
+        rebased += outcome[1]
+        if outcome[0] < 25:
+            return removed, rebased
+
+
+def _canonical(document):
+    return json.dumps(document, sort_keys=True)
+
+
+@requires_database
+def test_compaction_keeps_surviving_versions_identical(run, build_history, monkeypatch):
+    import version_history
+
+    monkeypatch.setattr(version_history, "VERSION_KEYFRAME_INTERVAL", 5)
+    monkeypatch.setattr(version_history, "version_cache", version_history.VersionCache(512))
+    now = datetime.now(timezone.utc)
+    resume_id, documents = build_history(_saves(now, seed=3), seed=3)
+
+    before = run(_history(resume_id))
+    # Coalesced saves leave versions out of history
+    assert len(before) < len(documents) - 1
+    assert {v: _canonical(d) for v, (_, d) in before.items()} == {v: _canonical(documents[v]) for v in before}
+
+    removed, rebased = run(_compact(resume_id, now))
+    after = run(_history(resume_id))
+    assert removed == len(before) - len(after) > 0
+    assert rebased > 0
+    assert {v: _canonical(d) for v, (_, d) in after.items()} == {v: _canonical(documents[v]) for v in after}
+
+    # Everything from the last week survives; older days keep one version each
+    recent = {v for v, (created, _) in before.items() if created >= now - timedelta(days=7)}
+    assert recent <= set(after)
+    older = [created.date() for v, (created, _) in after.items() if now - timedelta(days=90) <= created < now - timedelta(days=7)]
+    assert len(older) == len(set(older))
+    assert run(_compact(resume_id, now)) == (0, 0)
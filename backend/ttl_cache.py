@@ -0,0 +1,72 @@
+"""
+Per-process TTL/LRU cache
+
+Entries expire ttl seconds after they are stored, and the least recently
+used one is evicted past max_entries. Every invalidation bumps a
+generation counter: callers take generation() before querying and pass it
+to put(), which drops the value if an invalidation happened in between,
+so a query that raced a committed change can't cache what it read.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """LRU of values by key, each valid for ttl seconds (ttl 0 disables caching)"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def generation(self) -> int:
+        """Token to pass to put() for a value read from the database after this call"""
+        return self._generation
+
+    def put(self, key: Hashable, value: Any, generation: int) -> bool:
+        """Store value unless caching is off or an invalidation happened since generation"""
+        if self.ttl <= 0 or self.max_entries <= 0 or generation != self._generation:
+            return False
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        return True
+
+    def invalidate(self, *keys: Hashable):
+        """Drop entries; call after committing a change to what they hold"""
+        self._generation += 1
+        for key in keys:
+            if self._remove(key):
+                self.invalidations += 1
+
+    def _remove(self, key: Hashable) -> bool:
+        """Drop one entry; subclasses that index entries override this"""
+        return self._entries.pop(key, None) is not None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,280 @@
+"""
+Delta-compressed resume version history
+
+A history row records the resume as it was before a save. Most rows don't
+hold the full document: they hold a JSON patch that turns the document of
+the next version (base_version) back into theirs, and the newest row's
+base is the working copy in resumes.data. Saving therefore only stores
+the size of the change, and needs nothing that isn't already loaded. The
+resume update and its history row are written by one statement that only
+matches while the resume is still at the version that was read, so two
+concurrent saves can't both claim the next version number.
+
+Saves from one editor session within AUTOSAVE_COALESCE_SECONDS of the
+first are coalesced: the working copy and version number still move on,
+but only the state from before the burst stays in history, and the
+burst's final state is recorded by the first save after the window.
+
+The first entry in each block of VERSION_KEYFRAME_INTERVAL versions (and
+any version whose patch would be no smaller than the document) is stored
+in full, so reconstructing a version never applies more patches than
+that. Version documents never change once written, so reconstructed ones
+are kept in a per-process LRU cache.
+"""
+
+import json
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, literal, null, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from json_patch import Patch, apply_patch, make_patch
+from models import Resume, ResumeVersion
+
+VERSION_KEYFRAME_INTERVAL = max(1, int(os.environ.get('VERSION_KEYFRAME_INTERVAL', 20)))
+VERSION_CACHE_ENTRIES = int(os.environ.get('VERSION_CACHE_ENTRIES', 512))
+# 0 records every save in history
+AUTOSAVE_COALESCE_SECONDS = float(os.environ.get('AUTOSAVE_COALESCE_SECONDS', 60))
+
+
+class VersionCache:
+    """LRU of reconstructed documents keyed by (resume id, version)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[uuid.UUID, int], Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, resume_id: uuid.UUID, version: int) -> Optional[Dict[str, Any]]:
+        data = self._entries.get((resume_id, version))
+        if data is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((resume_id, version))
+        self.hits += 1
+        return data
+
+    def put(self, resume_id: uuid.UUID, version: int, data: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        self._entries[(resume_id, version)] = data
+        self._entries.move_to_end((resume_id, version))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+version_cache = VersionCache(VERSION_CACHE_ENTRIES)
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, separators=(',', ':')))
+
+
+def encode_delta(data: Dict[str, Any], base: Dict[str, Any]) -> Optional[Patch]:
+    """Patch turning base into data, or None when data is better stored in full"""
+    patch = make_patch(base, data)
+    return None if _size(patch) >= _size(data) else patch
+
+
+_save_counts = {"recorded": 0, "coalesced": 0}
+
+
+def newest_delta():
+    """
+    Patch anchoring the newest history row to the working copy (NULL when
+    that row is a keyframe). Select it alongside the Resume for save_resume().
+    """
+    return (
+        select(ResumeVersion.patch)
+        .where(and_(
+            ResumeVersion.resume_id == Resume.id,
+            ResumeVersion.version == Resume.last_history_version,
+            ResumeVersion.base_version == Resume.version,
+        ))
+        .correlate(Resume)
+        .scalar_subquery()
+    )
+
+
+def _history_row(resume: Resume, next_data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """
+    Column values recording the resume's current state, which next_data is
+    about to replace as version resume.version + 1. Stored as a patch from
+    next_data unless this version is due a keyframe.
+    """
+    version = resume.version
+    row = {
+        "id": uuid.uuid4(),
+        "version": version,
+        "title": resume.title,
+        "template": resume.template,
+        "created_at": resume.updated_at or now,
+    }
+    # Coalesced saves leave gaps in version numbers, so test for crossing a
+    # multiple of the interval since the last entry rather than landing on one
+    previous = resume.last_history_version
+    crossed = previous is None or version // VERSION_KEYFRAME_INTERVAL != previous // VERSION_KEYFRAME_INTERVAL
+    patch = None if crossed else encode_delta(resume.data, next_data)
+    if patch is None:
+        row["data"] = resume.data
+    else:
+        row["patch"] = patch
+        row["base_version"] = version + 1
+    return row
+
+
+def _in_window(resume: Resume, session: str, now: datetime) -> bool:
+    return (
+        AUTOSAVE_COALESCE_SECONDS > 0
+        and resume.autosave_session == session
+        and resume.autosave_started_at is not None
+        and now - resume.autosave_started_at < timedelta(seconds=AUTOSAVE_COALESCE_SECONDS)
+    )
+
+
+async def save_resume(db: AsyncSession, resume: Resume, newest_patch: Optional[Patch], changes: Dict[str, Any],
+                      session: Optional[str], now: datetime, checkpoint: bool = False) -> Optional[Resume]:
+    """
+    Write changes (column values; data defaults to the current document) as
+    the resume's next version and update history, in one statement that
+    only matches while the resume is still at the version it was read at.
+
+    Saves from session inside the autosave window re-anchor the newest
+    delta instead of adding a row. A checkpoint always records the current
+    state and closes the window, so the state it saves is recorded too.
+    Returns the updated resume, or None if another save got there first.
+    """
+    next_data = changes.get("data", resume.data)
+    values = {
+        **changes,
+        "version": Resume.version + 1,
+        "updated_at": now,
+        "autosave_session": None if checkpoint else session,
+    }
+    coalesce = session is not None and not checkpoint and _in_window(resume, session, now)
+    history = None
+    cached = None
+    if not coalesce:
+        row = _history_row(resume, next_data, now)
+        values.update(autosave_started_at=now, last_history_version=resume.version)
+        cached = (resume.version, resume.data)
+    elif newest_patch is not None:
+        # Otherwise the newest entry is a keyframe: nothing depends on the working copy
+        data = apply_patch(resume.data, newest_patch)
+        patch = encode_delta(data, next_data)
+        if patch is None:
+            rebased = {"data": data, "patch": null(), "base_version": None}
+        else:
+            rebased = {"patch": patch, "base_version": resume.version + 1}
+        cached = (resume.last_history_version, data)
+
+    saved = (
+        update(Resume)
+        .where(and_(Resume.id == resume.id, Resume.user_id == resume.user_id, Resume.version == resume.version))
+        .values(**values)
+        .returning(*Resume.__table__.columns)
+        .cte("saved")
+    )
+    if not coalesce:
+        columns = ResumeVersion.__table__.columns
+        history = insert(ResumeVersion).from_select(
+            ["resume_id", *row],
+            select(saved.c.id, *(literal(value, columns[name].type) for name, value in row.items())),
+        )
+    elif cached is not None:
+        history = (
+            update(ResumeVersion)
+            .where(and_(
+                ResumeVersion.resume_id.in_(select(saved.c.id)),
+                ResumeVersion.version == resume.last_history_version,
+            ))
+            .values(**rebased)
+        )
+
+    statement = select(aliased(Resume, saved))
+    if history is not None:
+        statement = statement.add_cte(history.cte("history"))
+    result = await db.execute(statement.execution_options(populate_existing=True))
+    saved_resume = result.scalar_one_or_none()
+    if saved_resume is None:
+        return None
+
+    _save_counts["coalesced" if coalesce else "recorded"] += 1
+    if cached is not None:
+        version_cache.put(resume.id, *cached)
+    return saved_resume
+
+
+def autosave_stats() -> dict:
+    return {"window_seconds": AUTOSAVE_COALESCE_SECONDS, **_save_counts}
+
+
+async def load_version_data(db: AsyncSession, resume: Resume, versions: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Documents for the given history versions of resume, in one query for
+    whatever isn't cached. Versions with no history row are left out.
+    """
+    found: Dict[int, Dict[str, Any]] = {}
+    missing = []
+    for version in set(versions):
+        data = version_cache.get(resume.id, version)
+        if data is None:
+            missing.append(version)
+        else:
+            found[version] = data
+    if not missing:
+        return found
+
+    # Each patch needs its base, so read from the oldest missing version up
+    # to the first keyframe (or the working copy) above the newest one
+    lowest, highest = min(missing), max(missing)
+    keyframe = (
+        select(func.min(ResumeVersion.version))
+        .where(and_(
+            ResumeVersion.resume_id == resume.id,
+            ResumeVersion.version >= highest,
+            ResumeVersion.data.isnot(None),
+        ))
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(ResumeVersion.version, ResumeVersion.data, ResumeVersion.patch, ResumeVersion.base_version)
+        .where(and_(
+            ResumeVersion.resume_id == resume.id,
+            ResumeVersion.version >= lowest,
+            ResumeVersion.version <= func.coalesce(keyframe, resume.version),
+        ))
+        .order_by(ResumeVersion.version.desc())
+    )
+
+    documents: Dict[int, Dict[str, Any]] = {resume.version: resume.data}
+    wanted = set(missing)
+    for version, data, patch, base_version in result.all():
+        if data is None:
+            base = documents.get(base_version)
+            if base is None:
+                base = version_cache.get(resume.id, base_version)
+            if base is None:
+                raise RuntimeError(f"Version {version} of resume {resume.id} has no base version {base_version}")
+            data = apply_patch(base, patch)
+        documents[version] = data
+        if version in wanted:
+            found[version] = data
+            version_cache.put(resume.id, version, data)
+    return found
@@ -0,0 +1,293 @@
+"""
+Version history retention and compaction
+
+Old history is thinned out by a background job according to the owner's
+plan: every version is kept for keep_all_days, then only the last version
+of each day until daily_days, then the last version of each week. Policies
+come from VERSION_RETENTION, e.g. "default=7,90;lifetime=30,365", where
+plans are users.subscription_type (free accounts are "default").
+
+Each resume is compacted in its own short transaction, at most
+VERSION_COMPACTION_MAX_ROWS deletions at a time. Its resumes row is locked
+with SKIP LOCKED, so a resume that is being saved is left for the next
+run rather than waited on. Removing a version merges its change into the
+delta below it: the surviving neighbour's patch is recomputed against the
+next surviving version (or becomes a keyframe if the removed version was
+one, so reconstruction never walks further than before).
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, case, delete, func, literal, null, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import SERVERLESS, async_session, engine
+from models import Resume, ResumeVersion, User
+from version_history import encode_delta, load_version_data
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    keep_all_days: int
+    daily_days: int
+
+
+def parse_policies(spec: str) -> Dict[str, RetentionPolicy]:
+    """Parse "plan=keep_all_days,daily_days;..." (must include a default plan)"""
+    policies = {}
+    for entry in filter(None, (part.strip() for part in spec.split(';'))):
+        try:
+            plan, days = entry.split('=')
+            keep_all_days, daily_days = (int(d) for d in days.split(','))
+        except ValueError:
+            raise ValueError(f"Invalid VERSION_RETENTION entry: {entry!r}")
+        if not 0 <= keep_all_days <= daily_days:
+            raise ValueError(f"VERSION_RETENTION for {plan.strip()} must keep all versions for at most daily_days")
+        policies[plan.strip()] = RetentionPolicy(keep_all_days, daily_days)
+    if 'default' not in policies:
+        raise ValueError("VERSION_RETENTION needs a default policy")
+    return policies
+
+
+VERSION_RETENTION = parse_policies(os.environ.get('VERSION_RETENTION', 'default=7,90'))
+# Serverless deployments should run `python manage.py compact-versions` from a scheduler instead
+VERSION_COMPACTION_INTERVAL_SECONDS = float(os.environ.get(
+    'VERSION_COMPACTION_INTERVAL_SECONDS', 0 if SERVERLESS else 3600
+))
+VERSION_COMPACTION_BATCH = int(os.environ.get('VERSION_COMPACTION_BATCH', 100))
+VERSION_COMPACTION_MAX_ROWS = int(os.environ.get('VERSION_COMPACTION_MAX_ROWS', 200))
+
+# Keeps concurrent passes from several server processes from duplicating work
+_COMPACTION_LOCK_KEY = 741_285_002
+
+
+def _cutoff(plan, now: datetime, days):
+    """Per-row cutoff timestamp for the owner's plan"""
+    def at(policy):
+        return literal(now - timedelta(days=days(policy)), ResumeVersion.created_at.type)
+    whens = {name: at(policy) for name, policy in VERSION_RETENTION.items() if name != 'default'}
+    default = at(VERSION_RETENTION['default'])
+    return case(whens, value=plan, else_=default) if whens else default
+
+
+def expired_versions(resume_filter, now: datetime):
+    """(resume_id, version) of history rows the retention policy no longer keeps"""
+    plan = func.coalesce(User.subscription_type, 'default')
+    keep_all_cutoff = _cutoff(plan, now, lambda p: p.keep_all_days)
+    daily_cutoff = _cutoff(plan, now, lambda p: p.daily_days)
+    period = case((ResumeVersion.created_at >= daily_cutoff, 'day'), else_='week')
+    bucket = func.date_trunc(period, func.timezone('UTC', ResumeVersion.created_at))
+    ranked = (
+        select(
+            ResumeVersion.resume_id,
+            ResumeVersion.version,
+            func.row_number().over(
+                partition_by=(ResumeVersion.resume_id, period, bucket),
+                order_by=ResumeVersion.version.desc(),
+            ).label('rank'),
+        )
+        .join(Resume, Resume.id == ResumeVersion.resume_id)
+        .join(User, User.id == Resume.user_id)
+        .where(and_(resume_filter, ResumeVersion.created_at < keep_all_cutoff))
+        .subquery()
+    )
+    # The newest version in each day or week survives
+    return select(ranked.c.resume_id, ranked.c.version).where(ranked.c.rank > 1)
+
+
+def plan_rebase(rows: Iterable[Tuple[int, bool, Optional[int]]], doomed: Set[int],
+                working_version: int) -> Dict[int, Optional[int]]:
+    """
+    Surviving rows whose base is being removed, mapped to their new base
+    (None: store in full). rows are (version, is_keyframe, base_version),
+    newest first, from the row just below the oldest removed version up.
+    """
+    rebase: Dict[int, Optional[int]] = {}
+    above, absorbed_keyframe = working_version, False
+    for version, keyframe, base in rows:
+        if version in doomed:
+            absorbed_keyframe = absorbed_keyframe or keyframe
+            continue
+        if not keyframe and base != above:
+            rebase[version] = None if absorbed_keyframe else above
+        above, absorbed_keyframe = version, False
+    return rebase
+
+
+async def compact_resume(db: AsyncSession, resume_id: uuid.UUID, now: datetime,
+                         max_rows: int = VERSION_COMPACTION_MAX_ROWS) -> Optional[Tuple[int, int]]:
+    """
+    Remove up to max_rows expired versions of one resume, oldest first.
+    Returns (removed, rebased), or None if the resume is locked by a save.
+    The caller commits.
+    """
+    result = await db.execute(select(Resume).where(Resume.id == resume_id).with_for_update(skip_locked=True))
+    resume = result.scalar_one_or_none()
+    if resume is None:
+        return None
+
+    expired = expired_versions(ResumeVersion.resume_id == resume_id, now).subquery()
+    result = await db.execute(select(expired.c.version).order_by(expired.c.version).limit(max_rows))
+    doomed = set(result.scalars().all())
+    if not doomed:
+        return 0, 0
+
+    result = await db.execute(
+        select(ResumeVersion.version, ResumeVersion.data.isnot(None), ResumeVersion.base_version)
+        .where(and_(
+            ResumeVersion.resume_id == resume_id,
+            or_(ResumeVersion.version >= min(doomed), ResumeVersion.base_version.in_(doomed)),
+        ))
+        .order_by(ResumeVersion.version.desc())
+    )
+    rebase = plan_rebase(result.all(), doomed, resume.version)
+
+    # Reconstruct everything needed before any row changes
+    needed = set(rebase) | {base for base in rebase.values() if base is not None}
+    documents = await load_version_data(db, resume, needed - {resume.version})
+    documents[resume.version] = resume.data
+
+    for version, base in rebase.items():
+        data = documents[version]
+        patch = None if base is None else encode_delta(data, documents[base])
+        if patch is None:
+            values = {"data": data, "patch": null(), "base_version": None}
+        else:
+            values = {"data": null(), "patch": patch, "base_version": base}
+        await db.execute(
+            update(ResumeVersion)
+            .where(and_(ResumeVersion.resume_id == resume_id, ResumeVersion.version == version))
+            .values(**values)
+        )
+    await db.execute(
+        delete(ResumeVersion).where(and_(ResumeVersion.resume_id == resume_id, ResumeVersion.version.in_(doomed)))
+    )
+    return len(doomed), len(rebase)
+
+
+class VersionCompactor:
+    """Periodic retention pass over all resumes"""
+
+    def __init__(self, interval: float, batch_size: int, max_rows: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.resumes_compacted = 0
+        self.rows_reclaimed = 0
+        self.rows_rebased = 0
+        self.skipped_locked = 0
+        self.failed = 0
+        self.last_run_at: Optional[str] = None
+        self.last_run_seconds: Optional[float] = None
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    def shutdown(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Version compaction failed: {type(e).__name__}: {e}")
+
+    async def run_once(self, now: Optional[datetime] = None) -> Optional[Dict[str, int]]:
+        """One pass over every resume; None if another process is already running one"""
+        now = now or datetime.now(timezone.utc)
+        started = time.perf_counter()
+        async with engine.connect() as lock:
+            acquired = (await lock.execute(select(func.pg_try_advisory_lock(_COMPACTION_LOCK_KEY)))).scalar()
+            # Keep the session lock without holding a transaction open for the pass
+            await lock.commit()
+            if not acquired:
+                return None
+            try:
+                totals = await self._pass(now)
+            finally:
+                await lock.execute(select(func.pg_advisory_unlock(_COMPACTION_LOCK_KEY)))
+                await lock.commit()
+
+        self.runs += 1
+        self.last_run_at = now.isoformat()
+        self.last_run_seconds = round(time.perf_counter() - started, 3)
+        logger.info(f"Version compaction: {totals}")
+        return totals
+
+    async def _pass(self, now: datetime) -> Dict[str, int]:
+        totals = {"resumes": 0, "reclaimed": 0, "rebased": 0, "skipped_locked": 0}
+        after: Optional[uuid.UUID] = None
+        while True:
+            async with async_session() as db:
+                query = select(Resume.id).order_by(Resume.id).limit(self.batch_size)
+                if after is not None:
+                    query = query.where(Resume.id > after)
+                ids: List[uuid.UUID] = (await db.execute(query)).scalars().all()
+                if not ids:
+                    return totals
+                after = ids[-1]
+                expired = expired_versions(ResumeVersion.resume_id.in_(ids), now).subquery()
+                candidates = (await db.execute(select(expired.c.resume_id).distinct())).scalars().all()
+
+            for resume_id in candidates:
+                await self._compact(resume_id, now, totals)
+
+    async def _compact(self, resume_id: uuid.UUID, now: datetime, totals: Dict[str, int]):
+        compacted = False
+        while True:
+            async with async_session() as db:
+                outcome = await compact_resume(db, resume_id, now, self.max_rows)
+                await db.commit()
+            if outcome is None:
+                totals["skipped_locked"] += 1
+                self.skipped_locked += 1
+                return
+            removed, rebased = outcome
+            compacted = compacted or removed > 0
+            totals["reclaimed"] += removed
+            totals["rebased"] += rebased
+            self.rows_reclaimed += removed
+            self.rows_rebased += rebased
+            if removed < self.max_rows:
+                break
+        if compacted:
+            totals["resumes"] += 1
+            self.resumes_compacted += 1
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "resumes_compacted": self.resumes_compacted,
+            "rows_reclaimed": self.rows_reclaimed,
+            "rows_rebased": self.rows_rebased,
+            "skipped_locked": self.skipped_locked,
+            "failed": self.failed,
+            "last_run_at": self.last_run_at,
+            "last_run_seconds": self.last_run_seconds,
+        }
+
+
+version_compactor = VersionCompactor(
+    interval=VERSION_COMPACTION_INTERVAL_SECONDS,
+    batch_size=VERSION_COMPACTION_BATCH,
+    max_rows=VERSION_COMPACTION_MAX_ROWS,
+)
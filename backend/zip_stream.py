@@ -0,0 +1,64 @@
+"""
+Incremental ZIP writer for streaming responses
+"""
+
+import zipfile
+from datetime import datetime, timezone
+
+
+class _Sink:
+    """Write-only, non-seekable buffer; zipfile falls back to data descriptors"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStreamWriter:
+    """
+    Build a ZIP archive entry by entry, handing back the encoded bytes after
+    each write so only the current entry is ever held in memory.
+    """
+
+    def __init__(self):
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, mode='w')
+        self._names = set()
+
+    def _unique_name(self, name: str) -> str:
+        candidate, counter = name, 1
+        while candidate in self._names:
+            stem, dot, ext = name.rpartition('.')
+            candidate = f"{stem}-{counter}.{ext}" if dot else f"{name}-{counter}"
+            counter += 1
+        self._names.add(candidate)
+        return candidate
+
+    def add(self, name: str, data: bytes, compress: bool = True) -> bytes:
+        """Append an entry and return the archive bytes produced so far"""
+        info = zipfile.ZipInfo(self._unique_name(name), date_time=datetime.now(timezone.utc).timetuple()[:6])
+        # Already-compressed payloads (PDF streams) gain little from deflate
+        info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        self._zip.writestr(info, data)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """Write the central directory and return the final bytes"""
+        self._zip.close()
+        return self._sink.drain()
@@ -43,7 +43,7 @@ const CoverLetterBuilder = () => {
 
   const fetchResumes = async () => {
     try {
-      const response = await fetch(`${API}/resumes`, {
+      const response = await fetch(`${API}/resumes/summary`, {
         headers: { Authorization: `Bearer ${token}` },
       });
       if (response.ok) {
@@ -50,7 +50,7 @@ const Dashboard = () => {
 
   const fetchResumes = async () => {
     try {
-      const response = await fetch(`${API}/resumes`, {
+      const response = await fetch(`${API}/resumes/summary`, {
         headers: { Authorization: `Bearer ${token}` },
       });
       if (response.ok) {
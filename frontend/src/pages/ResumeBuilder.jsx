@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useParams, useNavigate, Link } from "react-router-dom";
 import { motion } from "framer-motion";
 import { useAuth } from "../App";
@@ -49,6 +49,9 @@ const ResumeBuilder = () => {
   const [jobDescription, setJobDescription] = useState("");
   const [atsResult, setAtsResult] = useState(null);
   const [activeTab, setActiveTab] = useState("edit");
+  // Saves from this tab within the autosave window share one history entry
+  // (created on first save: crypto.randomUUID only exists in secure contexts)
+  const editorSession = useRef(null);
 
   useEffect(() => {
     if (id) fetchResume();
@@ -78,12 +81,17 @@ const ResumeBuilder = () => {
     try {
       const url = id ? `${API}/resumes/${id}` : `${API}/resumes`;
       const method = id ? "PUT" : "POST";
+      if (!editorSession.current) {
+        editorSession.current = globalThis.crypto?.randomUUID?.()
+          ?? `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+      }
       
       const response = await fetch(url, {
         method,
         headers: {
           "Content-Type": "application/json",
           Authorization: `Bearer ${token}`,
+          ...(editorSession.current && { "X-Editor-Session": editorSession.current }),
         },
         body: JSON.stringify(resume),
       });